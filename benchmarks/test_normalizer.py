@@ -0,0 +1,45 @@
+"""
+Legacy vs current simplify_result_entries on synthetic megafile entries.
+
+    pip install -r requirements-dev.txt
+    python -m pytest benchmarks/test_normalizer.py
+
+Without pytest-benchmark only the output comparison runs.
+"""
+import importlib.util
+
+import pytest
+
+from bulk_research.normalizer import simplify_result_entries
+from bulk_research.sample_data import make_entries
+
+needs_benchmark = pytest.mark.skipif(
+    importlib.util.find_spec('pytest_benchmark') is None, reason='pytest-benchmark is not installed',
+)
+
+
+@pytest.fixture
+def legacy_simplify():
+    from legacy_normalizer import simplify_result_entries as legacy
+    return legacy
+
+
+@pytest.fixture(scope='module', params=[1000, 10000], ids=str)
+def entries(request):
+    return make_entries(request.param)
+
+
+def test_same_output(legacy_simplify, entries):
+    assert simplify_result_entries(entries) == legacy_simplify(entries)
+
+
+@needs_benchmark
+def test_legacy(benchmark, legacy_simplify, entries):
+    benchmark.group = f'{len(entries)} entries'
+    benchmark(legacy_simplify, entries)
+
+
+@needs_benchmark
+def test_current(benchmark, entries):
+    benchmark.group = f'{len(entries)} entries'
+    benchmark(simplify_result_entries, entries)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BulkResearchSession
+from .models import BulkResearchListing, BulkResearchSession
 
 
 @admin.register(BulkResearchSession)
@@ -7,4 +7,12 @@ class BulkResearchSessionAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'keyword', 'desired_total', 'status', 'created_at', 'completed_at')
     list_filter = ('status',)
     search_fields = ('keyword', 'user__username', 'id')
-    ordering = ('-created_at',)
\ No newline at end of file
+    ordering = ('-created_at',)
+
+
+@admin.register(BulkResearchListing)
+class BulkResearchListingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'session', 'listing_id', 'position', 'demand', 'effective_price', 'num_favorers', 'views')
+    search_fields = ('listing_id', 'session__keyword')
+    raw_id_fields = ('session', 'user')
+    exclude = ('simplified',)
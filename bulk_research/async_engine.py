@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+
+from .jsonstream import SSEReader
+
+try:
+    import httpx
+except ImportError:  # optional: without httpx sessions keep one thread each
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent upstream streams held by the shared client
+BULK_ASYNC_MAX_STREAMS = int(getattr(settings, 'BULK_ASYNC_MAX_STREAMS', 500))
+# Threads that run SessionWorker line handling (in-memory updates, writer enqueues)
+BULK_ASYNC_HANDLER_THREADS = int(getattr(settings, 'BULK_ASYNC_HANDLER_THREADS', 8))
+
+
+class AsyncStreamEngine:
+    """
+    Multiplexes the upstream SSE streams of every bulk session in the process
+    on one asyncio loop running in a dedicated thread. Each session costs a
+    coroutine and a pooled connection instead of an OS thread.
+
+    SessionWorker keeps owning all state: the engine only reads the network and
+    hands decoded chunks to `worker._handle_chunk` on a small executor, so the
+    loop never blocks on locks and the snapshot/subscribe contract is unchanged.
+    Backpressure is applied per session on the loop: a saturated session stops
+    reading its own stream while the handler threads keep serving the others.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.executor = ThreadPoolExecutor(max_workers=BULK_ASYNC_HANDLER_THREADS, thread_name_prefix='BulkStreamHandler')
+        self.client = None
+        self.lock = threading.Lock()
+        self.active = 0
+
+    def _ensure_loop(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            ready = threading.Event()
+
+            def run():
+                self.loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self.loop)
+                ready.set()
+                self.loop.run_forever()
+
+            self.thread = threading.Thread(target=run, name='BulkStreamLoop', daemon=True)
+            self.thread.start()
+            ready.wait()
+
+    def submit(self, worker):
+        self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(self._run_worker(worker), self.loop)
+
+    def _get_client(self):
+        # Created lazily on the loop thread; one pool shared by all sessions
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(120.0, connect=10.0),  # read, connect
+                limits=httpx.Limits(max_connections=BULK_ASYNC_MAX_STREAMS, max_keepalive_connections=20),
+            )
+        return self.client
+
+    async def _call(self, fn, *args):
+        return await self.loop.run_in_executor(self.executor, fn, *args)
+
+    async def _backpressure(self, worker):
+        # Same bounds as SessionWorker._apply_backpressure, awaited instead of slept
+        from .stream_manager import BACKPRESSURE_MAX_WAIT
+
+        if not worker._saturated():
+            return
+        started = time.monotonic()
+        deadline = started + BACKPRESSURE_MAX_WAIT
+        while not worker.stop_event.is_set() and time.monotonic() < deadline and worker._saturated():
+            await asyncio.sleep(0.02)
+        worker._end_backpressure(started, deadline)
+
+    async def _run_worker(self, worker):
+        self.active += 1
+        try:
+            await self._stream(worker)
+        except Exception:
+            logger.exception("Async bulk stream for session %s crashed", worker.session_id)
+        finally:
+            self.active -= 1
+            try:
+                await self._call(worker._on_exit)
+            finally:
+                worker._async_running = False
+
+    async def _stream(self, worker):
+        from .stream_manager import UPSTREAM_STREAM_URL
+
+        attempts = 0
+        while not worker.stop_event.is_set():
+            try:
+                async with self._get_client().stream('POST', UPSTREAM_STREAM_URL, **worker._upstream_request()) as resp:
+                    if resp.status_code >= 400:
+                        body = (await resp.aread()).decode('utf-8', 'replace')
+                        await self._call(worker._fail, {
+                            'stage': 'error',
+                            'error': f'Upstream stream failed ({resp.status_code})',
+                            'raw': body[:300],
+                        })
+                        return
+
+                    reader = SSEReader()
+                    async for chunk in resp.aiter_text():
+                        if worker.stop_event.is_set():
+                            break
+                        await self._call(worker._handle_chunk, chunk, reader)
+                        await self._backpressure(worker)
+                    if not worker.stop_event.is_set():
+                        await self._call(worker._handle_items, reader.close())
+
+                await self._call(worker._finish_stream)
+                return
+
+            except httpx.RemoteProtocolError as e:
+                attempts += 1
+                delay = await self._call(worker._retry_delay, attempts, f'Chunked encoding ended prematurely: {e}')
+            except httpx.TransportError as e:
+                attempts += 1
+                delay = await self._call(worker._retry_delay, attempts, f'Upstream connection error: {e}')
+            except Exception as e:
+                await self._call(worker._fail, {'stage': 'error', 'error': f'Worker crashed: {e}'})
+                return
+            if delay is None:
+                return
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        return {'active_streams': self.active, 'loop_alive': bool(self.thread and self.thread.is_alive())}
+
+
+_engine: Optional[AsyncStreamEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> Optional[AsyncStreamEngine]:
+    """
+    The process-wide engine, or None when httpx is not installed.
+    """
+    global _engine
+    if httpx is None:
+        return None
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AsyncStreamEngine()
+    return _engine
@@ -0,0 +1,216 @@
+import base64
+import json
+import math
+import re
+import zlib
+from typing import Any, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json only
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional: result files fall back to zlib
+    zstandard = None
+
+# 'auto' uses orjson when installed, 'json' forces the stdlib encoder
+BULK_JSON_CODEC = getattr(settings, 'BULK_JSON_CODEC', 'auto')
+# Stored result_file format: 'auto' (zstd when installed, else zlib), 'zstd', 'zlib' or 'none'
+BULK_RESULT_COMPRESSION = getattr(settings, 'BULK_RESULT_COMPRESSION', 'auto')
+BULK_RESULT_ZLIB_LEVEL = int(getattr(settings, 'BULK_RESULT_ZLIB_LEVEL', 6))
+BULK_RESULT_ZSTD_LEVEL = int(getattr(settings, 'BULK_RESULT_ZSTD_LEVEL', 6))
+
+# A compressed result_file is one header char plus the base64 of the compressed
+# JSON (the column is text). Plain JSON never starts with these, so legacy rows
+# keep reading as they are.
+RESULT_HEADERS = {'zlib': 'z', 'zstd': 's'}
+
+# Number tokens the two encoders spell differently: exponents ("1e16" vs "1e+16")
+# and small floats ("0.00001" vs "1e-05"). Candidates are found with bytes.find
+# over a digit-folded copy (a regex over the whole body costs more than the
+# encode itself) and confirmed by checking that they sit in a number token.
+_FOLD_DIGITS = bytes.maketrans(b'123456789', b'000000000')
+_DIVERGENT_NUMBER = re.compile(rb'[:,\[]-?(?:\d+(?:\.\d+)?[eE]|0\.0000)')
+_NUMBER_CHARS = frozenset(b'0123456789.-')
+_SURROGATE = re.compile('[\ud800-\udfff]')
+
+
+def _in_number(raw: bytes, i: int) -> bool:
+    start = i
+    while start > 0 and raw[start - 1] in _NUMBER_CHARS:
+        start -= 1
+    return start > 0 and _DIVERGENT_NUMBER.match(raw, start - 1) is not None
+
+
+def _divergent(raw: bytes) -> bool:
+    folded = raw.translate(_FOLD_DIGITS)
+    i = folded.find(b'0e')
+    while i != -1:
+        if _in_number(raw, i):
+            return True
+        i = folded.find(b'0e', i + 1)
+    i = raw.find(b'0.0000')
+    while i != -1:
+        if _in_number(raw, i):
+            return True
+        i = raw.find(b'0.0000', i + 1)
+    return False
+
+
+def _use_orjson() -> bool:
+    return orjson is not None and BULK_JSON_CODEC != 'json'
+
+
+def _non_finite(constant: str) -> None:
+    # NaN/Infinity are not JSON; both backends read and write them as null
+    return None
+
+
+def _finite(obj: Any) -> Any:
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _stdlib_encode(obj: Any, ensure_ascii: bool) -> str:
+    try:
+        return json.dumps(obj, ensure_ascii=ensure_ascii, separators=(',', ':'), allow_nan=False)
+    except ValueError:
+        return json.dumps(_finite(obj), ensure_ascii=ensure_ascii, separators=(',', ':'), allow_nan=False)
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    text = _stdlib_encode(obj, False)
+    if _SURROGATE.search(text) is None:
+        return text
+    # Lone surrogates have no UTF-8 form; escape them (\ud800) as json.dumps does by default
+    return _stdlib_encode(obj, True)
+
+
+def _stdlib_dumpb(obj: Any) -> bytes:
+    text = _stdlib_encode(obj, False)
+    try:
+        return text.encode('utf-8')
+    except UnicodeEncodeError:
+        return _stdlib_encode(obj, True).encode('ascii')
+
+
+def _orjson_dumps(obj: Any) -> Optional[bytes]:
+    """
+    orjson's encoding of `obj`, or None where it may differ from the stdlib one.
+    """
+    if not _use_orjson():
+        return None
+    try:
+        raw = orjson.dumps(obj, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+    except TypeError:
+        # Non-str keys, ints over 64 bits, unsupported types: let the stdlib decide
+        return None
+    if _divergent(raw):
+        return None
+    return raw
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize to compact UTF-8 JSON. The output is byte-identical whichever
+    backend runs, so BULK_JSON_CODEC can be flipped without changing stored
+    result files or ETags.
+    """
+    raw = _orjson_dumps(obj)
+    return raw.decode('utf-8') if raw is not None else _stdlib_dumps(obj)
+
+
+def dumpb(obj: Any) -> bytes:
+    """
+    `dumps` as UTF-8 bytes, for response bodies.
+    """
+    raw = _orjson_dumps(obj)
+    return raw if raw is not None else _stdlib_dumpb(obj)
+
+
+def loads(data: Any) -> Any:
+    if _use_orjson():
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity and lone surrogates; the stdlib accepts them
+            pass
+    return json.loads(data, parse_constant=_non_finite)
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    """
+    JsonResponse counterpart encoded with `dumpb`.
+    """
+    return HttpResponse(dumpb(data), status=status, content_type='application/json')
+
+
+def result_compression(mode: Optional[str] = None) -> str:
+    """
+    Resolve a compression setting to the format new result files are written in.
+    """
+    mode = (mode or BULK_RESULT_COMPRESSION).lower()
+    if mode == 'auto' or (mode == 'zstd' and zstandard is None):
+        return 'zstd' if zstandard is not None else 'zlib'
+    if mode not in ('zlib', 'none'):
+        raise ValueError(f"Unknown result compression '{mode}'")
+    return mode
+
+
+def result_format(stored: str) -> str:
+    for mode, header in RESULT_HEADERS.items():
+        if stored.startswith(header):
+            return mode
+    return 'none'
+
+
+def pack_result(raw: bytes, mode: Optional[str] = None) -> str:
+    """
+    Encode serialized JSON for the result_file column.
+    """
+    mode = result_compression(mode)
+    if mode == 'zstd':
+        body = zstandard.ZstdCompressor(level=BULK_RESULT_ZSTD_LEVEL).compress(raw)
+    elif mode == 'zlib':
+        body = zlib.compress(raw, BULK_RESULT_ZLIB_LEVEL)
+    else:
+        return raw.decode('utf-8')
+    return RESULT_HEADERS[mode] + base64.b64encode(body).decode('ascii')
+
+
+def unpack_result(stored: str) -> bytes:
+    """
+    The JSON bytes behind a result_file value, whichever format it was stored in.
+    """
+    mode = result_format(stored or '')
+    if mode == 'none':
+        return (stored or '').encode('utf-8')
+    body = base64.b64decode(stored[1:])
+    if mode == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('result_file is zstd-compressed but zstandard is not installed')
+        return zstandard.ZstdDecompressor().decompress(body)
+    return zlib.decompress(body)
+
+
+def dump_result_file(payload: Any) -> Tuple[str, int]:
+    """
+    Serialize and compress a result payload; returns (stored value, JSON size in bytes).
+    """
+    raw = dumpb(payload)
+    return pack_result(raw), len(raw)
+
+
+def load_result_file(stored: str) -> Any:
+    raw = unpack_result(stored)
+    return loads(raw) if raw.strip() else None
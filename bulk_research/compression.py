@@ -0,0 +1,69 @@
+import gzip
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Bodies smaller than this go out uncompressed
+BULK_COMPRESS_MIN_BYTES = int(getattr(settings, 'BULK_COMPRESS_MIN_BYTES', 1024))
+BULK_GZIP_LEVEL = int(getattr(settings, 'BULK_GZIP_LEVEL', 6))
+BULK_BROTLI_QUALITY = int(getattr(settings, 'BULK_BROTLI_QUALITY', 5))
+
+
+def _accepts_encoding(request, coding: str) -> bool:
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.partition(';')
+        if name.strip().lower() != coding:
+            continue
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def compress_response(request, response):
+    """
+    Brotli- (when installed) or gzip-encode a buffered response in place if the
+    client accepts it and the body is large enough.
+    """
+    if (response.streaming or response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or len(response.content) < BULK_COMPRESS_MIN_BYTES):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    if brotli is not None and _accepts_encoding(request, 'br'):
+        body, coding = brotli.compress(response.content, quality=BULK_BROTLI_QUALITY), 'br'
+    elif _accepts_encoding(request, 'gzip'):
+        body, coding = gzip.compress(response.content, compresslevel=BULK_GZIP_LEVEL, mtime=0), 'gzip'
+    else:
+        return response
+
+    response.content = body
+    response['Content-Length'] = str(len(body))
+    response['Content-Encoding'] = coding
+    # The encoded bytes differ from the identity ones; a strong ETag would be wrong
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
+
+
+def compressed(view_func):
+    """
+    View decorator applying compress_response; the JSON-only counterpart of
+    Django's gzip_page with optional brotli.
+    """
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        return compress_response(request, view_func(request, *args, **kwargs))
+    return _wrapped
@@ -0,0 +1,49 @@
+import csv
+from typing import Any, Dict, Iterable
+
+from . import codec
+from .result_store import iter_simplified
+
+# Flat columns written by the CSV export; nested values are flattened below
+CSV_COLUMNS = [
+    'listing_id', 'title', 'url', 'demand', 'price_value', 'price_currency',
+    'sale_price_value', 'num_favorers', 'views', 'review_average', 'review_count',
+    'quantity', 'made_at_iso', 'last_modified_iso', 'shop_name', 'tags',
+]
+
+
+class _Echo:
+    # csv.writer target that hands each formatted row straight back
+    def write(self, value):
+        return value
+
+
+def _csv_row(entry: Dict[str, Any]):
+    shop = entry.get('shop') or {}
+    row = []
+    for col in CSV_COLUMNS:
+        if col == 'shop_name':
+            val = shop.get('shop_name') if isinstance(shop, dict) else ''
+        elif col == 'tags':
+            val = '|'.join(str(t) for t in (entry.get('tags') or []))
+        else:
+            val = entry.get(col)
+        row.append('' if val is None else val)
+    return row
+
+
+def ndjson_lines(session_id: int) -> Iterable[str]:
+    # Rows already hold serialized entries; nothing is re-encoded
+    for line in iter_simplified(session_id):
+        yield line + '\n'
+
+
+def csv_lines(session_id: int) -> Iterable[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for line in iter_simplified(session_id):
+        try:
+            entry = codec.loads(line)
+        except Exception:
+            continue
+        yield writer.writerow(_csv_row(entry))
@@ -0,0 +1,252 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Lines longer than this are parsed incrementally instead of being buffered whole
+SPILL_LINE_CHARS = 256 * 1024
+
+_WS = ' \t\r\n'
+_decoder = json.JSONDecoder()
+
+
+class EntriesParser:
+    """
+    Incremental parser for one JSON document carrying an entries array at
+    `entries` or `megafile.entries`. Feed it text as it arrives; each complete
+    entry is decoded and returned as soon as it is available, so only the
+    unparsed tail (about one entry) is buffered. The rest of the document is
+    kept as `envelope`, with the entries array left empty.
+    """
+
+    def __init__(self):
+        self.buf = ''
+        self.pos = 0
+        self.state = 'prefix'  # prefix -> entries -> suffix -> done
+        # Scanner state for everything outside the entries array
+        self.stack: List[List[Any]] = []  # frames: ['{', last_key, expect_key] or ['[']
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        # Start of an object key cut off by the end of a chunk
+        self.key_head = ''
+        self.envelope_parts: List[str] = []
+        self.envelope: Optional[Dict[str, Any]] = None
+        self.count = 0
+        # Only retry decoding an incomplete entry once this much text is buffered
+        self.retry_at = 0
+
+    @property
+    def done(self) -> bool:
+        return self.state == 'done'
+
+    def feed(self, text: str) -> List[Any]:
+        if self.state == 'done' or not text:
+            return []
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.string_start = max(0, self.string_start - self.pos)
+            self.pos = 0
+        self.buf += text
+        return self._run(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Parse whatever is left; raises ValueError if the document is incomplete.
+        """
+        out = self._run(final=True)
+        if self.state != 'done':
+            raise ValueError('Incomplete JSON document')
+        return out
+
+    def _run(self, final: bool) -> List[Any]:
+        out: List[Any] = []
+        while True:
+            if self.state in ('prefix', 'suffix'):
+                if not self._scan():
+                    return out
+            elif self.state == 'entries':
+                if not self._entries(out, final):
+                    return out
+            else:
+                return out
+
+    def _path(self) -> List[Optional[str]]:
+        return [f[1] for f in self.stack[:-1] if f[0] == '{']
+
+    def _scan(self) -> bool:
+        """
+        Walk the envelope char by char. Returns True on a state change and
+        False when more input is needed.
+        """
+        buf = self.buf
+        i = self.pos
+        start = i
+        n = len(buf)
+        while i < n:
+            ch = buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    frame = self.stack[-1] if self.stack else None
+                    if frame and frame[0] == '{' and frame[2]:
+                        # Key just closed; only short keys are decoded
+                        key = self.key_head + buf[self.string_start:i + 1]
+                        frame[1] = json.loads(key) if len(key) < 256 else None
+                        frame[2] = False
+                    self.key_head = ''
+                i += 1
+                continue
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch in '{[':
+                frame = self.stack[-1] if self.stack else None
+                if (ch == '[' and frame and frame[0] == '{' and frame[1] == 'entries'
+                        and self.state == 'prefix' and self._path() in ([], ['megafile'])):
+                    self.envelope_parts.append(buf[start:i + 1])
+                    self.pos = i + 1
+                    self.state = 'entries'
+                    return True
+                self.stack.append(['{', None, True] if ch == '{' else ['['])
+            elif ch in '}]':
+                if self.stack:
+                    self.stack.pop()
+                if not self.stack:
+                    self.envelope_parts.append(buf[start:i + 1])
+                    self.pos = i + 1
+                    self._finish()
+                    return True
+            elif ch == ',':
+                frame = self.stack[-1] if self.stack else None
+                if frame and frame[0] == '{':
+                    frame[2] = True
+            i += 1
+        frame = self.stack[-1] if self.stack else None
+        if self.in_string and frame and frame[0] == '{' and frame[2] and len(self.key_head) < 256:
+            # Keep the part of a key seen so far; the buffer is trimmed on the next feed
+            self.key_head += buf[self.string_start:i]
+            self.string_start = i
+        self.envelope_parts.append(buf[start:i])
+        self.pos = i
+        return False
+
+    def _entries(self, out: List[Any], final: bool) -> bool:
+        buf = self.buf
+        n = len(buf)
+        while True:
+            i = self.pos
+            while i < n and (buf[i] in _WS or buf[i] == ','):
+                i += 1
+            self.pos = i
+            if i >= n:
+                return False
+            if buf[i] == ']':
+                self.envelope_parts.append(']')
+                self.pos = i + 1
+                self.state = 'suffix'
+                return True
+            if not final and n < self.retry_at:
+                return False
+            try:
+                value, end = _decoder.raw_decode(buf, i)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError('Malformed entry in entries array')
+                # Incomplete entry: wait until the unparsed tail has doubled
+                self.retry_at = n + max(n - i, 4096)
+                return False
+            if end >= n and not final and not isinstance(value, (dict, list, str)):
+                # A bare number at the end of the buffer may still be growing
+                return False
+            out.append(value)
+            self.count += 1
+            self.pos = end
+            self.retry_at = 0
+
+    def _finish(self):
+        self.state = 'done'
+        try:
+            self.envelope = json.loads(''.join(self.envelope_parts))
+        except Exception:
+            self.envelope = None
+        self.envelope_parts = []
+        self.buf = ''
+        self.pos = 0
+
+
+class SSEReader:
+    """
+    Split decoded text chunks into lines. Lines shorter than SPILL_LINE_CHARS
+    come back as ('line', text). A longer line is not accumulated: its JSON
+    payload (after an optional 'data:' prefix) goes through an EntriesParser,
+    and the line comes back as ('document', (envelope, entries)) once it ends.
+    """
+
+    def __init__(self, spill_at: int = SPILL_LINE_CHARS):
+        self.spill_at = spill_at
+        self.pending: List[str] = []
+        self.pending_len = 0
+        self.parser: Optional[EntriesParser] = None
+        self.entries: List[Any] = []
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        out: List[Tuple[str, Any]] = []
+        while text:
+            nl = text.find('\n')
+            part = text if nl < 0 else text[:nl]
+            if self.parser is not None:
+                self.entries.extend(self.parser.feed(part))
+            else:
+                self.pending.append(part)
+                self.pending_len += len(part)
+                if self.pending_len >= self.spill_at:
+                    self._spill()
+            if nl < 0:
+                break
+            out.append(self._end_line())
+            text = text[nl + 1:]
+        return out
+
+    def close(self) -> List[Tuple[str, Any]]:
+        if self.parser is None and not self.pending:
+            return []
+        return [self._end_line()]
+
+    def _spill(self):
+        head = ''.join(self.pending).lstrip()
+        self.pending = []
+        self.pending_len = 0
+        if head.startswith('data:'):
+            head = head[5:]
+        self.parser = EntriesParser()
+        self.entries = list(self.parser.feed(head))
+
+    def _end_line(self) -> Tuple[str, Any]:
+        if self.parser is None:
+            line = ''.join(self.pending)
+            self.pending = []
+            self.pending_len = 0
+            return ('line', line)
+        parser, entries = self.parser, self.entries
+        self.parser = None
+        self.entries = []
+        try:
+            entries.extend(parser.close())
+        except ValueError:
+            return ('document', (None, entries))
+        return ('document', (parser.envelope, entries))
+
+
+def attach_entries(envelope: Optional[Dict[str, Any]], entries: List[Any]) -> Dict[str, Any]:
+    """
+    Put parsed entries back where the envelope had them.
+    """
+    evt = dict(envelope or {})
+    if isinstance(evt.get('megafile'), dict) and 'entries' in evt['megafile']:
+        evt['megafile'] = dict(evt['megafile'], entries=entries)
+    else:
+        evt['entries'] = entries
+    return evt
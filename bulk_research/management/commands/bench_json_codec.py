@@ -0,0 +1,80 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bulk_research import codec
+from bulk_research.normalizer import simplify_result_entries
+from bulk_research.sample_data import make_megafile
+
+
+def _best(fn, rounds):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _edge_payloads(rnd):
+    # Values where the encoders are known to disagree, one payload each
+    floats = [1e15, 1e16, 1.5e300, 1e-4, 1e-5, -2e-9, 5e-324, 0.1, -0.0, 123456789.125]
+    floats += [rnd.uniform(-1e6, 1e6) for _ in range(200)]
+    floats += [10 ** rnd.uniform(-12, 20) for _ in range(200)]
+    payloads = [{'v': f} for f in floats]
+    payloads += [[i] for i in (0, -1, 2 ** 53, 2 ** 63, 2 ** 64, -2 ** 63)]
+    payloads += [{'s': s} for s in ('\x00\x1f\x7f', '\u2028', 'é“ü”', '"\\/', 'a:1e5', '[0.00001]', 'x,3e-4')]
+    payloads += [{1: 'a', 2: 'b'}, [float('nan'), float('inf')], {'t': True, 'n': None}]
+    # Lone surrogates (half of an emoji pair) are escaped rather than encoded
+    payloads += [{'t': 'a\ud800b'}, {'t': '\udfff é'}, ['\ud83d']]
+    return payloads
+
+
+class Command(BaseCommand):
+    help = "Benchmark bulk_research.codec (orjson when installed) against stdlib json on synthetic megafiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=1000, help='Entries in the synthetic megafile')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per case (best is reported)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **opts):
+        if opts['entries'] <= 0 or opts['rounds'] <= 0:
+            raise CommandError('--entries and --rounds must be positive')
+        megafile = make_megafile(opts['entries'], opts['seed'])
+        entries = megafile['megafile']['entries']
+        simplified = simplify_result_entries(entries)
+        configured = codec.BULK_JSON_CODEC
+
+        self.stdout.write(f"orjson: {'installed' if codec.orjson is not None else 'not installed'}; "
+                          f"BULK_JSON_CODEC={configured}")
+
+        # Byte identity between backends, on the fixtures and on edge values
+        outputs = {}
+        try:
+            for backend in ('json', 'auto'):
+                codec.BULK_JSON_CODEC = backend
+                payloads = [megafile] + simplified + _edge_payloads(random.Random(opts['seed']))
+                outputs[backend] = [codec.dumps(p) for p in payloads]
+        finally:
+            codec.BULK_JSON_CODEC = configured
+        mismatches = sum(1 for a, b in zip(outputs['json'], outputs['auto']) if a != b)
+        self.stdout.write(f"identity: {len(outputs['json']) - mismatches}/{len(outputs['json'])} payloads byte-identical")
+        if mismatches:
+            raise CommandError(f'{mismatches} payloads differ between backends')
+
+        text = codec.dumps(megafile)
+        self.stdout.write(f"megafile: {len(entries)} entries, {len(text.encode('utf-8')) / 1e6:.1f} MB")
+        cases = [
+            ('dumps megafile', lambda: json.dumps(megafile), lambda: codec.dumps(megafile)),
+            ('loads megafile', lambda: json.loads(text), lambda: codec.loads(text)),
+            ('dumps simplified rows', lambda: [json.dumps(e) for e in simplified],
+             lambda: [codec.dumps(e) for e in simplified]),
+        ]
+        for label, stdlib_fn, codec_fn in cases:
+            base = _best(stdlib_fn, opts['rounds'])
+            fast = _best(codec_fn, opts['rounds'])
+            self.stdout.write(f"{label:24s} json {base * 1000:8.1f} ms   codec {fast * 1000:8.1f} ms   x{base / fast:.1f}")
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bulk_research import codec
+from bulk_research.models import BulkResearchSession
+
+
+class Command(BaseCommand):
+    help = "Rewrite stored result_file payloads in the configured (or given) compression format, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compression', choices=['auto', 'zstd', 'zlib', 'none'], default=None,
+                            help='Target format (default: BULK_RESULT_COMPRESSION)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Sessions rewritten per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report savings without writing')
+
+    def handle(self, *args, **opts):
+        try:
+            target = codec.result_compression(opts['compression'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        batch_size = opts['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size must be positive')
+
+        seen = rewritten = failed = 0
+        before = after = 0
+        last_id = 0
+        while True:
+            # Keyset over ids; only one batch of payloads is held in memory at a time
+            rows = list(
+                BulkResearchSession.objects.filter(id__gt=last_id)
+                .exclude(result_file='')
+                .order_by('id')
+                .values_list('id', 'result_file')[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = []
+            for sid, stored in rows:
+                seen += 1
+                if codec.result_format(stored) == target:
+                    continue
+                try:
+                    packed = codec.pack_result(codec.unpack_result(stored), target)
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"session {sid}: {e}")
+                    continue
+                before += len(stored)
+                after += len(packed)
+                updates.append(BulkResearchSession(id=sid, result_file=packed))
+            if updates and not opts['dry_run']:
+                with transaction.atomic():
+                    # The JSON is unchanged, so result_version (and ETags) stay as they are
+                    BulkResearchSession.objects.bulk_update(updates, ['result_file'])
+            rewritten += len(updates)
+            self.stdout.write(f"... {seen} sessions scanned, {rewritten} rewritten")
+
+        ratio = f" ({before / after:.1f}x)" if after else ''
+        verb = 'would rewrite' if opts['dry_run'] else 'rewrote'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {rewritten} of {seen} result files as {target}: "
+            f"{before / 1e6:.1f} MB -> {after / 1e6:.1f} MB{ratio}; {failed} failed"
+        ))
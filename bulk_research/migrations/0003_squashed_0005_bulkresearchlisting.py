@@ -0,0 +1,44 @@
+# Squashes 0003-0005: the session-level simplified_entries/simplified_version
+# and simplified_order columns were added and then dropped again in favour of
+# per-listing rows, so only the listing table is created.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('bulk_research', '0003_simplified_entries'),
+        ('bulk_research', '0004_simplified_order'),
+        ('bulk_research', '0005_bulkresearchlisting'),
+    ]
+
+    dependencies = [
+        ('bulk_research', '0002_bulkresearchsession_external_session_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkResearchListing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('listing_id', models.CharField(max_length=64)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('demand', models.FloatField(blank=True, null=True)),
+                ('price_value', models.FloatField(blank=True, null=True)),
+                ('num_favorers', models.IntegerField(blank=True, null=True)),
+                ('views', models.IntegerField(blank=True, null=True)),
+                ('created_ts', models.BigIntegerField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('data_hash', models.CharField(blank=True, default='', max_length=40)),
+                ('simplified', models.TextField(blank=True, default='')),
+                ('simplified_version', models.PositiveSmallIntegerField(default=0)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listings', to='bulk_research.bulkresearchsession')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', 'position'], name='bulk_listing_position_idx'), models.Index(fields=['session', '-demand', 'position'], name='bulk_listing_demand_idx'), models.Index(fields=['session', '-price_value', 'position'], name='bulk_listing_price_idx'), models.Index(fields=['session', '-num_favorers', 'position'], name='bulk_listing_favorers_idx'), models.Index(fields=['session', '-views', 'position'], name='bulk_listing_views_idx'), models.Index(fields=['session', '-created_ts', 'position'], name='bulk_listing_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('session', 'listing_id'), name='bulk_listing_unique_per_session')],
+            },
+        ),
+    ]
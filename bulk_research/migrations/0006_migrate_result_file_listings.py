@@ -0,0 +1,58 @@
+import hashlib
+import json
+
+from django.db import migrations
+
+
+def _entries(result_file):
+    try:
+        raw = json.loads(result_file) if result_file else None
+    except Exception:
+        return []
+    if isinstance(raw, dict):
+        if isinstance(raw.get('entries'), list):
+            return raw['entries']
+        if isinstance(raw.get('megafile'), dict) and isinstance(raw['megafile'].get('entries'), list):
+            return raw['megafile']['entries']
+    return []
+
+
+def forwards(apps, schema_editor):
+    """
+    Split each session's megafile into listing rows. Rows are written with
+    simplified_version=0 so derived columns are filled lazily on first read.
+    """
+    Session = apps.get_model('bulk_research', 'BulkResearchSession')
+    Listing = apps.get_model('bulk_research', 'BulkResearchListing')
+    session_ids = list(Session.objects.exclude(result_file='').values_list('id', flat=True))
+    for session_id in session_ids:
+        result_file = Session.objects.filter(id=session_id).values_list('result_file', flat=True).first()
+        rows = {}
+        for position, entry in enumerate(_entries(result_file)):
+            if not isinstance(entry, dict):
+                continue
+            popular = entry.get('popular_info') or {}
+            lid = entry.get('listing_id') or popular.get('listing_id')
+            lid = str(lid)[:64] if lid not in (None, '') else f'pos-{position}'
+            digest = hashlib.sha1(json.dumps(entry, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+            rows[lid] = Listing(
+                session_id=session_id,
+                listing_id=lid,
+                position=position,
+                data=entry,
+                data_hash=digest,
+                simplified_version=0,
+            )
+        if rows:
+            Listing.objects.bulk_create(list(rows.values()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bulk_research', '0003_squashed_0005_bulkresearchlisting'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:54
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def backfill(apps, schema_editor):
+    """
+    Fill the stats columns from existing rows. Summaries of rows written by
+    0006 stay empty until those rows are rebuilt on first read.
+    """
+    Session = apps.get_model('bulk_research', 'BulkResearchSession')
+    Listing = apps.get_model('bulk_research', 'BulkResearchListing')
+    # result_bytes is a byte count; SQL LENGTH() counts characters on Postgres
+    session_ids = list(Session.objects.exclude(result_file='').values_list('id', flat=True))
+    for session_id in session_ids:
+        result_file = Session.objects.filter(id=session_id).values_list('result_file', flat=True).first() or ''
+        Session.objects.filter(id=session_id).update(result_bytes=len(result_file.encode('utf-8')))
+    stats = (
+        Listing.objects.values('session_id')
+        .annotate(count=Count('id'), top_demand=Max('demand'), price_min=Min('price_value'), price_max=Max('price_value'))
+    )
+    for row in stats:
+        session_id = row.pop('session_id')
+        Session.objects.filter(id=session_id).update(entries_count=row.pop('count'), result_summary=row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bulk_research', '0006_migrate_result_file_listings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkresearchsession',
+            name='entries_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkresearchsession',
+            name='result_bytes',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bulkresearchsession',
+            name='result_summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
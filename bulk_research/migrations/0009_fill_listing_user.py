@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def fill_listing_user(apps, schema_editor):
+    Session = apps.get_model('bulk_research', 'BulkResearchSession')
+    Listing = apps.get_model('bulk_research', 'BulkResearchListing')
+    Listing.objects.filter(user__isnull=True).update(
+        user=Subquery(Session.objects.filter(id=OuterRef('session_id')).values('user_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Kept apart from the NOT NULL change in 0010: on PostgreSQL the UPDATE
+    leaves deferred FK trigger events that block an ALTER TABLE in the same
+    transaction.
+    """
+
+    dependencies = [
+        ('bulk_research', '0008_listing_user_and_result_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_listing_user, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bulk_research', '0009_fill_listing_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bulkresearchlisting',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='bulk_listings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='bulkresearchlisting',
+            index=models.Index(fields=['user', '-session', 'position', 'id'], name='bulk_listing_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bulkresearchlisting',
+            index=models.Index(fields=['user', 'listing_id'], name='bulk_listing_user_lid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bulkresearchlisting',
+            index=models.Index(fields=['user', '-demand', 'id'], name='bulk_listing_user_demand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bulkresearchlisting',
+            index=models.Index(fields=['user', '-price_value', 'id'], name='bulk_listing_user_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bulkresearchlisting',
+            index=models.Index(fields=['user', '-num_favorers', 'id'], name='bulk_listing_user_favorers_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bulkresearchlisting',
+            index=models.Index(fields=['user', '-views', 'id'], name='bulk_listing_user_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bulkresearchlisting',
+            index=models.Index(fields=['user', '-created_ts', 'id'], name='bulk_listing_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    The price sort column now holds the sale price when there is one. Existing
+    values are the list price until their rows are rebuilt, which the schema
+    version bump triggers on the next read.
+    """
+
+    dependencies = [
+        ('bulk_research', '0010_listing_user_not_null'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='bulkresearchlisting',
+            old_name='price_value',
+            new_name='effective_price',
+        ),
+        # The database indexes follow the renamed column; only the recorded
+        # index definitions need the new name
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.RemoveIndex(model_name='bulkresearchlisting', name='bulk_listing_price_idx'),
+            migrations.RemoveIndex(model_name='bulkresearchlisting', name='bulk_listing_user_price_idx'),
+            migrations.AddIndex(
+                model_name='bulkresearchlisting',
+                index=models.Index(fields=['session', '-effective_price', 'position'], name='bulk_listing_price_idx'),
+            ),
+            migrations.AddIndex(
+                model_name='bulkresearchlisting',
+                index=models.Index(fields=['user', '-effective_price', 'id'], name='bulk_listing_user_price_idx'),
+            ),
+        ]),
+    ]
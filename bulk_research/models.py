@@ -13,11 +13,18 @@ class BulkResearchSession(models.Model):
     desired_total = models.PositiveIntegerField(default=20)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ongoing')
     progress = models.JSONField(default=dict, blank=True)
+    # Plain JSON (legacy) or compressed JSON behind a one-char header; read via codec.load_result_file
     result_file = models.TextField(blank=True, default='')
     external_session_id = models.CharField(max_length=200, blank=True, null=True, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Maintained by result_store on every write so list views never parse result_file
+    entries_count = models.PositiveIntegerField(default=0)
+    result_bytes = models.PositiveBigIntegerField(default=0)
+    result_summary = models.JSONField(default=dict, blank=True)  # top_demand, price_min, price_max
+    # Bumped on every result write; clients compare it to skip refetching unchanged sessions
+    result_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.keyword} ({self.status})"
@@ -29,4 +36,51 @@ class BulkResearchSession(models.Model):
             'splitting': {'total': total, 'remaining': total},
             'demand': {'total': total, 'remaining': total},
             'keywords': {'total': total, 'remaining': total},
-        }
\ No newline at end of file
+        }
+
+class BulkResearchListing(models.Model):
+    """
+    One upstream listing of a bulk research session. Sort columns are
+    denormalized from the simplified entry; `data` keeps the raw entry.
+    """
+    session = models.ForeignKey(BulkResearchSession, on_delete=models.CASCADE, related_name='listings')
+    # Denormalized from session so cross-session reads can walk per-user indexes
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bulk_listings', db_index=False)
+    listing_id = models.CharField(max_length=64)
+    position = models.PositiveIntegerField(default=0)
+    demand = models.FloatField(null=True, blank=True)
+    # Sale price when there is one, else the list price (see result_store.effective_price)
+    effective_price = models.FloatField(null=True, blank=True)
+    num_favorers = models.IntegerField(null=True, blank=True)
+    views = models.IntegerField(null=True, blank=True)
+    created_ts = models.BigIntegerField(null=True, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    data_hash = models.CharField(max_length=40, blank=True, default='')
+    # Serialized simplified entry, see result_store
+    simplified = models.TextField(blank=True, default='')
+    simplified_version = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'listing_id'], name='bulk_listing_unique_per_session'),
+        ]
+        # Top-N reads scan the non-null part of a sort column in (col DESC, position) order
+        indexes = [
+            models.Index(fields=['session', 'position'], name='bulk_listing_position_idx'),
+            models.Index(fields=['session', '-demand', 'position'], name='bulk_listing_demand_idx'),
+            models.Index(fields=['session', '-effective_price', 'position'], name='bulk_listing_price_idx'),
+            models.Index(fields=['session', '-num_favorers', 'position'], name='bulk_listing_favorers_idx'),
+            models.Index(fields=['session', '-views', 'position'], name='bulk_listing_views_idx'),
+            models.Index(fields=['session', '-created_ts', 'position'], name='bulk_listing_created_idx'),
+            # Cross-session ("all sessions") reads, see result_store.user_listing_page
+            models.Index(fields=['user', '-session', 'position', 'id'], name='bulk_listing_user_recent_idx'),
+            models.Index(fields=['user', 'listing_id'], name='bulk_listing_user_lid_idx'),
+            models.Index(fields=['user', '-demand', 'id'], name='bulk_listing_user_demand_idx'),
+            models.Index(fields=['user', '-effective_price', 'id'], name='bulk_listing_user_price_idx'),
+            models.Index(fields=['user', '-num_favorers', 'id'], name='bulk_listing_user_favorers_idx'),
+            models.Index(fields=['user', '-views', 'id'], name='bulk_listing_user_views_idx'),
+            models.Index(fields=['user', '-created_ts', 'id'], name='bulk_listing_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} (session {self.session_id})"
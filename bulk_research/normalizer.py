@@ -0,0 +1,445 @@
+import functools
+import re
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Optional
+
+# Compiled once; these used to be rebuilt for every entry
+_PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+_NON_PRICE_CHARS_RE = re.compile(r'[^0-9.]')
+
+# Simple top-level fields: (output key, source key, popular_info first?, default,
+# list only?). The first truthy source wins, then the default when one is given
+# (None keeps the second source's falsy value, as `a or b` did); a non-list value
+# of a list field becomes [].
+ENTRY_FIELDS = (
+    ('listing_id', 'listing_id', False, '', False),
+    ('title', 'title', True, '', False),
+    ('url', 'url', True, '', False),
+    ('user_id', 'user_id', False, None, False),
+    ('shop_id', 'shop_id', False, None, False),
+    ('state', 'state', False, '', False),
+    ('description', 'description', True, '', False),
+    ('tags', 'tags', True, None, True),
+    ('materials', 'materials', True, None, True),
+    ('keywords', 'keywords', False, None, True),
+    ('quantity', 'quantity', False, None, False),
+    ('num_favorers', 'num_favorers', False, None, False),
+    ('listing_type', 'listing_type', False, '', False),
+    ('file_data', 'file_data', False, '', False),
+    ('views', 'views', False, None, False),
+)
+
+# Shop fields in output order; those not computed are copied from shop details
+SHOP_FIELDS = (
+    'shop_id', 'shop_name', 'user_id', 'created_timestamp', 'created_iso', 'created', 'title',
+    'announcement', 'currency_code', 'is_vacation', 'vacation_message', 'sale_message',
+    'digital_sale_message', 'updated_timestamp', 'updated_iso', 'updated', 'listing_active_count',
+    'digital_listing_count', 'login_name', 'accepts_custom_requests', 'vacation_autoreply', 'url',
+    'image_url_760x100', 'icon_url_fullxfull', 'num_favorers', 'languages', 'review_average',
+    'review_count', 'sections', 'reviews', 'shipping_from_country_iso', 'transaction_sold_count',
+)
+
+REVIEW_FIELDS = (
+    'shop_id', 'listing_id', 'transaction_id', 'buyer_user_id', 'rating', 'review', 'language',
+    'image_url_fullxfull',
+)
+
+# Every simplified field, in output order
+SIMPLIFIED_FIELDS = (
+    'listing_id', 'title', 'url', 'demand', 'made_at', 'made_at_iso', 'primary_image', 'variations',
+    'user_id', 'shop_id', 'state', 'description', 'tags', 'materials', 'keywords', 'sections', 'reviews',
+    'review_average', 'review_count', 'keyword_insights', 'demand_extras', 'buyer_promotion_name',
+    'buyer_shop_promotion_name', 'buyer_promotion_description', 'buyer_applied_promotion_description',
+    'sale_percent', 'sale_price_value', 'sale_price_display', 'sale_subtotal_after_discount',
+    'sale_original_price', 'price_amount', 'price_divisor', 'price_currency', 'price_value',
+    'price_display', 'last_modified_timestamp', 'last_modified_iso', 'last_modified', 'quantity',
+    'num_favorers', 'listing_type', 'file_data', 'views', 'shop',
+)
+
+# Named projections for `fields=`
+FIELD_PRESETS = {
+    # What the products grid renders and sorts on; no reviews, shop or keyword stats
+    'grid': (
+        'listing_id', 'title', 'url', 'primary_image', 'demand', 'made_at', 'made_at_iso',
+        'price_amount', 'price_divisor', 'price_currency', 'price_value', 'price_display',
+        'sale_price_value', 'sale_price_display', 'sale_subtotal_after_discount',
+        'buyer_promotion_description', 'buyer_applied_promotion_description', 'views', 'num_favorers',
+    ),
+}
+
+_FIELD_SET = frozenset(SIMPLIFIED_FIELDS)
+
+# Listing/result views: 'full' entries, or 'card' entries without the heavy
+# fields only the listing detail page renders (served by the detail endpoint)
+VIEWS = ('full', 'card')
+DETAIL_FIELDS = ('description', 'sections', 'reviews', 'keyword_insights', 'shop')
+_DETAIL_SET = frozenset(DETAIL_FIELDS)
+
+# Output fields that need the (expensive) review list
+_REVIEW_FIELDS_OUT = frozenset(('reviews', 'review_average', 'review_count', 'shop'))
+
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+_NO_DEMAND_EXTRAS = {
+    'total_carts': None,
+    'quantity': None,
+    'estimated_delivery_date': None,
+    'free_shipping': None,
+}
+
+
+def _compile_entry_fields(fields):
+    # One getter per field, so the per-entry loop does no table interpretation
+    getters = []
+    for out_key, key, popular_first, default, list_only in fields:
+        def get(entry, popular, key=key, popular_first=popular_first, default=default, list_only=list_only):
+            first, second = (popular, entry) if popular_first else (entry, popular)
+            value = first.get(key) or second.get(key)
+            if list_only:
+                return value if isinstance(value, list) else []
+            return value if default is None else (value or default)
+        getters.append((out_key, get))
+    return tuple(getters)
+
+
+_ENTRY_GETTERS = _compile_entry_fields(ENTRY_FIELDS)
+
+
+@functools.lru_cache(maxsize=65536)
+def _timestamp_fields(ts):
+    """(iso, 'Mon DD, YYYY') for a Unix timestamp in local time; repeated ones are free."""
+    try:
+        dt = datetime.fromtimestamp(int(ts))
+    except Exception:
+        return None, str(ts)
+    return dt.isoformat(), f'{_MONTHS[dt.month - 1]} {dt.day:02d}, {dt.year}'
+
+
+def _timestamp(ts):
+    if ts is None:
+        return None, None
+    try:
+        return _timestamp_fields(ts)
+    except TypeError:  # unhashable value, never a valid timestamp
+        return None, str(ts)
+
+
+def _money(value: float) -> str:
+    return ('{:.2f}'.format(value)).rstrip('0').rstrip('.')
+
+
+def _variations(variations_cleaned):
+    vlist = variations_cleaned.get('variations') or []
+    if not isinstance(vlist, list):
+        return []
+    out = []
+    for v in vlist:
+        if not isinstance(v, dict):
+            continue
+        vopts = v.get('options') or []
+        out.append({
+            'id': v.get('id'),
+            'title': v.get('title'),
+            'options': [
+                {'value': o.get('value'), 'label': o.get('label')}
+                for o in vopts if isinstance(o, dict)
+            ] if isinstance(vopts, list) else [],
+        })
+    return out
+
+
+def _reviews(shop_reviews):
+    out = []
+    if not isinstance(shop_reviews, list):
+        return out
+    for rv in shop_reviews:
+        if not isinstance(rv, dict):
+            continue
+        cts = rv.get('created_timestamp') or rv.get('create_timestamp')
+        uts = rv.get('updated_timestamp') or rv.get('update_timestamp')
+        c_iso, c_disp = _timestamp(cts)
+        u_iso, u_disp = _timestamp(uts)
+        item = {k: rv.get(k) for k in REVIEW_FIELDS}
+        item['created_timestamp'] = cts
+        item['created_iso'] = c_iso
+        item['created'] = c_disp
+        item['updated_timestamp'] = uts
+        item['updated_iso'] = u_iso
+        item['updated'] = u_disp
+        out.append(item)
+    return out
+
+
+def _keyword_insights(everbee_results):
+    out = []
+    if not isinstance(everbee_results, list):
+        return out
+    for res in everbee_results:
+        if not isinstance(res, dict):
+            continue
+        metrics = res.get('metrics') or {}
+        vol = metrics.get('vol')
+        comp = metrics.get('competition')
+        resp = res.get('response') or {}
+        stats_obj = resp.get('stats') or {}
+        if vol is None:
+            sv = stats_obj.get('searchVolume')
+            if isinstance(sv, (int, float)):
+                vol = sv
+        if comp is None:
+            atl = stats_obj.get('avgTotalListings')
+            if isinstance(atl, (int, float)):
+                comp = atl
+        daily = (resp.get('dailyStats') or {}).get('stats') or []
+        out.append({
+            'keyword': res.get('keyword') or res.get('query') or '',
+            'vol': vol,
+            'competition': comp,
+            'stats': stats_obj,
+            'dailyStats': [
+                {'date': d.get('date'), 'searchVolume': d.get('searchVolume')}
+                for d in daily if isinstance(d, dict)
+            ] if isinstance(daily, list) else [],
+        })
+    return out
+
+
+def parse_fields(spec: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a `fields=` value: field names and/or preset names, comma separated.
+    Empty means every field. Raises ValueError on unknown names.
+    """
+    names = [n.strip() for n in (spec or '').split(',') if n.strip()]
+    if not names:
+        return None
+    out = set()
+    for name in names:
+        if name in FIELD_PRESETS:
+            out.update(FIELD_PRESETS[name])
+        elif name in _FIELD_SET:
+            out.add(name)
+        else:
+            raise ValueError(f"Unknown field '{name}'")
+    return frozenset(out)
+
+
+def project(simplified: Dict[str, Any], fields: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return simplified
+    return {k: v for k, v in simplified.items() if k in fields}
+
+
+def parse_view(spec: Optional[str]) -> str:
+    view = (spec or 'full').strip().lower()
+    if view not in VIEWS:
+        raise ValueError(f"Unknown view '{view}'")
+    return view
+
+
+def view_fields(fields: Optional[FrozenSet[str]], view: str) -> Optional[FrozenSet[str]]:
+    """
+    The projection for `view` on top of `fields`: cards drop DETAIL_FIELDS.
+    """
+    if view != 'card':
+        return fields
+    return (fields or _FIELD_SET) - _DETAIL_SET
+
+
+def listing_detail(simplified: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The fields of a simplified entry that cards leave out (description, shop,
+    reviews, sections and keyword stats with their daily series).
+    """
+    return {'listing_id': simplified.get('listing_id'), **{k: simplified.get(k) for k in DETAIL_FIELDS}}
+
+
+def _simplify_entry(entry, fields=None):
+    popular = entry.get('popular_info') or {}
+    simple = {key: get(entry, popular) for key, get in _ENTRY_GETTERS}
+    listing_id = simple['listing_id']
+
+    made_at_iso, made_at_display = _timestamp(
+        popular.get('original_creation_timestamp')
+        or popular.get('created_timestamp')
+        or entry.get('original_creation_timestamp')
+        or entry.get('created_timestamp')
+    )
+    last_modified_ts = popular.get('last_modified_timestamp') or entry.get('last_modified_timestamp')
+    last_modified_iso, last_modified_display = _timestamp(last_modified_ts)
+
+    primary_image = popular.get('primary_image') or entry.get('primary_image') or {}
+    variations_cleaned = popular.get('variations_cleaned') or entry.get('variations_cleaned') or {}
+    var_variations = []
+    if fields is None or 'variations' in fields:
+        try:
+            var_variations = _variations(variations_cleaned)
+        except Exception:
+            var_variations = []
+
+    # Price (base)
+    price = popular.get('price') or entry.get('price') or {}
+    price_amount = price.get('amount')
+    price_divisor = price.get('divisor')
+    price_currency = price.get('currency_code') or ''
+    price_value = None
+    price_display = None
+    if isinstance(price_amount, (int, float)) and isinstance(price_divisor, int) and price_divisor:
+        try:
+            price_value = float(price_amount) / int(price_divisor)
+            price_display = f'{_money(price_value)} {price_currency}'.strip()
+        except Exception:
+            price_value = None
+            price_display = None
+
+    # Sale info and computed sale price
+    sale_info = popular.get('sale_info') or entry.get('sale_info') or {}
+    active_promo = sale_info.get('active_promotion') or {}
+    buyer_promotion_description = active_promo.get('buyer_promotion_description') or ''
+    buyer_applied_promotion_description = active_promo.get('buyer_applied_promotion_description') or ''
+
+    promo_text = buyer_applied_promotion_description or buyer_promotion_description
+    sale_percent = None
+    m = _PERCENT_RE.search(promo_text)
+    if m:
+        sale_percent = float(m.group(1))
+    if sale_percent is None and isinstance(active_promo.get('seller_marketing_promotion'), dict):
+        pct = active_promo['seller_marketing_promotion'].get('order_discount_pct')
+        if isinstance(pct, (int, float)):
+            sale_percent = float(pct)
+
+    sale_subtotal_after_discount = sale_info.get('subtotal_after_discount')
+    sale_price_value = None
+    sale_price_display = None
+    if isinstance(sale_subtotal_after_discount, str) and sale_subtotal_after_discount.strip():
+        sale_price_display = sale_subtotal_after_discount.strip()
+        cleaned = _NON_PRICE_CHARS_RE.sub('', sale_price_display)
+        if cleaned:
+            try:
+                sale_price_value = float(cleaned)
+            except ValueError:
+                sale_price_value = None
+    elif (price_value is not None) and (sale_percent is not None):
+        try:
+            sale_price_value = price_value * (1.0 - (sale_percent / 100.0))
+            sale_price_display = f'{_money(sale_price_value)} {price_currency}'.strip()
+        except Exception:
+            sale_price_value = None
+            sale_price_display = None
+
+    # Shop
+    shop_obj = popular.get('shop') or entry.get('shop') or {}
+    shop_details = shop_obj.get('details') or {}
+    sh_shop_id = shop_obj.get('shop_id') or shop_details.get('shop_id')
+    shop_created_ts = (shop_details.get('created_timestamp')
+                       or shop_details.get('create_date')
+                       or shop_obj.get('created_timestamp'))
+    shop_updated_ts = (shop_details.get('updated_timestamp')
+                       or shop_details.get('update_date')
+                       or shop_obj.get('updated_timestamp'))
+    shop_created_iso, shop_created_display = _timestamp(shop_created_ts)
+    shop_updated_iso, shop_updated_display = _timestamp(shop_updated_ts)
+
+    shop_sections = shop_obj.get('sections')
+    if not isinstance(shop_sections, list):
+        shop_sections = []
+    need_reviews = fields is None or not _REVIEW_FIELDS_OUT.isdisjoint(fields)
+    shop_reviews = _reviews(shop_obj.get('reviews')) if need_reviews else []
+    shop_languages = shop_details.get('languages')
+    if not isinstance(shop_languages, list):
+        shop_languages = []
+
+    computed_shop = {
+        'shop_id': sh_shop_id,
+        'created_timestamp': shop_created_ts,
+        'created_iso': shop_created_iso,
+        'created': shop_created_display,
+        'updated_timestamp': shop_updated_ts,
+        'updated_iso': shop_updated_iso,
+        'updated': shop_updated_display,
+        'url': shop_details.get('url') or shop_obj.get('url'),
+        'languages': shop_languages,
+        'sections': shop_sections,
+        'reviews': shop_reviews,
+    }
+    shop_result = None
+    if fields is None or 'shop' in fields:
+        shop_result = {
+            k: computed_shop[k] if k in computed_shop else shop_details.get(k)
+            for k in SHOP_FIELDS
+        }
+
+    # Listing-level review metrics
+    ratings = [rv['rating'] for rv in shop_reviews if rv['listing_id'] == listing_id]
+    review_count_listing = len(ratings)
+    review_average_listing = None
+    if review_count_listing:
+        try:
+            review_average_listing = round(sum((r or 0) for r in ratings) / review_count_listing, 2)
+        except Exception:
+            review_average_listing = None
+
+    keyword_insights = []
+    if fields is None or 'keyword_insights' in fields:
+        everbee = entry.get('everbee') or popular.get('everbee') or {}
+        keyword_insights = _keyword_insights(everbee.get('results') or [])
+    demand_extras = entry.get('demand_extras') or popular.get('demand_extras') or dict(_NO_DEMAND_EXTRAS)
+
+    out = {
+        'listing_id': listing_id,
+        'title': simple['title'],
+        'url': simple['url'],
+        'demand': popular.get('demand', entry.get('demand', None)),
+        'made_at': made_at_display,
+        'made_at_iso': made_at_iso,
+        'primary_image': {
+            'image_url': primary_image.get('image_url') or '',
+            'srcset': primary_image.get('srcset') or '',
+        },
+        'variations': var_variations,
+        'user_id': simple['user_id'],
+        'shop_id': simple['shop_id'] or sh_shop_id,
+        'state': simple['state'],
+        'description': simple['description'],
+        'tags': simple['tags'],
+        'materials': simple['materials'],
+        'keywords': simple['keywords'],
+        'sections': shop_sections,
+        'reviews': shop_reviews,
+        'review_average': review_average_listing,
+        'review_count': review_count_listing,
+        'keyword_insights': keyword_insights,
+        'demand_extras': demand_extras,
+        'buyer_promotion_name': active_promo.get('buyer_promotion_name') or '',
+        'buyer_shop_promotion_name': active_promo.get('buyer_shop_promotion_name') or '',
+        'buyer_promotion_description': buyer_promotion_description,
+        'buyer_applied_promotion_description': buyer_applied_promotion_description,
+        'sale_percent': sale_percent,
+        'sale_price_value': sale_price_value,
+        'sale_price_display': sale_price_display,
+        'sale_subtotal_after_discount': sale_subtotal_after_discount,
+        'sale_original_price': sale_info.get('original_price'),
+        'price_amount': price_amount,
+        'price_divisor': price_divisor,
+        'price_currency': price_currency,
+        'price_value': price_value,
+        'price_display': price_display,
+        'last_modified_timestamp': last_modified_ts,
+        'last_modified_iso': last_modified_iso,
+        'last_modified': last_modified_display,
+        'quantity': simple['quantity'],
+        'num_favorers': simple['num_favorers'],
+        'listing_type': simple['listing_type'],
+        'file_data': simple['file_data'],
+        'views': simple['views'],
+        'shop': shop_result,
+    }
+    return out if fields is None else project(out, fields)
+
+
+def simplify_result_entries(entries, fields: Optional[FrozenSet[str]] = None):
+    """
+    Normalize raw upstream entries into the shape served by the result endpoint.
+    With `fields` (see parse_fields) only those keys are returned, and reviews,
+    shop details, variations and keyword stats are skipped unless requested.
+    """
+    return [_simplify_entry(entry, fields) for entry in entries]
@@ -0,0 +1,362 @@
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import BulkResearchSession
+from .result_store import append_listings, sync_listings, write_result_file
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress writes for one session; events in between are coalesced
+BULK_PROGRESS_FLUSH_INTERVAL = float(getattr(settings, 'BULK_PROGRESS_FLUSH_INTERVAL', 1.0))
+# Flush early once this many progress updates are pending
+BULK_PROGRESS_FLUSH_MAX_PENDING = int(getattr(settings, 'BULK_PROGRESS_FLUSH_MAX_PENDING', 50))
+
+
+class ProgressBuffer:
+    """
+    Write-behind buffer for one session's progress. Updates are only counted
+    here; `take()` hands back a copy of the latest progress when a time or size
+    boundary is reached (or when forced on a status transition). With `on_due`
+    and `schedule`, a flush is scheduled for the end of the interval so the
+    last update of a burst is written even if no further event arrives to
+    trigger it. `on_due` returns the progress to write, or None.
+    """
+
+    def __init__(self, flush_interval: float = BULK_PROGRESS_FLUSH_INTERVAL,
+                 max_pending: int = BULK_PROGRESS_FLUSH_MAX_PENDING,
+                 on_due: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+                 schedule: Optional[Callable[[float, Callable], None]] = None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_due = on_due
+        self.schedule = schedule
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self._armed = False
+        self._closed = False
+        # Metrics: UPDATEs issued and progress updates absorbed by them
+        self.writes = 0
+        self.coalesced = 0
+
+    def add(self):
+        self.pending += 1
+        if self.on_due is not None and not self._armed and not self._closed:
+            self._arm()
+
+    def _arm(self):
+        self._armed = True
+        now = time.monotonic()
+        when = self.last_flush + self.flush_interval
+        # Already overdue (or the last attempt could not flush): try again a full interval on
+        when = when if when > now else now + self.flush_interval
+        self.schedule(when, self._fire)
+
+    def _fire(self) -> Optional[Dict[str, Any]]:
+        self._armed = False
+        if self._closed:
+            return None
+        progress = self.on_due()
+        if self.pending and not self._armed and not self._closed:
+            self._arm()
+        return progress
+
+    def close(self):
+        self._closed = True
+
+    def due(self) -> bool:
+        if not self.pending:
+            return False
+        return (self.pending >= self.max_pending
+                or (time.monotonic() - self.last_flush) >= self.flush_interval)
+
+    def take(self, progress: Dict[str, Dict[str, int]], force: bool = False) -> Optional[Dict[str, Any]]:
+        if not self.pending or not (force or self.due()):
+            return None
+        self.writes += 1
+        self.coalesced += self.pending - 1
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        return {k: dict(v) for k, v in progress.items()}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'progress_writes': self.writes,
+            'progress_coalesced': self.coalesced,
+            'progress_pending': self.pending,
+        }
+
+
+# Writer threads per process; each owns one DB connection, so this is the pool size
+BULK_DB_WRITER_POOL_SIZE = max(1, int(getattr(settings, 'BULK_DB_WRITER_POOL_SIZE', 2)))
+# Pending intents per writer thread before producers block (backpressure)
+BULK_DB_WRITER_QUEUE_SIZE = max(1, int(getattr(settings, 'BULK_DB_WRITER_QUEUE_SIZE', 500)))
+# Intents drained into one batch
+BULK_DB_WRITER_BATCH_SIZE = max(1, int(getattr(settings, 'BULK_DB_WRITER_BATCH_SIZE', 200)))
+# Idle seconds after which a writer releases its connection back to the pooler
+BULK_DB_WRITER_IDLE_CLOSE = float(getattr(settings, 'BULK_DB_WRITER_IDLE_CLOSE', 30.0))
+
+
+class _Intent:
+    __slots__ = ('kind', 'session_id', 'payload')
+
+    def __init__(self, kind: str, session_id: int, payload: Any = None):
+        self.kind = kind
+        self.session_id = session_id
+        self.payload = payload
+
+
+class BulkDBWriter:
+    """
+    Process-wide persistence for bulk session workers. Workers enqueue intents
+    (progress, entry deltas, status, result_file) and never touch the DB
+    themselves; a fixed pool of writer threads applies them in batches.
+    Intents for one session always go to the same thread, so they apply in order.
+    """
+
+    def __init__(self, pool_size: int = BULK_DB_WRITER_POOL_SIZE,
+                 queue_size: int = BULK_DB_WRITER_QUEUE_SIZE,
+                 batch_size: int = BULK_DB_WRITER_BATCH_SIZE):
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(pool_size)]
+        # Per-thread heaps of (monotonic due time, seq, session_id, fn) from call_at
+        self.timers: List[List[Any]] = [[] for _ in range(pool_size)]
+        self._timer_seq = itertools.count()
+        self.threads: List[threading.Thread] = []
+        self.lock = threading.Lock()
+        # Metrics
+        self.batches = 0
+        self.intents = 0
+        self.progress_coalesced = 0
+        self.errors = 0
+        self.backpressure_seconds = 0.0
+        # Sessions with a dropped entry/result_file write, until the worker resyncs them
+        self._lost: Set[int] = set()
+
+    def _ensure_started(self):
+        if self.threads:
+            return
+        with self.lock:
+            if self.threads:
+                return
+            threads = []
+            for idx in range(self.pool_size):
+                t = threading.Thread(target=self._loop, args=(idx,), name=f"BulkDBWriter-{idx}", daemon=True)
+                t.start()
+                threads.append(t)
+            self.threads = threads
+
+    def _submit(self, intent: _Intent):
+        self._ensure_started()
+        q = self.queues[intent.session_id % self.pool_size]
+        try:
+            q.put_nowait(intent)
+            return
+        except queue.Full:
+            pass
+        # Queue saturated: block the producer until the writer catches up
+        started = time.monotonic()
+        q.put(intent)
+        with self.lock:
+            self.backpressure_seconds += time.monotonic() - started
+
+    def saturation(self) -> float:
+        """Fill ratio of the fullest writer queue (0.0 - 1.0)."""
+        return max((q.qsize() / q.maxsize) for q in self.queues)
+
+    def progress(self, session_id: int, progress: Dict[str, Any]):
+        self._submit(_Intent('progress', session_id, progress))
+
+    def append_entries(self, session_id: int, entries: List[Dict[str, Any]], start: int):
+        self._submit(_Intent('append', session_id, (entries, start)))
+
+    def sync_entries(self, session_id: int, entries: List[Dict[str, Any]]):
+        self._submit(_Intent('sync', session_id, entries))
+
+    def result_file(self, session_id: int, entries: List[Dict[str, Any]]):
+        self._submit(_Intent('result_file', session_id, entries))
+
+    def update_session(self, session_id: int, **fields):
+        self._submit(_Intent('update', session_id, fields))
+
+    def entries_lost(self, session_id: int) -> bool:
+        """
+        True (once) if a batch carrying entry rows or result_file for
+        `session_id` was dropped after its retries. The worker's persisted
+        position is then wrong, so it must resync the whole snapshot.
+        """
+        with self.lock:
+            if session_id not in self._lost:
+                return False
+            self._lost.discard(session_id)
+            return True
+
+    def call_at(self, session_id: int, when: float, fn: Callable[[], Optional[Dict[str, Any]]]):
+        """
+        Run `fn` on the session's writer thread at monotonic time `when`. A
+        dict it returns is written as that session's progress in the thread's
+        next batch. `fn` must not block: it runs on the thread that drains the
+        queues producers may be waiting on.
+        """
+        self._ensure_started()
+        idx = session_id % self.pool_size
+        with self.lock:
+            heapq.heappush(self.timers[idx], (when, next(self._timer_seq), session_id, fn))
+        try:
+            # Wake the thread so it recomputes its wait
+            self.queues[idx].put_nowait(_Intent('wake', session_id))
+        except queue.Full:
+            pass  # busy; timers are checked after every batch
+
+    def _run_timers(self, idx: int) -> List[_Intent]:
+        timers = self.timers[idx]
+        due: List[_Intent] = []
+        now = time.monotonic()
+        while True:
+            with self.lock:
+                if not timers or timers[0][0] > now:
+                    return due
+                _, _, session_id, fn = heapq.heappop(timers)
+            try:
+                progress = fn()
+            except Exception as e:
+                logger.warning("Progress flush failed: %s", e)
+                continue
+            if progress is not None:
+                due.append(_Intent('progress', session_id, progress))
+
+    def _next_timer(self, idx: int) -> Optional[float]:
+        with self.lock:
+            timers = self.timers[idx]
+            return max(0.0, timers[0][0] - time.monotonic()) if timers else None
+
+    def barrier(self, session_id: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every intent queued so far for `session_id` has been applied.
+        """
+        done = threading.Event()
+        self._submit(_Intent('barrier', session_id, done))
+        return done.wait(timeout)
+
+    def _loop(self, idx: int):
+        q = self.queues[idx]
+        while True:
+            due = self._run_timers(idx)
+            batch: List[_Intent] = []
+            if not due:
+                wait = self._next_timer(idx)
+                try:
+                    batch.append(q.get(timeout=BULK_DB_WRITER_IDLE_CLOSE if wait is None
+                                       else min(wait, BULK_DB_WRITER_IDLE_CLOSE)))
+                except queue.Empty:
+                    if wait is None:
+                        # Idle: hand the connection back to the pooler
+                        try:
+                            connection.close()
+                        except Exception:
+                            pass
+                    continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            # Scheduled flushes took their progress just now, so it goes after (and wins over) queued progress
+            work = [i for i in batch if i.kind != 'wake'] + due
+            try:
+                if work:
+                    self._apply_with_retry(work)
+            finally:
+                for intent in batch:
+                    if intent.kind == 'barrier':
+                        intent.payload.set()
+                    q.task_done()
+
+    def _apply_with_retry(self, batch: List[_Intent], attempts: int = 2):
+        for attempt in range(attempts):
+            try:
+                # One transaction per batch: a failed batch rolls back and can be replayed
+                with transaction.atomic():
+                    self._apply(batch)
+                return
+            except Exception:
+                with self.lock:
+                    self.errors += 1
+                try:
+                    connection.close()  # drop a possibly broken connection
+                except Exception:
+                    pass
+                if attempt == attempts - 1:
+                    logger.exception("Bulk DB writer batch failed (%d intents)", len(batch))
+                    lost = {i.session_id for i in batch if i.kind in ('append', 'sync', 'result_file')}
+                    with self.lock:
+                        self._lost |= lost
+
+    def _apply(self, batch: List[_Intent]):
+        # Latest progress per session wins; applied as one multi-row UPDATE
+        progress: Dict[int, Dict[str, Any]] = {}
+        ordered: List[_Intent] = []
+        for intent in batch:
+            if intent.kind == 'progress':
+                progress[intent.session_id] = intent.payload
+            elif intent.kind not in ('barrier', 'wake'):
+                ordered.append(intent)
+
+        for intent in ordered:
+            if intent.kind == 'append':
+                entries, start = intent.payload
+                append_listings(intent.session_id, entries, start)
+            elif intent.kind == 'sync':
+                sync_listings(intent.session_id, intent.payload)
+            elif intent.kind == 'result_file':
+                write_result_file(intent.session_id, {'entries': intent.payload})
+
+        if progress:
+            BulkResearchSession.objects.bulk_update(
+                [BulkResearchSession(id=sid, progress=p) for sid, p in progress.items()],
+                ['progress'],
+            )
+
+        # Status changes go last so their fields (including progress) win
+        for intent in ordered:
+            if intent.kind == 'update':
+                BulkResearchSession.objects.filter(id=intent.session_id).update(**intent.payload)
+
+        with self.lock:
+            self.batches += 1
+            self.intents += len(batch)
+            self.progress_coalesced += sum(1 for i in batch if i.kind == 'progress') - len(progress)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'pool_size': self.pool_size,
+                'queued': sum(q.qsize() for q in self.queues),
+                'batches': self.batches,
+                'intents': self.intents,
+                'progress_coalesced': self.progress_coalesced,
+                'errors': self.errors,
+                'lost_sessions': len(self._lost),
+                'backpressure_seconds': round(self.backpressure_seconds, 3),
+            }
+
+
+_writer: Optional[BulkDBWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_db_writer() -> BulkDBWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = BulkDBWriter()
+    return _writer
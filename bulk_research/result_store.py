@@ -0,0 +1,601 @@
+import base64
+import functools
+import hashlib
+import json
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Count, F, Max, Min, Q
+from django.http import HttpResponse
+
+from . import codec
+from .models import BulkResearchListing, BulkResearchSession
+from .normalizer import project, simplify_result_entries
+
+# Bump whenever the simplified entry shape or a derived column changes; stale
+# rows rebuild lazily on read.
+SIMPLIFIED_SCHEMA_VERSION = 2
+
+# Public sort name -> simplified entry fields (used for in-memory snapshots);
+# the first one with a value is the sort value. Price sorts on the sale price
+# when there is one, like priceOf() in bulk_research.js.
+SORT_FIELDS = {
+    'demand': ('demand',),
+    'price': ('sale_price_value', 'price_value'),
+    'favorers': ('num_favorers',),
+    'views': ('views',),
+    'created': ('made_at_iso',),
+}
+
+# Public sort name -> indexed BulkResearchListing column
+SORT_COLUMNS = {
+    'demand': 'demand',
+    'price': 'effective_price',
+    'favorers': 'num_favorers',
+    'views': 'views',
+    'created': 'created_ts',
+}
+
+# Columns derived from the raw entry; rewritten whenever a row is (re)built
+DERIVED_FIELDS = ['demand', 'effective_price', 'num_favorers', 'views', 'created_ts', 'simplified', 'simplified_version']
+
+_BATCH_SIZE = 500
+
+
+def entries_from_payload(raw: Any) -> List[Dict[str, Any]]:
+    if isinstance(raw, dict):
+        if isinstance(raw.get('entries'), list):
+            return raw['entries']
+        if isinstance(raw.get('megafile'), dict) and isinstance(raw['megafile'].get('entries'), list):
+            return raw['megafile']['entries']
+    return []
+
+
+def extract_entries(result_file: Optional[str]) -> List[Dict[str, Any]]:
+    try:
+        if not result_file:
+            return []
+        return entries_from_payload(codec.load_result_file(result_file))
+    except Exception:
+        return []
+
+
+def _as_float(val) -> Optional[float]:
+    if val is None or isinstance(val, bool):
+        return None
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_int(val) -> Optional[int]:
+    num = _as_float(val)
+    if num is None or num != num or num in (float('inf'), float('-inf')):
+        return None
+    return int(num)
+
+
+def entry_listing_id(entry: Dict[str, Any], position: int) -> str:
+    popular = entry.get('popular_info') or {}
+    lid = entry.get('listing_id') or popular.get('listing_id')
+    # Entries without an id still get a stable per-session key
+    return str(lid)[:64] if lid not in (None, '') else f'pos-{position}'
+
+
+def entry_hash(entry: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(entry, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _created_ts(entry: Dict[str, Any]) -> Optional[int]:
+    popular = entry.get('popular_info') or {}
+    ts = (popular.get('original_creation_timestamp')
+          or popular.get('created_timestamp')
+          or entry.get('original_creation_timestamp')
+          or entry.get('created_timestamp'))
+    return _as_int(ts)
+
+
+def effective_price(simplified: Dict[str, Any]) -> Optional[float]:
+    # The price a buyer pays: the sale price when there is one
+    sale = _as_float(simplified.get('sale_price_value'))
+    return sale if sale is not None else _as_float(simplified.get('price_value'))
+
+
+def sort_value(simplified: Dict[str, Any], sort: str) -> Any:
+    if sort == 'created':
+        return simplified.get('made_at_iso') or None
+    if sort == 'price':
+        return effective_price(simplified)
+    return _as_float(simplified.get(SORT_FIELDS[sort][0]))
+
+
+def derived_values(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Simplify one raw entry and derive its indexed sort columns.
+    """
+    simplified = simplify_result_entries([entry])[0]
+    return {
+        'demand': _as_float(simplified.get('demand')),
+        'effective_price': effective_price(simplified),
+        'num_favorers': _as_int(simplified.get('num_favorers')),
+        'views': _as_int(simplified.get('views')),
+        'created_ts': _created_ts(entry),
+        'simplified': codec.dumps(simplified),
+        'simplified_version': SIMPLIFIED_SCHEMA_VERSION,
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _session_user_id(session_id: int) -> Optional[int]:
+    # Sessions never change owner, so the lookup is cached per process
+    return BulkResearchSession.objects.filter(id=session_id).values_list('user_id', flat=True).first()
+
+
+def _build_listing(session_id: int, entry: Dict[str, Any], position: int, listing_id: str, digest: str) -> BulkResearchListing:
+    return BulkResearchListing(
+        session_id=session_id,
+        user_id=_session_user_id(session_id),
+        listing_id=listing_id,
+        position=position,
+        data=entry,
+        data_hash=digest,
+        **derived_values(entry),
+    )
+
+
+def _dedupe(entries: Iterable[Dict[str, Any]], start: int = 0) -> Dict[str, Tuple[int, Dict[str, Any]]]:
+    # Later duplicates of a listing id win, as they would in the upstream megafile
+    out: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    for offset, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        position = start + offset
+        out[entry_listing_id(entry, position)] = (position, entry)
+    return out
+
+
+def sync_listings(session_id: int, entries: List[Dict[str, Any]]) -> int:
+    """
+    Make the session's listing rows match `entries`. Only rows whose content or
+    position changed are written, so replacing one listing costs O(1) writes.
+    Returns the number of rows written or deleted.
+    """
+    incoming = _dedupe(entries or [])
+    existing = {
+        lid: (pk, digest, position)
+        for pk, lid, digest, position in BulkResearchListing.objects.filter(session_id=session_id)
+        .values_list('id', 'listing_id', 'data_hash', 'position')
+    }
+
+    to_create = []
+    to_update = []
+    for lid, (position, entry) in incoming.items():
+        digest = entry_hash(entry)
+        current = existing.get(lid)
+        if current is None:
+            to_create.append(_build_listing(session_id, entry, position, lid, digest))
+            continue
+        pk, cur_digest, cur_position = current
+        if cur_digest != digest:
+            row = _build_listing(session_id, entry, position, lid, digest)
+            row.pk = pk
+            to_update.append(row)
+        elif cur_position != position:
+            BulkResearchListing.objects.filter(id=pk).update(position=position)
+
+    stale_ids = [pk for lid, (pk, _, _) in existing.items() if lid not in incoming]
+    if stale_ids:
+        BulkResearchListing.objects.filter(id__in=stale_ids).delete()
+    if to_create:
+        BulkResearchListing.objects.bulk_create(to_create, batch_size=_BATCH_SIZE)
+    if to_update:
+        BulkResearchListing.objects.bulk_update(
+            to_update, ['position', 'data', 'data_hash'] + DERIVED_FIELDS, batch_size=_BATCH_SIZE
+        )
+    written = len(to_create) + len(to_update) + len(stale_ids)
+    if written:
+        refresh_session_stats(session_id)
+    return written
+
+
+def append_listings(session_id: int, entries: List[Dict[str, Any]], start: int) -> int:
+    """
+    Upsert entries that arrived after position `start` without looking at the
+    rows already stored. Returns the number of rows written.
+    """
+    incoming = _dedupe(entries or [], start)
+    rows = [
+        _build_listing(session_id, entry, position, lid, entry_hash(entry))
+        for lid, (position, entry) in incoming.items()
+    ]
+    if rows:
+        BulkResearchListing.objects.bulk_create(
+            rows,
+            batch_size=_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['session', 'listing_id'],
+            update_fields=['position', 'data', 'data_hash'] + DERIVED_FIELDS,
+        )
+        refresh_session_stats(session_id)
+    return len(rows)
+
+
+def refresh_session_stats(session_id: int) -> None:
+    """
+    Recompute the session's entries_count and result_summary from its rows
+    and bump its result_version.
+    """
+    agg = BulkResearchListing.objects.filter(session_id=session_id).aggregate(
+        count=Count('id'),
+        top_demand=Max('demand'),
+        price_min=Min('effective_price'),
+        price_max=Max('effective_price'),
+    )
+    BulkResearchSession.objects.filter(id=session_id).update(
+        entries_count=agg.pop('count'),
+        result_summary=agg,
+        result_version=F('result_version') + 1,
+    )
+
+
+def write_result_file(session_id: int, payload: Any) -> None:
+    stored, size = codec.dump_result_file(payload)
+    BulkResearchSession.objects.filter(id=session_id).update(
+        result_file=stored,
+        result_bytes=size,
+        result_version=F('result_version') + 1,
+    )
+
+
+def rebuild_stale_listings(session_id: int) -> int:
+    """
+    Re-simplify rows written under an older schema version (or by the data
+    migration, which stores raw entries only).
+    """
+    rebuilt = 0
+    while True:
+        rows = list(
+            BulkResearchListing.objects.filter(session_id=session_id)
+            .exclude(simplified_version=SIMPLIFIED_SCHEMA_VERSION)
+            .only('id', 'data')[:_BATCH_SIZE]
+        )
+        if not rows:
+            if rebuilt:
+                refresh_session_stats(session_id)
+            return rebuilt
+        for row in rows:
+            for field, value in derived_values(row.data or {}).items():
+                setattr(row, field, value)
+        BulkResearchListing.objects.bulk_update(rows, DERIVED_FIELDS)
+        rebuilt += len(rows)
+
+
+def ensure_listings(session: BulkResearchSession) -> None:
+    """
+    Bring a session's rows up to date before a read: rebuild stale rows and
+    backfill rows for legacy sessions that only have a result_file.
+    """
+    listings = BulkResearchListing.objects.filter(session_id=session.id)
+    if listings.exclude(simplified_version=SIMPLIFIED_SCHEMA_VERSION).exists():
+        rebuild_stale_listings(session.id)
+    elif not listings.exists():
+        entries = extract_entries(session.result_file)
+        if entries:
+            sync_listings(session.id, entries)
+
+
+class LiveOrder:
+    """
+    Sort order of a live session's entries, kept up to date as entries are
+    appended. Only entries not keyed yet are simplified, and the new keys are
+    merged into the sorted run, so a poll does not re-simplify and re-sort the
+    whole snapshot. Descending is by value then upstream order, ascending is
+    its reverse, and entries without a value follow in upstream order.
+    """
+
+    def __init__(self, sort: str):
+        self.sort = sort
+        self.fields = frozenset(SORT_FIELDS[sort])
+        self.keys: List[Tuple[Any, int]] = []  # (value, -position), ascending
+        self.nulls: List[int] = []
+        self.seen = 0
+        self.lock = threading.Lock()
+
+    def _extend(self, entries: List[Dict[str, Any]], count: int):
+        if count <= self.seen:
+            return
+        keyed = []
+        for position, simplified in enumerate(simplify_result_entries(entries[self.seen:count], self.fields), self.seen):
+            val = sort_value(simplified, self.sort)
+            if val is None:
+                self.nulls.append(position)
+            else:
+                keyed.append((val, -position))
+        # Timsort merges the new run into the sorted one in linear time
+        self.keys += keyed
+        self.keys.sort()
+        self.seen = count
+
+    def page(self, entries: List[Dict[str, Any]], count: int, order: str,
+             offset: int, end: Optional[int]) -> Tuple[List[int], int]:
+        """
+        Positions of one page of the first `count` (or more) entries, and the
+        number of entries ordered.
+        """
+        with self.lock:
+            self._extend(entries, count)
+            n = len(self.keys)
+            stop = n if end is None else min(end, n)
+            if offset >= stop:
+                valued = []
+            elif order == 'asc':
+                valued = [-p for _, p in self.keys[offset:stop]]
+            else:
+                valued = [-p for _, p in reversed(self.keys[n - stop:n - offset])]
+            nulls = self.nulls[max(0, offset - n):None if end is None else max(0, end - n)]
+            return valued + nulls, self.seen
+
+
+def listing_lines(session: BulkResearchSession, sort: Optional[str] = None, order: str = 'desc',
+                  offset: int = 0, limit: Optional[int] = None) -> Tuple[List[str], int]:
+    """
+    A page of serialized simplified entries and the session's total count,
+    ordered by an indexed column (upstream order when `sort` is None).
+    Rows without a value for the sort column follow in upstream order.
+    """
+    ensure_listings(session)
+    qs = BulkResearchListing.objects.filter(session_id=session.id)
+    end = None if limit is None else offset + limit
+    if not sort:
+        lines = list(qs.order_by('position').values_list('simplified', flat=True)[offset:end])
+        return lines, _page_total(qs, lines, offset, limit)
+
+    col = SORT_COLUMNS[sort]
+    valued = qs.filter(**{f'{col}__isnull': False}).order_by(col if order == 'asc' else f'-{col}', 'position')
+    lines = list(valued.values_list('simplified', flat=True)[offset:end])
+    if limit is not None and len(lines) == limit:
+        return lines, qs.count()
+    valued_total = offset + len(lines) if lines else valued.count()
+    nulls = qs.filter(**{f'{col}__isnull': True}).order_by('position')
+    null_offset = max(0, offset - valued_total)
+    null_end = None if end is None else end - valued_total
+    lines += list(nulls.values_list('simplified', flat=True)[null_offset:null_end])
+    return lines, valued_total + nulls.count()
+
+
+def project_lines(lines: List[str], fields) -> List[str]:
+    """
+    Narrow serialized simplified entries to `fields` (see normalizer.parse_fields).
+    """
+    if fields is None:
+        return lines
+    return [codec.dumps(project(codec.loads(line), fields)) for line in lines]
+
+
+def _page_total(qs, lines: List[str], offset: int, limit: Optional[int]) -> int:
+    # A short, non-empty page already tells us where the set ends
+    if lines and (limit is None or len(lines) < limit):
+        return offset + len(lines)
+    if not lines and offset == 0:
+        return 0
+    return qs.count()
+
+
+def encode_cursor(sort: Optional[str], order: str, offset: int) -> str:
+    raw = json.dumps([sort or '', order, offset]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str, int]:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        sort, order, offset = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if (not isinstance(sort, str) or (sort and sort not in SORT_FIELDS) or order not in ('asc', 'desc')
+            or not _is_int(offset) or offset < 0):
+        raise ValueError('Invalid cursor')
+    return (sort or None), order, offset
+
+
+def page_meta(total: int, sort: Optional[str], order: str, offset: int, limit: Optional[int]) -> Dict[str, Any]:
+    end = total if limit is None else min(total, offset + limit)
+    return {
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'sort': sort,
+        'order': order,
+        'next_cursor': encode_cursor(sort, order, end) if end < total else None,
+    }
+
+
+def entries_response(lines: List[str], **extra) -> HttpResponse:
+    # Splice pre-serialized entries into the envelope without re-encoding them
+    head = codec.dumps({'entries_count': len(lines), **extra})
+    body = head[:-1] + ', "entries": [' + ','.join(lines) + ']}'
+    return HttpResponse(body, content_type='application/json')
+
+
+# ---- Cross-session ("all sessions") reads ----
+
+_SCAN_FIELDS = ['id', 'session_id', 'listing_id', 'position', 'simplified']
+
+
+def ensure_user_listings(user_id: int) -> None:
+    stale = (
+        BulkResearchListing.objects.filter(user_id=user_id)
+        .exclude(simplified_version=SIMPLIFIED_SCHEMA_VERSION)
+        .values_list('session_id', flat=True).distinct()
+    )
+    for session_id in list(stale):
+        rebuild_stale_listings(session_id)
+
+
+def _scan_key(row: Dict[str, Any], sort: Optional[str], order: str) -> Tuple:
+    # Position of a row in the scan order; mirrors the querysets in _scan_rows
+    if not sort:
+        return ('r', row['session_id'], row['position'], row['id'])
+    val = row[SORT_COLUMNS[sort]]
+    if val is None:
+        return ('n', row['id'])
+    return ('v', val, row['id'])
+
+
+def _sort_key(key: Tuple, order: str) -> Tuple:
+    # Comparable form of a scan key: lower sorts first
+    if key[0] == 'r':
+        return (-key[1], key[2], key[3])
+    if key[0] == 'n':
+        return (1, 0, key[1])
+    return (0, -key[1] if order == 'desc' else key[1], key[2])
+
+
+def _scan_rows(user_id: int, sort: Optional[str], order: str, after: Optional[Tuple], n: int) -> List[Dict[str, Any]]:
+    """
+    Next `n` rows of the user's listings after scan key `after`, in index order.
+    """
+    qs = BulkResearchListing.objects.filter(user_id=user_id)
+    if not sort:
+        qs = qs.order_by('-session_id', 'position', 'id')
+        if after:
+            _, sid, pos, pk = after
+            qs = qs.filter(Q(session_id__lt=sid) | Q(session_id=sid, position__gt=pos) | Q(session_id=sid, position=pos, id__gt=pk))
+        return list(qs.values(*_SCAN_FIELDS)[:n])
+
+    col = SORT_COLUMNS[sort]
+    fields = _SCAN_FIELDS + [col]
+    if after is None or after[0] == 'v':
+        valued = qs.filter(**{f'{col}__isnull': False}).order_by(col if order == 'asc' else f'-{col}', 'id')
+        if after:
+            _, val, pk = after
+            beyond = {f'{col}__gt' if order == 'asc' else f'{col}__lt': val}
+            valued = valued.filter(Q(**beyond) | Q(**{col: val, 'id__gt': pk}))
+        rows = list(valued.values(*fields)[:n])
+        if rows:
+            return rows
+        after = ('n', 0)
+    nulls = qs.filter(**{f'{col}__isnull': True, 'id__gt': after[1]}).order_by('id')
+    return list(nulls.values(*fields)[:n])
+
+
+def _canonical_ids(user_id: int, listing_ids: Iterable[str], sort: Optional[str], order: str) -> set:
+    # A listing stored by several sessions is shown once, at its first place in scan order
+    fields = _SCAN_FIELDS[:-1] + ([SORT_COLUMNS[sort]] if sort else [])
+    best: Dict[str, Tuple] = {}
+    for row in BulkResearchListing.objects.filter(user_id=user_id, listing_id__in=list(listing_ids)).values(*fields):
+        rank = _sort_key(_scan_key(row, sort, order), order)
+        if row['listing_id'] not in best or rank < best[row['listing_id']][0]:
+            best[row['listing_id']] = (rank, row['id'])
+    return {pk for _, pk in best.values()}
+
+
+def user_listing_page(user_id: int, sort: Optional[str] = None, order: str = 'desc',
+                      after: Optional[Tuple] = None, limit: Optional[int] = None
+                      ) -> Tuple[List[Tuple[int, str]], Optional[Tuple], int]:
+    """
+    One page of a user's listings across all sessions, globally ordered and
+    deduplicated by listing id. Returns ([(session_id, simplified_json)],
+    scan key to resume after or None at the end, distinct listing total).
+    """
+    ensure_user_listings(user_id)
+    chunk = max(2 * limit, 50) if limit else _BATCH_SIZE
+    out: List[Tuple[int, str]] = []
+    last = after
+    exhausted = False
+    while limit is None or len(out) < limit:
+        rows = _scan_rows(user_id, sort, order, last, chunk)
+        if not rows:
+            exhausted = True
+            break
+        keep = _canonical_ids(user_id, {r['listing_id'] for r in rows}, sort, order)
+        for row in rows:
+            last = _scan_key(row, sort, order)
+            if row['id'] in keep:
+                out.append((row['session_id'], row['simplified']))
+                if limit is not None and len(out) >= limit:
+                    break
+    total = BulkResearchListing.objects.filter(user_id=user_id).values('listing_id').distinct().count()
+    return out, (None if exhausted else last), total
+
+
+def session_versions(user_id: int) -> Dict[str, int]:
+    return {
+        str(pk): version
+        for pk, version in BulkResearchSession.objects.filter(user_id=user_id).values_list('id', 'result_version')
+    }
+
+
+def encode_scan_cursor(sort: Optional[str], order: str, key: Tuple) -> str:
+    raw = json.dumps([sort or '', order, list(key)]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _is_int(val) -> bool:
+    return isinstance(val, int) and not isinstance(val, bool)
+
+
+def _valid_scan_key(key, sort: Optional[str]) -> bool:
+    # Must be a key _scan_key could have produced for this sort
+    if not isinstance(key, list) or not key:
+        return False
+    kind, rest = key[0], key[1:]
+    if not sort:
+        return kind == 'r' and len(rest) == 3 and all(_is_int(v) for v in rest)
+    if kind == 'n':
+        return len(rest) == 1 and _is_int(rest[0])
+    if kind == 'v':
+        val = rest[0] if len(rest) == 2 else None
+        return (len(rest) == 2 and _is_int(rest[1]) and isinstance(val, (int, float))
+                and not isinstance(val, bool) and math.isfinite(val))
+    return False
+
+
+def decode_scan_cursor(cursor: str) -> Tuple[Optional[str], str, Tuple]:
+    """
+    Parse an /all/ scan cursor. Raises ValueError on anything encode_scan_cursor
+    could not have produced, so the view answers 400 rather than failing later.
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        sort, order, key = decoded
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if (not isinstance(sort, str) or (sort and sort not in SORT_COLUMNS) or order not in ('asc', 'desc')
+            or not _valid_scan_key(key, sort or None)):
+        raise ValueError('Invalid cursor')
+    return (sort or None), order, tuple(key)
+
+
+def tagged_entries_response(items: List[Tuple[int, str]], **extra) -> HttpResponse:
+    # Like entries_response, with each entry's session id spliced in front of its fields
+    lines = [
+        f'{{"session_id": {sid}, {line[1:]}' if len(line) > 2 else f'{{"session_id": {sid}}}'
+        for sid, line in items
+    ]
+    return entries_response(lines, **extra)
+
+
+def iter_simplified(session_id: int, chunk: int = _BATCH_SIZE) -> Iterable[str]:
+    """
+    Yield a session's serialized simplified entries in upstream order, reading
+    `chunk` rows at a time by keyset on (position, id) so memory stays flat
+    (server-side cursors are disabled behind the pooler).
+    """
+    after = (-1, 0)
+    while True:
+        pos, pk = after
+        rows = list(
+            BulkResearchListing.objects.filter(session_id=session_id)
+            .filter(Q(position__gt=pos) | Q(position=pos, id__gt=pk))
+            .order_by('position', 'id')
+            .values_list('position', 'id', 'simplified')[:chunk]
+        )
+        if not rows:
+            return
+        for _, _, line in rows:
+            yield line
+        after = rows[-1][:2]
@@ -0,0 +1,96 @@
+import random
+from typing import Any, Dict, List
+
+# Synthetic upstream entries shaped like real megafile items (nested popular_info,
+# shop reviews, everbee keyword stats), for the benchmark commands.
+
+
+def make_entry(i: int, rnd: random.Random) -> Dict[str, Any]:
+    lid = 1000000 + i
+    shop_id = 500 + (i % 37)
+    reviews = [
+        {
+            'shop_id': shop_id,
+            'listing_id': lid if k % 3 == 0 else lid + 1,
+            'transaction_id': k,
+            'buyer_user_id': k * 7,
+            'rating': rnd.randint(1, 5),
+            'review': 'Lovely item ' * rnd.randint(1, 6),
+            'language': 'en',
+            'image_url_fullxfull': None,
+            'created_timestamp': 1700000000 + k * 3600,
+            'updated_timestamp': 1700000000 + k * 7200,
+        }
+        for k in range(rnd.randint(0, 25))
+    ]
+    everbee = {'results': [
+        {
+            'keyword': f'kw {i} {j}',
+            'metrics': {'vol': rnd.choice([None, rnd.randint(10, 9000)]), 'competition': None},
+            'response': {
+                'stats': {'searchVolume': rnd.randint(1, 5000), 'avgTotalListings': rnd.randint(10, 100000)},
+                'dailyStats': {'stats': [
+                    {'date': f'2025-01-{d:02d}', 'searchVolume': rnd.randint(0, 300)} for d in range(1, 31)
+                ]},
+            },
+        }
+        for j in range(rnd.randint(0, 8))
+    ]}
+    popular = {
+        'listing_id': lid,
+        'title': f'Handmade thing {i} “ünïcode”',
+        'url': f'https://www.etsy.com/listing/{lid}',
+        'demand': rnd.choice([None, rnd.randint(0, 500), rnd.random() * 100]),
+        'original_creation_timestamp': rnd.choice([None, 1600000000 + i * 1000, 'bad']),
+        'primary_image': {'image_url': f'https://i.etsystatic.com/{lid}/il_570xN.jpg', 'srcset': 'a 1x, b 2x'},
+        'variations_cleaned': {'variations': [
+            {'id': 1, 'title': 'Size', 'options': [{'value': 's', 'label': 'Small'}, {'value': 'l', 'label': 'Large'}]},
+        ]} if i % 2 else {},
+        'last_modified_timestamp': 1710000000 + i,
+        'tags': ['gift', 'handmade', f't{i}'],
+        'materials': ['wood'],
+        'price': {'amount': rnd.randint(100, 99999), 'divisor': 100, 'currency_code': 'USD'} if i % 11 else {},
+        'sale_info': {
+            'active_promotion': {'buyer_promotion_description': f'{rnd.randint(5, 50)}% off'} if i % 4 == 0 else {},
+            'subtotal_after_discount': '$12.50' if i % 9 == 0 else None,
+            'original_price': '$20.00',
+        },
+        'shop': {
+            'shop_id': shop_id,
+            'details': {
+                'shop_name': f'Shop{shop_id}',
+                'created_timestamp': 1500000000,
+                'update_date': 1700000000,
+                'languages': ['en-US'],
+                'review_average': 4.8,
+                'review_count': len(reviews),
+                'url': f'https://www.etsy.com/shop/Shop{shop_id}',
+            },
+            'sections': [{'id': 1, 'title': 'Main'}],
+            'reviews': reviews,
+        },
+        'description': 'Desc ' * 50,
+    }
+    return {
+        'listing_id': lid,
+        'popular_info': popular,
+        'num_favorers': rnd.randint(0, 2000),
+        'views': rnd.choice([None, rnd.randint(0, 90000)]),
+        'quantity': 3,
+        'listing_type': 'physical',
+        'keywords': ['gift', 'decor'],
+        'everbee': everbee,
+        'demand_extras': {'total_carts': 3} if i % 5 == 0 else None,
+    }
+
+
+def make_entries(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    return [make_entry(i, rnd) for i in range(n)]
+
+
+def make_megafile(n: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    A final upstream payload as the stream and reconnect endpoints deliver it.
+    """
+    return {'stage': 'megafile', 'megafile': {'entries': make_entries(n, seed)}}
@@ -1,19 +1,53 @@
-import json
+import itertools
+import logging
 import threading
 import time
 from collections import deque
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Tuple
 
-import requests
 from django.conf import settings
 from django.utils import timezone
-from django.db import connection, close_old_connections
+from django.db import close_old_connections
+from core import http_client
+from . import codec
+from .jsonstream import SSEReader, attach_entries
 from .models import BulkResearchSession
+from .persistence import ProgressBuffer, get_db_writer
+from .result_store import LiveOrder
 from requests.exceptions import ChunkedEncodingError, ConnectionError, ReadTimeout
 
+logger = logging.getLogger(__name__)
+
 # Upstream SSE URL; prefer settings if provided
 UPSTREAM_STREAM_URL = getattr(settings, 'UPSTREAM_STREAM_URL', "https://knowing-quail-helped.ngrok-free.app/run/stream")
 
+# 'incremental': append only new entries as listing rows and write result_file once at the end.
+# 'snapshot': legacy behaviour, rewrite result_file with the whole snapshot on every persist.
+BULK_PERSIST_MODE = getattr(settings, 'BULK_PERSIST_MODE', 'incremental')
+
+# 'thread': one OS thread per session. 'asyncio': all upstream streams share one event loop
+# (see async_engine); falls back to threads when httpx is unavailable.
+BULK_STREAM_ENGINE = getattr(settings, 'BULK_STREAM_ENGINE', 'thread')
+
+UPSTREAM_MAX_ATTEMPTS = 5
+UPSTREAM_BACKOFFS = [1, 2, 5, 10, 15]
+# Bytes read from the upstream socket per iteration
+UPSTREAM_CHUNK_SIZE = 64 * 1024
+
+_subscriber_tokens = itertools.count()
+
+# Recent events kept per session for SSE subscribers
+EVENT_BUFFER_SIZE = 2000
+# Ingestion pauses once a subscriber lags this many events behind (ring buffer nearly lapped)
+SUBSCRIBER_LAG_LIMIT = int(EVENT_BUFFER_SIZE * 0.9)
+# ...or once the fullest DB writer queue is this full
+WRITER_HIGH_WATERMARK = 0.8
+# Longest single pause before ingestion resumes regardless
+BACKPRESSURE_MAX_WAIT = 2.0
+
+# Max seconds a worker waits for its queued writes before announcing a final status
+WRITER_DRAIN_TIMEOUT = 10.0
+
 
 def _map_stage_key(stage: str) -> Optional[str]:
     s = (stage or '').lower()
@@ -47,56 +81,174 @@ class SessionWorker:
         self.status = 'ongoing'
         self.progress: Dict[str, Dict[str, int]] = session.progress or _initial_progress(self.desired_total)
         self.entries_snapshot: List[Dict[str, Any]] = []
-        self.event_buffer: deque = deque(maxlen=2000)  # recent SSE events
+        # Sort name -> LiveOrder over entries_snapshot, built on the first sorted read
+        self._live_orders: Dict[str, LiveOrder] = {}
+        self.event_buffer: deque = deque(maxlen=EVENT_BUFFER_SIZE)  # recent (seq, event) pairs
+        # Sequence number of the last event; seqs start at 1 and never repeat
+        self._events_total = 0
+        # Subscribers block on this until a new event is appended
+        self._events_cv = threading.Condition()
+        # Distinguishes event ids of this worker run from a previous one for the same session
+        self.epoch = format(int(time.time() * 1000), 'x')
+        # Subscriber token -> number of events it has consumed
+        self._subscriber_pos: Dict[int, int] = {}
+        # Subscribers that outlasted a full backpressure wait; ignored until they catch up
+        self._stalled_subscribers = set()
         self.lock = threading.Lock()
         self.stop_event = threading.Event()
         self.thread = threading.Thread(target=self._run, name=f"BulkSession-{self.session_id}", daemon=True)
+        # Set while the session is driven by the shared asyncio engine instead of self.thread
+        self._async_running = False
         # External upstream session id (generated at start)
         self.upstream_session_id = session.external_session_id
         self._last_persist_ts = 0.0
         self._last_persist_len = 0
+        # Incremental persistence: entries_snapshot[:_persisted_count] are already stored as rows
+        self._persisted_count = 0
+        self._snapshot_replaced = False
+        # Set once result_file holds the current snapshot; cleared when entries change
+        self._compacted = False
+        # Final writes queued under self.lock; _drain_writes waits for them outside it
+        # and then publishes the events held back until the rows have landed
+        self._drain_pending = False
+        self._held_events: List[Dict[str, Any]] = []
+        # All DB writes go through the process-wide writer
+        self._writer = get_db_writer()
+        # Progress events are coalesced and written behind; the writer thread
+        # flushes the tail of a burst when the stream goes quiet
+        self._progress_buffer = ProgressBuffer(
+            on_due=self._take_due_progress,
+            schedule=lambda when, fn: self._writer.call_at(self.session_id, when, fn),
+        )
+        # Ingestion metrics
+        self._lines = 0
+        self._stream_started = 0.0
+        self._backpressure_seconds = 0.0
 
     def start(self):
-        if not self.thread.is_alive():
-            self.thread.start()
+        if self.is_alive():
+            return
+        if BULK_STREAM_ENGINE == 'asyncio':
+            from .async_engine import get_async_engine
+            engine = get_async_engine()
+            if engine is not None:
+                self._async_running = True
+                engine.submit(self)
+                return
+        self.thread.start()
+
+    def is_alive(self) -> bool:
+        return self._async_running or self.thread.is_alive()
+
+    def _write_pending_progress(self, force: bool = False) -> bool:
+        progress = self._progress_buffer.take(self.progress, force=force)
+        if progress is None:
+            return False
+        self._writer.progress(self.session_id, progress)
+        return True
 
-    def _persist_progress(self):
+    def _persist_progress(self, force: bool = False):
         try:
-            BulkResearchSession.objects.filter(id=self.session_id).update(progress=self.progress)
+            self._write_pending_progress(force=force)
         except Exception:
             pass
+
+    def _take_due_progress(self) -> Optional[Dict[str, Any]]:
+        # Runs on the writer thread, which must not wait for self.lock: its
+        # holder may be blocked on that thread's full queue. A busy worker is
+        # mid-event and flushes due progress itself.
+        if not self.lock.acquire(blocking=False):
+            return None
+        try:
+            return self._progress_buffer.take(self.progress)
         finally:
-            try:
-                connection.close()  # release DB slot after each write
-            except Exception:
-                pass
+            self.lock.release()
 
     def _persist_entries(self):
         try:
-            BulkResearchSession.objects.filter(id=self.session_id).update(
-                result_file=json.dumps({'entries': self.entries_snapshot})
-            )
+            # Pending progress goes out in the same writer batch
+            self._write_pending_progress(force=True)
+            if BULK_PERSIST_MODE == 'snapshot':
+                snapshot = list(self.entries_snapshot)
+                self._writer.result_file(self.session_id, snapshot)
+                self._writer.sync_entries(self.session_id, snapshot)
+            else:
+                self._persist_entries_delta()
+        except Exception:
+            pass
+
+    def _persist_entries_delta(self):
+        if self._snapshot_replaced or self._writer.entries_lost(self.session_id):
+            # A batch event swapped the whole list, or the writer dropped rows
+            # queued earlier; diff it against stored rows once
+            self._writer.sync_entries(self.session_id, list(self.entries_snapshot))
+            self._snapshot_replaced = False
+        else:
+            new_entries = self.entries_snapshot[self._persisted_count:]
+            if not new_entries:
+                return
+            self._writer.append_entries(self.session_id, new_entries, self._persisted_count)
+        self._persisted_count = len(self.entries_snapshot)
+
+    def _compact_entries(self):
+        """
+        Final write for a run: flush any pending rows, then store the whole
+        snapshot in result_file once. Caller holds self.lock and calls
+        _drain_writes after releasing it.
+        """
+        if self._compacted:
+            return
+        self._compacted = True
+        try:
+            if BULK_PERSIST_MODE == 'snapshot':
+                self._persist_entries()
+            else:
+                self._write_pending_progress(force=True)
+                self._persist_entries_delta()
+                self._writer.result_file(self.session_id, list(self.entries_snapshot))
+            # Readers go to the DB once the run ends, so the rows must land first
+            self._drain_pending = True
         except Exception:
             pass
-        finally:
-            try:
-                connection.close()  # release DB slot after each write
-            except Exception:
-                pass
 
     def _mark_completed(self):
         try:
-            BulkResearchSession.objects.filter(id=self.session_id).update(
+            # Status transition: flush buffered progress in the same UPDATE
+            self._progress_buffer.take(self.progress, force=True)
+            self._writer.update_session(
+                self.session_id,
                 status='completed',
-                completed_at=timezone.now()
+                completed_at=timezone.now(),
+                progress={k: dict(v) for k, v in self.progress.items()},
             )
+            self._drain_pending = True
         except Exception:
             pass
-        finally:
+
+    def _drain_writes(self):
+        """
+        Wait for writes queued by _compact_entries/_mark_completed, then publish
+        the events held back for them. Called without self.lock so snapshot()
+        and subscribers are not blocked for the length of the drain.
+        """
+        if self._drain_pending:
+            self._drain_pending = False
             try:
-                connection.close()  # release DB slot after each write
+                self._writer.barrier(self.session_id, timeout=WRITER_DRAIN_TIMEOUT)
+                if self._writer.entries_lost(self.session_id):
+                    # The final rows or result_file were dropped; the snapshot
+                    # no longer changes, so write it whole once more
+                    snapshot = list(self.entries_snapshot)
+                    self._writer.sync_entries(self.session_id, snapshot)
+                    self._writer.result_file(self.session_id, snapshot)
+                    self._writer.barrier(self.session_id, timeout=WRITER_DRAIN_TIMEOUT)
             except Exception:
                 pass
+        if self._held_events:
+            with self.lock:
+                events, self._held_events = self._held_events, []
+                for evt in events:
+                    self._append_event(evt)
 
     def _persist_entries_throttled(self, min_interval_sec: float = 3.0, min_growth: int = 5):
         try:
@@ -113,21 +265,54 @@ class SessionWorker:
         except Exception:
             pass
 
-    def _mark_completed(self):
-        try:
-            BulkResearchSession.objects.filter(id=self.session_id).update(
-                status='completed',
-                completed_at=timezone.now()
-            )
-        except Exception:
-            pass
-
     def _append_event(self, evt: Dict[str, Any]):
-        try:
-            self.event_buffer.append(evt)
-        except Exception:
-            # In case of non-serializable event shapes, fallback to string
-            self.event_buffer.append({'raw': evt})
+        if not isinstance(evt, dict):
+            # In case of unexpected event shapes, keep them wrapped
+            evt = {'raw': evt}
+        with self._events_cv:
+            self._events_total += 1
+            self.event_buffer.append((self._events_total, evt))
+            self._events_cv.notify_all()
+
+    def _events_since(self, seq: int) -> List[Any]:
+        # Caller holds _events_cv. Events older than the ring buffer are gone.
+        first = self._events_total - len(self.event_buffer) + 1
+        skip = max(0, seq + 1 - first)
+        return list(itertools.islice(self.event_buffer, skip, None))
+
+    def _saturated(self) -> bool:
+        if self._writer.saturation() >= WRITER_HIGH_WATERMARK:
+            return True
+        return bool(self._lagging_subscribers())
+
+    def _lagging_subscribers(self) -> List[int]:
+        # Subscribers about to lose events off the end of the ring buffer
+        return [
+            token for token, pos in list(self._subscriber_pos.items())
+            if token not in self._stalled_subscribers and self._events_total - pos >= SUBSCRIBER_LAG_LIMIT
+        ]
+
+    def _apply_backpressure(self):
+        """
+        Pause ingestion while the DB writer or a subscriber is saturated. Waits are
+        bounded so one stalled browser tab cannot hold the upstream stream open.
+        """
+        if self._async_running:
+            # The async engine pauses this session's reads on its loop instead,
+            # so a saturated session never holds a shared handler thread
+            return
+        if not self._saturated():
+            return
+        started = time.monotonic()
+        deadline = started + BACKPRESSURE_MAX_WAIT
+        while not self.stop_event.is_set() and time.monotonic() < deadline and self._saturated():
+            time.sleep(0.02)
+        self._end_backpressure(started, deadline)
+
+    def _end_backpressure(self, started: float, deadline: float):
+        self._backpressure_seconds += time.monotonic() - started
+        if time.monotonic() >= deadline:
+            self._stalled_subscribers.update(self._lagging_subscribers())
 
     def _update_from_event(self, evt: Dict[str, Any]):
         stage = (evt.get('stage') or '').lower()
@@ -141,6 +326,7 @@ class SessionWorker:
             if isinstance(remaining, int):
                 obj['remaining'] = remaining
             self.progress[key] = obj
+            self._progress_buffer.add()
             self._persist_progress()
 
         # Capture entries snapshot for both batch and single-item events
@@ -152,6 +338,9 @@ class SessionWorker:
                 entries = evt['entries']
             if entries is not None:
                 self.entries_snapshot = entries
+                self._live_orders = {}
+                self._snapshot_replaced = True
+                self._compacted = False
                 self._persist_entries_throttled()
             else:
                 # Single-item variants
@@ -164,6 +353,7 @@ class SessionWorker:
                     # Event itself resembles an entry; keep it for downstream mapping
                     self.entries_snapshot.append(evt); added = True
                 if added:
+                    self._compacted = False
                     self._persist_entries_throttled()
         except Exception:
             pass
@@ -174,16 +364,126 @@ class SessionWorker:
                 if self.status != 'completed':
                     self.status = 'completed'
                     if self.entries_snapshot:
-                        self._persist_entries()
+                        self._compact_entries()
                     self._mark_completed()
-                    self._append_event({'stage': 'status', 'status': 'completed'})
+                    self._held_events.append({'stage': 'status', 'status': 'completed'})
         except Exception:
             pass
 
     def _run(self):
+        try:
+            self._run_stream()
+        finally:
+            self._on_exit()
+
+    def _on_exit(self):
+        # Every exit path is a status transition for buffered progress
+        with self.lock:
+            self._persist_progress(force=True)
+            self._progress_buffer.close()
+        logger.info("Bulk session %s finished (%s): %s", self.session_id, self.status, self.stats())
+
+    def _upstream_request(self) -> Dict[str, Any]:
+        return {
+            'json': {
+                'user_id': self.user_id,
+                'keyword': self.keyword,
+                'desired_total': self.desired_total,
+                'session_id': self.upstream_session_id,
+            },
+            'headers': {
+                'Accept': 'text/event-stream',
+                'Content-Type': 'application/json'
+            },
+        }
+
+    def _handle_line(self, raw: str):
+        self._lines += 1
+        if not self._stream_started:
+            self._stream_started = time.monotonic()
+        line = (raw or '').strip()
+        if not line or line.startswith(':'):
+            return
+        if line.startswith('data:'):
+            payload = line[5:].strip()
+            try:
+                evt = codec.loads(payload)
+            except Exception:
+                evt = {'raw': payload}
+            with self.lock:
+                self._update_from_event(evt)
+                self._append_event(evt)
+            self._drain_writes()
+        # Opportunistic persistence tick (in case events are sparse)
+        self._persist_entries_throttled(min_interval_sec=5.0, min_growth=3)
+        with self.lock:
+            self._persist_progress()
+        self._apply_backpressure()
+
+    def _handle_document(self, envelope: Optional[Dict[str, Any]], entries: List[Any]):
+        # An oversized line parsed incrementally by SSEReader
+        self._lines += 1
+        if not self._stream_started:
+            self._stream_started = time.monotonic()
+        evt = attach_entries(envelope, entries) if (envelope is not None or entries) else {'raw': '<unparseable oversized line>'}
+        with self.lock:
+            self._update_from_event(evt)
+            self._append_event(evt)
+        self._drain_writes()
+        self._apply_backpressure()
+
+    def _handle_chunk(self, text: str, reader: SSEReader):
+        """
+        Feed decoded upstream text through `reader`; complete lines are handled
+        as they end, megafile lines are parsed entry by entry as they arrive.
+        """
+        self._handle_items(reader.feed(text))
+
+    def _handle_items(self, items):
+        for kind, item in items:
+            if self.stop_event.is_set():
+                return
+            if kind == 'line':
+                self._handle_line(item)
+            else:
+                self._handle_document(*item)
+
+    def _finish_stream(self):
+        # Normal end-of-stream: flush snapshot and exit
+        with self.lock:
+            if self.entries_snapshot:
+                self._compact_entries()
+            self._held_events.append({
+                'stage': 'snapshot',
+                'status': self.status,
+                'progress': self.progress,
+                'entries_count': len(self.entries_snapshot)
+            })
+        self._drain_writes()
+
+    def _fail(self, *events: Dict[str, Any]):
+        with self.lock:
+            self.status = 'failed'
+            if self.entries_snapshot:
+                self._compact_entries()
+            self._held_events.extend(events)
+            self._held_events.append({'stage': 'status', 'status': 'failed'})
+        self._drain_writes()
+
+    def _retry_delay(self, attempts: int, error: str) -> Optional[float]:
+        """
+        Record a retryable upstream error; returns the backoff before the next
+        attempt, or None once attempts are exhausted (the session is failed).
+        """
+        with self.lock:
+            self._append_event({'stage': 'error', 'error': error, 'attempt': attempts})
+        if attempts >= UPSTREAM_MAX_ATTEMPTS:
+            self._fail()
+            return None
+        return UPSTREAM_BACKOFFS[min(attempts - 1, len(UPSTREAM_BACKOFFS) - 1)]
+
+    def _run_stream(self):
         attempts = 0
-        max_attempts = 5
-        backoffs = [1, 2, 5, 10, 15]
         upstream = None
 
         while not self.stop_event.is_set():
@@ -194,97 +494,48 @@ class SessionWorker:
                 pass
 
             try:
-                upstream = requests.post(
+                upstream = http_client.post(
                     UPSTREAM_STREAM_URL,
-                    json={
-                        'user_id': self.user_id,
-                        'keyword': self.keyword,
-                        'desired_total': self.desired_total,
-                        'session_id': self.upstream_session_id,
-                    },
-                    headers={
-                        'Accept': 'text/event-stream',
-                        'Content-Type': 'application/json'
-                    },
                     stream=True,
-                    timeout=(10, 120)  # connect, read
+                    timeout=(10, 120),  # connect, read
+                    **self._upstream_request()
                 )
 
                 if not upstream.ok:
-                    with self.lock:
-                        self.status = 'failed'
-                        self._append_event({'stage': 'error', 'error': f'Upstream stream failed ({upstream.status_code})', 'raw': upstream.text[:300]})
-                        self._append_event({'stage': 'status', 'status': 'failed'})
+                    self._fail({'stage': 'error', 'error': f'Upstream stream failed ({upstream.status_code})', 'raw': upstream.text[:300]})
                     return
 
-                for raw in upstream.iter_lines(decode_unicode=True):
+                # Lines are split by SSEReader so a multi-MB megafile line is never held whole
+                reader = SSEReader()
+                for chunk in upstream.iter_content(chunk_size=UPSTREAM_CHUNK_SIZE, decode_unicode=True):
                     if self.stop_event.is_set():
                         break
-                    if raw is None:
-                        continue
-                    line = (raw or '').strip()
-                    if not line or line.startswith(':'):
-                        continue
-                    if line.startswith('data:'):
-                        payload = line[5:].strip()
-                        try:
-                            evt = json.loads(payload)
-                        except Exception:
-                            evt = {'raw': payload}
-                        with self.lock:
-                            self._update_from_event(evt)
-                            self._append_event(evt)
-                    # Opportunistic persistence tick (in case events are sparse)
-                    self._persist_entries_throttled(min_interval_sec=5.0, min_growth=3)
-                    time.sleep(0.01)
-
-                # Normal end-of-stream: flush snapshot and exit
-                with self.lock:
-                    if self.entries_snapshot:
-                        self._persist_entries()
-                    self._append_event({
-                        'stage': 'snapshot',
-                        'status': self.status,
-                        'progress': self.progress,
-                        'entries_count': len(self.entries_snapshot)
-                    })
+                    if chunk:
+                        self._handle_chunk(chunk, reader)
+                if not self.stop_event.is_set():
+                    self._handle_items(reader.close())
+
+                self._finish_stream()
                 return
 
             except ChunkedEncodingError as e:
                 attempts += 1
-                with self.lock:
-                    self._append_event({'stage': 'error', 'error': f'Chunked encoding ended prematurely: {e}', 'attempt': attempts})
-                if attempts >= max_attempts:
-                    with self.lock:
-                        self.status = 'failed'
-                        if self.entries_snapshot:
-                            self._persist_entries()
-                        self._append_event({'stage': 'status', 'status': 'failed'})
+                delay = self._retry_delay(attempts, f'Chunked encoding ended prematurely: {e}')
+                if delay is None:
                     return
-                time.sleep(backoffs[min(attempts - 1, len(backoffs) - 1)])
+                time.sleep(delay)
                 continue
 
             except (ConnectionError, ReadTimeout) as e:
                 attempts += 1
-                with self.lock:
-                    self._append_event({'stage': 'error', 'error': f'Upstream connection error: {e}', 'attempt': attempts})
-                if attempts >= max_attempts:
-                    with self.lock:
-                        self.status = 'failed'
-                        if self.entries_snapshot:
-                            self._persist_entries()
-                        self._append_event({'stage': 'status', 'status': 'failed'})
+                delay = self._retry_delay(attempts, f'Upstream connection error: {e}')
+                if delay is None:
                     return
-                time.sleep(backoffs[min(attempts - 1, len(backoffs) - 1)])
+                time.sleep(delay)
                 continue
 
             except Exception as e:
-                with self.lock:
-                    self.status = 'failed'
-                    self._append_event({'stage': 'error', 'error': f'Worker crashed: {e}'})
-                    self._append_event({'stage': 'status', 'status': 'failed'})
-                    if self.entries_snapshot:
-                        self._persist_entries()
+                self._fail({'stage': 'error', 'error': f'Worker crashed: {e}'})
                 return
 
             finally:
@@ -300,30 +551,110 @@ class SessionWorker:
                 'status': self.status,
                 'progress': self.progress.copy(),
                 'entries': list(self.entries_snapshot),
+                # Events up to `seq` are reflected above; resume subscribers after it
+                'seq': self._events_total,
+                'epoch': self.epoch,
             }
 
-    def subscribe(self):
-        # Generator yielding SSE events from in-memory buffer
-        idx = 0
-        last_emit = time.time()
+    def page(self, sort: Optional[str], order: str, offset: int,
+             end: Optional[int]) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Raw entries of one page of the live snapshot and the snapshot size, or
+        None while it is empty.
+        """
+        with self.lock:
+            entries = self.entries_snapshot
+            count = len(entries)
+            if not count:
+                return None
+            if not sort:
+                return entries[offset:end], count
+            live = self._live_orders.get(sort)
+            if live is None:
+                live = self._live_orders[sort] = LiveOrder(sort)
+        # New entries are keyed outside self.lock; `entries` is only appended
+        # to while it is the snapshot, and a replacement gets fresh orders
+        positions, total = live.page(entries, count, order, offset, end)
+        return [entries[i] for i in positions], total
+
+    def result_tag(self) -> Optional[str]:
+        """
+        Changes whenever the in-memory entries may have changed; None while
+        there are no entries yet.
+        """
+        if not self.entries_snapshot:
+            return None
+        return f"{self.epoch}-{self._events_total}-{len(self.entries_snapshot)}"
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def resume_point(self, last_event_id: str) -> Optional[int]:
+        """
+        Seq to resume after for an SSE Last-Event-ID, or None when the id belongs
+        to another worker run or its successors already fell off the ring buffer.
+        """
+        epoch, _, seq = (last_event_id or '').partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._events_cv:
+            oldest = self._events_total - len(self.event_buffer) + 1
+            if seq > self._events_total or seq + 1 < oldest:
+                return None
+        return seq
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = (time.monotonic() - self._stream_started) if self._stream_started else 0.0
+        return {
+            'lines': self._lines,
+            'lines_per_sec': round(self._lines / elapsed, 1) if elapsed > 0 else 0.0,
+            'backpressure_seconds': round(self._backpressure_seconds, 3),
+            'subscribers': len(self._subscriber_pos),
+            'entries': len(self.entries_snapshot),
+            'persisted_entries': self._persisted_count,
+            **self._progress_buffer.stats(),
+            'writer': self._writer.stats(),
+        }
+
+    def subscribe(self, after: int = 0):
+        """
+        Yield (seq, event) for every event after sequence number `after`,
+        blocking until new events arrive. Idle subscribers get a (None, heartbeat)
+        pair every heartbeat interval and otherwise cost nothing.
+        """
+        token = next(_subscriber_tokens)
+        pos = after  # seq of the last event handed out
+        self._subscriber_pos[token] = pos
         heartbeat_interval = 15  # seconds
-        while not self.stop_event.is_set():
-            emitted = False
-            while idx < len(self.event_buffer):
-                evt = self.event_buffer[idx]
-                idx += 1
-                last_emit = time.time()
-                emitted = True
-                yield evt
-            # Lightweight idle
-            if not emitted and (time.time() - last_emit) >= heartbeat_interval:
-                last_emit = time.time()
-                # harmless heartbeat; ignored by UI mapStage
-                yield {'stage': 'heartbeat', 'ts': int(last_emit)}
-            time.sleep(0.2)
+        try:
+            while not self.stop_event.is_set():
+                with self._events_cv:
+                    if self._events_total <= pos:
+                        self._events_cv.wait(timeout=heartbeat_interval)
+                    batch = self._events_since(pos)
+                if not batch:
+                    if not self.stop_event.is_set():
+                        # harmless heartbeat; ignored by UI mapStage
+                        yield None, {'stage': 'heartbeat', 'ts': int(time.time())}
+                    continue
+                if batch[0][0] > pos + 1:
+                    # Lapped by the ring buffer; the consumer has to resync from a snapshot
+                    yield None, {'stage': 'resync', 'missed': batch[0][0] - pos - 1}
+                for seq, evt in batch:
+                    pos = seq
+                    self._subscriber_pos[token] = pos
+                    if token in self._stalled_subscribers and self._events_total - pos < SUBSCRIBER_LAG_LIMIT // 2:
+                        self._stalled_subscribers.discard(token)
+                    yield seq, evt
+        finally:
+            self._subscriber_pos.pop(token, None)
+            self._stalled_subscribers.discard(token)
 
     def stop(self):
         self.stop_event.set()
+        with self._events_cv:
+            self._events_cv.notify_all()
 
 
 class BulkStreamManager:
@@ -334,7 +665,7 @@ class BulkStreamManager:
     def ensure_worker(self, session: BulkResearchSession, user_id: str):
         with self.lock:
             w = self.workers.get(session.id)
-            if w and w.thread.is_alive():
+            if w and w.is_alive():
                 return
             # Backfill external_session_id for legacy sessions if missing
             if not getattr(session, 'external_session_id', None):
@@ -352,11 +683,27 @@ class BulkStreamManager:
             self.workers[session.id] = w
             w.start()
 
-    def subscribe_events(self, session_id: int) -> Optional[Any]:
+    def subscribe_events(self, session_id: int, after: int = 0) -> Optional[Any]:
+        w = self.workers.get(session_id)
+        if not w:
+            return None
+        return w.subscribe(after=after)
+
+    def get_worker(self, session_id: int) -> Optional[SessionWorker]:
+        return self.workers.get(session_id)
+
+    def get_stats(self, session_id: int) -> Optional[Dict[str, Any]]:
+        w = self.workers.get(session_id)
+        if not w:
+            return None
+        return w.stats()
+
+    def get_page(self, session_id: int, sort: Optional[str], order: str, offset: int,
+                 end: Optional[int]) -> Optional[Tuple[List[Dict[str, Any]], int]]:
         w = self.workers.get(session_id)
         if not w:
             return None
-        return w.subscribe()
+        return w.page(sort, order, offset, end)
 
     def get_snapshot(self, session_id: int) -> Optional[Dict[str, Any]]:
         w = self.workers.get(session_id)
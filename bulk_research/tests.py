@@ -1,3 +1,279 @@
-from django.test import TestCase
+import base64
+import json
+import random
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from . import codec
+from .jsonstream import EntriesParser, SSEReader, attach_entries
+from .models import BulkResearchSession
+from .normalizer import simplify_result_entries
+from .result_store import (
+    LiveOrder, decode_cursor, decode_scan_cursor, encode_cursor, encode_scan_cursor, sort_value, sync_listings,
+    write_result_file,
+)
+from .sample_data import make_entries
+
+
+def _b64(obj) -> str:
+    return base64.urlsafe_b64encode(json.dumps(obj).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+class CodecTests(SimpleTestCase):
+    def test_lone_surrogates_are_escaped(self):
+        payload = {'t': 'a\ud800b', 'u': 'é'}
+        for backend in ('json', 'auto'):
+            with self.subTest(backend=backend), mock.patch.object(codec, 'BULK_JSON_CODEC', backend):
+                self.assertEqual(codec.dumpb(payload), '{"t":"a\\ud800b","u":"\\u00e9"}'.encode('ascii'))
+                self.assertEqual(codec.dumps(payload).encode('utf-8'), codec.dumpb(payload))
+                self.assertEqual(codec.load_result_file(codec.dump_result_file(payload)[0]), payload)
+
+
+class CursorTests(SimpleTestCase):
+    def test_offset_cursor_round_trip(self):
+        for sort, order, offset in ((None, 'desc', 0), ('price', 'asc', 40), ('created', 'desc', 7)):
+            with self.subTest(sort=sort, order=order):
+                self.assertEqual(decode_cursor(encode_cursor(sort, order, offset)), (sort, order, offset))
+
+    def test_scan_cursor_round_trip(self):
+        cases = (
+            (None, 'desc', ('r', 3, 12, 99)),
+            ('demand', 'desc', ('v', 4.5, 10)),
+            ('price', 'asc', ('v', 12, 3)),
+            ('views', 'desc', ('n', 8)),
+        )
+        for sort, order, key in cases:
+            with self.subTest(sort=sort, key=key):
+                self.assertEqual(decode_scan_cursor(encode_scan_cursor(sort, order, key)), (sort, order, key))
+
+    def test_malformed_offset_cursors(self):
+        bad = (
+            '!!!', _b64('x'), _b64([]), _b64(['demand', 'desc']), _b64(['bogus', 'desc', 0]),
+            _b64(['demand', 'up', 0]), _b64(['demand', 'desc', -1]), _b64(['demand', 'desc', True]),
+            _b64(['demand', 'desc', 1.5]), _b64([['demand'], 'desc', 0]),
+        )
+        for cursor in bad:
+            with self.subTest(cursor=cursor):
+                self.assertRaises(ValueError, decode_cursor, cursor)
+
+    def test_malformed_scan_cursors(self):
+        bad = (
+            '!!!', _b64({}), _b64(['demand', 'desc']),
+            _b64(['demand', 'desc', ['v', 'abc', 1]]),
+            _b64(['demand', 'desc', ['v', 1]]),
+            _b64(['demand', 'desc', ['v', True, 1]]),
+            _b64(['demand', 'desc', ['n']]),
+            _b64(['demand', 'desc', ['n', '1']]),
+            _b64(['demand', 'desc', ['r', 1, 2, 3]]),
+            _b64(['', 'desc', ['v', 1, 2]]),
+            _b64(['', 'desc', ['r', 1, 2]]),
+            _b64(['', 'desc', ['r', 1, 2, None]]),
+            _b64(['', 'desc', 'r']),
+            _b64(['bogus', 'desc', ['n', 1]]),
+            _b64(['demand', 'sideways', ['n', 1]]),
+        )
+        for cursor in bad:
+            with self.subTest(cursor=cursor):
+                self.assertRaises(ValueError, decode_scan_cursor, cursor)
+
+
+class LiveOrderTests(SimpleTestCase):
+    def _expected(self, entries, sort, order):
+        simplified = simplify_result_entries(entries)
+        values = [(sort_value(e, sort), i) for i, e in enumerate(simplified)]
+        valued = sorted((v for v in values if v[0] is not None), key=lambda v: v[0], reverse=True)
+        positions = [i for _, i in valued]
+        if order == 'asc':
+            positions.reverse()
+        return positions + [i for v, i in values if v is None]
+
+    def test_pages_follow_a_growing_snapshot(self):
+        pool = make_entries(120, seed=4)
+        for entry in pool[::6]:
+            entry['popular_info'].pop('demand', None)
+        for entry in pool[::5]:
+            entry['popular_info']['demand'] = 3  # ties keep upstream order
+        rnd = random.Random(0)
+        orders = {sort: LiveOrder(sort) for sort in ('demand', 'price', 'created')}
+        entries = []
+        while len(entries) < len(pool):
+            entries += pool[len(entries):len(entries) + rnd.randint(1, 25)]
+            for sort, live in orders.items():
+                for order in ('desc', 'asc'):
+                    offset = rnd.randint(0, len(entries))
+                    end = rnd.choice([None, offset + rnd.randint(1, 30)])
+                    with self.subTest(n=len(entries), sort=sort, order=order, offset=offset, end=end):
+                        self.assertEqual(
+                            live.page(entries, len(entries), order, offset, end),
+                            (self._expected(entries, sort, order)[offset:end], len(entries)),
+                        )
+
+
+def _session_entries(n: int, seed: int, id_offset: int):
+    entries = make_entries(n, seed=seed)
+    for entry in entries:
+        entry.pop('listing_id', None)
+        entry['popular_info']['listing_id'] += id_offset
+    return entries
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('paging', password='x')
+        self.client.force_login(self.user)
+        self.sessions = []
+        # The third session repeats listings of the first, so the cross-session
+        # scan has duplicates to drop
+        for seed, id_offset in ((1, 0), (2, 100000), (3, 0)):
+            entries = _session_entries(45, seed, id_offset)
+            session = BulkResearchSession.objects.create(
+                user=self.user, keyword=f'k{seed}', desired_total=len(entries), status='completed',
+            )
+            write_result_file(session.id, {'entries': entries})
+            sync_listings(session.id, entries)
+            self.sessions.append(session)
+
+    def _get(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200, resp.content[:200])
+        return json.loads(resp.content)
+
+    def _pages(self, base, first_query, cursor_query=''):
+        entries, pages = [], 0
+        body = self._get(f'{base}?{first_query}')
+        while True:
+            entries += body['entries']
+            pages += 1
+            if not body['next_cursor']:
+                return entries, pages
+            body = self._get(f"{base}?cursor={body['next_cursor']}{cursor_query}")
+
+    def test_result_pages_match_single_shot(self):
+        url = reverse('bulk_research_result', args=[self.sessions[0].id])
+        for sort in ('', 'demand', 'price', 'favorers', 'views', 'created'):
+            for order in ('desc', 'asc'):
+                with self.subTest(sort=sort, order=order):
+                    whole = self._get(f'{url}?sort={sort}&order={order}')['entries']
+                    paged, pages = self._pages(url, f'sort={sort}&order={order}&limit=7', '&limit=7')
+                    self.assertEqual(pages, 7)
+                    self.assertEqual(paged, whole)
+
+    def test_all_pages_match_single_shot(self):
+        url = reverse('bulk_research_all')
+        for sort in ('', 'demand', 'price', 'created'):
+            for order in ('desc', 'asc'):
+                with self.subTest(sort=sort, order=order):
+                    whole = self._get(f'{url}?sort={sort}&order={order}')
+                    self.assertEqual(whole['total'], 90)
+                    paged, _ = self._pages(url, f'sort={sort}&order={order}&limit=13', '&limit=13')
+                    self.assertEqual(paged, whole['entries'])
+                    self.assertEqual(len({e['listing_id'] for e in paged}), 90)
+
+    def test_malformed_scan_cursor_is_400(self):
+        url = reverse('bulk_research_all')
+        for cursor in ('!!!', _b64(['demand', 'desc', ['v', 'abc', 1]]), _b64(['', 'desc', ['n', 1]])):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(f'{url}?cursor={cursor}').status_code, 400)
+
+    def test_malformed_offset_cursor_is_400(self):
+        url = reverse('bulk_research_result', args=[self.sessions[0].id])
+        self.assertEqual(self.client.get(f"{url}?cursor={_b64(['demand', 'desc', 'x'])}").status_code, 400)
+
+
+def _chunks(text: str, sizes):
+    out, i, k = [], 0, 0
+    while i < len(text):
+        size = sizes[k % len(sizes)]
+        out.append(text[i:i + size])
+        i += size
+        k += 1
+    return out
+
+
+class EntriesParserTests(SimpleTestCase):
+    entries = [
+        {'listing_id': 1, 'title': 'quote " and brace } in a string', 'tags': ['a', ']', '{']},
+        {'listing_id': 2, 'title': 'escaped \\" backslash \\\\', 'nested': {'entries': [1, 2]}},
+        {'listing_id': 3, 'title': 'ünïcode “curly” ✓', 'empty': {}, 'none': None},
+        [1, 2, 3],
+        'plain string',
+        42,
+    ]
+
+    def _doc(self, megafile: bool) -> str:
+        if megafile:
+            doc = {'stage': 'megafile', 'megafile': {'meta': {'n': 6}, 'entries': self.entries, 'after': [1]}}
+        else:
+            doc = {'session': 'x', 'entries': self.entries, 'tail': {'ok': True, 's': ']}'}}
+        return json.dumps(doc, ensure_ascii=False)
+
+    def _parse(self, chunks):
+        parser = EntriesParser()
+        got = []
+        for chunk in chunks:
+            got += parser.feed(chunk)
+        got += parser.close()
+        return parser.envelope, got
+
+    def test_every_two_way_split(self):
+        for megafile in (False, True):
+            text = self._doc(megafile)
+            expected = json.loads(text)
+            for i in range(len(text) + 1):
+                envelope, got = self._parse([text[:i], text[i:]])
+                self.assertEqual(got, self.entries, f'split at {i}')
+                self.assertEqual(attach_entries(envelope, got), expected, f'split at {i}')
+
+    def test_chunk_sizes(self):
+        rnd = random.Random(0)
+        for megafile in (False, True):
+            text = self._doc(megafile)
+            for sizes in ([1], [2], [3, 5], [64], [rnd.randint(1, 40) for _ in range(50)]):
+                with self.subTest(megafile=megafile, sizes=sizes[:3]):
+                    envelope, got = self._parse(_chunks(text, sizes))
+                    self.assertEqual(attach_entries(envelope, got), json.loads(text))
+
+    def test_incomplete_document(self):
+        parser = EntriesParser()
+        parser.feed(self._doc(False)[:40])
+        self.assertRaises(ValueError, parser.close)
+
+
+class SSEReaderTests(SimpleTestCase):
+    def _stream(self) -> str:
+        big = {'stage': 'megafile', 'megafile': {'entries': [{'listing_id': i, 'title': 'x' * 30} for i in range(20)]}}
+        lines = [
+            ': comment',
+            'data: {"stage": "search", "remaining": 3}',
+            '',
+            'data: ' + json.dumps(big),
+            'data: {"stage": "status", "status": "completed"}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def _read(self, chunks, spill_at):
+        reader = SSEReader(spill_at=spill_at)
+        out = []
+        for chunk in chunks:
+            out += reader.feed(chunk)
+        out += reader.close()
+        return [
+            (kind, item if kind == 'line' else attach_entries(*item))
+            for kind, item in out
+        ]
+
+    def test_chunk_splits_match_whole_stream(self):
+        text = self._stream()
+        for spill_at in (10 ** 6, 100):
+            expected = self._read([text], spill_at)
+            self.assertEqual(len(expected), 5)
+            for sizes in ([1], [7], [3, 11, 50], [256]):
+                with self.subTest(spill_at=spill_at, sizes=sizes):
+                    self.assertEqual(self._read(_chunks(text, sizes), spill_at), expected)
+
+    def test_oversized_line_parsed_as_document(self):
+        kinds = [kind for kind, _ in self._read([self._stream()], 100)]
+        self.assertEqual(kinds, ['line', 'line', 'line', 'document', 'line'])
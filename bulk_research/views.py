@@ -1,15 +1,27 @@
+import hashlib
 import json
+import re
 import time
 from typing import Optional
 
-import requests
 from django.conf import settings
 from django.http import JsonResponse, StreamingHttpResponse, HttpResponseBadRequest, Http404
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import condition, require_POST
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
+from core import http_client
+from . import codec
+from .compression import compressed
+from .export import csv_lines, ndjson_lines
+from .jsonstream import EntriesParser, SSEReader, attach_entries
 from .stream_manager import bulk_stream_manager
-from .models import BulkResearchSession
+from .models import BulkResearchListing, BulkResearchSession
+from .normalizer import listing_detail, parse_fields, parse_view, simplify_result_entries, view_fields
+from .result_store import (
+    SIMPLIFIED_SCHEMA_VERSION, SORT_FIELDS, decode_cursor, ensure_listings, entries_from_payload, entries_response,
+    entry_listing_id, decode_scan_cursor, encode_scan_cursor, listing_lines, page_meta, project_lines, session_versions,
+    sync_listings, tagged_entries_response, user_listing_page, write_result_file,
+)
 from django.views.decorators.csrf import csrf_exempt 
 
 # Module-level: hardcoded upstream API endpoints
@@ -45,7 +57,7 @@ def bulk_research_replace_listing(request):
     headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
 
     try:
-        resp = requests.post("https://knowing-quail-helped.ngrok-free.app/replace-listing", json=upstream_body, headers=headers, timeout=60)
+        resp = http_client.post("https://knowing-quail-helped.ngrok-free.app/replace-listing", json=upstream_body, headers=headers, timeout=60)
     except Exception as e:
         return JsonResponse({'error': f'Upstream request failed: {str(e)}'}, status=502)
 
@@ -59,27 +71,22 @@ def bulk_research_replace_listing(request):
         return JsonResponse({'error': msg or f'Upstream failed ({resp.status_code})'}, status=resp.status_code)
 
     try:
-        full_json = resp.json()
+        full_json = codec.loads(resp.content)
     except Exception:
         full_json = {}
 
     # Persist entire session JSON verbatim to result_file
-    BulkResearchSession.objects.filter(id=session.id).update(result_file=json.dumps(full_json))
-    session.result_file = json.dumps(full_json)
+    write_result_file(session.id, full_json)
+
+    # Sync listing rows; only the replaced listing is actually written
+    sync_listings(session.id, entries_from_payload(full_json))
 
     # If entries present, mark completed and normalize progress
     _ensure_completed_if_result_exists(session)
 
-    # Build simplified entries for client to refresh caches
-    new_entries = _extract_entries_from_result_file(session)
-    simplified = _simplify_entries(new_entries)
-
-    return JsonResponse({
-        'status': 'ok',
-        'session_id': session.id,
-        'entries_count': len(simplified),
-        'entries': simplified,
-    })
+    # Return simplified entries for client to refresh caches
+    lines, _ = listing_lines(session)
+    return entries_response(lines, status='ok', session_id=session.id)
 
 def _api_url(name: str, job_id: Optional[str] = None) -> str:
     url = getattr(settings, name, None)
@@ -107,27 +114,16 @@ def _normalize_progress_full(total: int):
         'keywords':  {'total': total, 'remaining': 0},
     }
 
-def _extract_entries_from_result_file(session) -> list:
-    try:
-        if not session.result_file:
-            return []
-        raw = json.loads(session.result_file)
-        if isinstance(raw, dict):
-            if isinstance(raw.get('entries'), list):
-                return raw['entries']
-            if raw.get('megafile') and isinstance(raw['megafile'].get('entries'), list):
-                return raw['megafile']['entries']
-    except Exception:
-        return []
-    return []
-
 def _ensure_completed_if_result_exists(session) -> Optional[int]:
     """
-    If the session has a result_file with entries and is not yet completed,
+    If the session has persisted listings and is not yet completed,
     mark it completed and normalize progress. Returns entries_count when updated.
     """
-    entries = _extract_entries_from_result_file(session)
-    if entries and (session.status != 'completed'):
+    if session.status == 'completed':
+        return None
+    ensure_listings(session)
+    entries_count = BulkResearchListing.objects.filter(session_id=session.id).count()
+    if entries_count:
         progress = _normalize_progress_full(session.desired_total)
         BulkResearchSession.objects.filter(id=session.id).update(
             status='completed',
@@ -138,367 +134,9 @@ def _ensure_completed_if_result_exists(session) -> Optional[int]:
         session.status = 'completed'
         session.progress = progress
         session.completed_at = timezone.now()
-        return len(entries)
+        return entries_count
     return None
 
-def _simplify_entries(entries):
-    simplified = []
-    for entry in entries:
-        popular = entry.get('popular_info') or {}
-
-        listing_id = entry.get('listing_id') or popular.get('listing_id') or ''
-        title = popular.get('title') or entry.get('title') or ''
-        url = popular.get('url') or entry.get('url') or ''
-        demand = popular.get('demand', entry.get('demand', None))
-
-        user_id = entry.get('user_id') or popular.get('user_id')
-        shop_id = entry.get('shop_id') or popular.get('shop_id')
-        state = entry.get('state') or popular.get('state') or ''
-        description = popular.get('description') or entry.get('description') or ''
-
-        ts = (popular.get('original_creation_timestamp')
-              or popular.get('created_timestamp')
-              or entry.get('original_creation_timestamp')
-              or entry.get('created_timestamp'))
-        made_at_iso = None
-        made_at_display = None
-        if ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(ts))
-                made_at_iso = dt.isoformat()
-                made_at_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                made_at_display = str(ts)
-
-        primary_image = popular.get('primary_image') or entry.get('primary_image') or {}
-        image_url = primary_image.get('image_url') or ''
-        srcset = primary_image.get('srcset') or ''
-
-        variations_cleaned = popular.get('variations_cleaned') or entry.get('variations_cleaned') or {}
-        var_variations = []
-        try:
-            vlist = variations_cleaned.get('variations') or []
-            if isinstance(vlist, list):
-                for v in vlist:
-                    if not isinstance(v, dict):
-                        continue
-                    vid = v.get('id')
-                    vtitle = v.get('title')
-                    vopts = v.get('options') or []
-                    opts_out = []
-                    if isinstance(vopts, list):
-                        for o in vopts:
-                            if isinstance(o, dict):
-                                opts_out.append({
-                                    'value': o.get('value'),
-                                    'label': o.get('label'),
-                                })
-                    var_variations.append({
-                        'id': vid,
-                        'title': vtitle,
-                        'options': opts_out,
-                    })
-        except Exception:
-            pass
-
-        last_modified_ts = popular.get('last_modified_timestamp') or entry.get('last_modified_timestamp')
-        last_modified_iso = None
-        last_modified_display = None
-        if last_modified_ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(last_modified_ts))
-                last_modified_iso = dt.isoformat()
-                last_modified_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                last_modified_display = str(last_modified_ts)
-
-        quantity = entry.get('quantity') or popular.get('quantity')
-        num_favorers = entry.get('num_favorers') or popular.get('num_favorers')
-        listing_type = entry.get('listing_type') or popular.get('listing_type') or ''
-        file_data = entry.get('file_data') or popular.get('file_data') or ''
-        views = entry.get('views') or popular.get('views')
-
-        tags = popular.get('tags') or entry.get('tags') or []
-        if not isinstance(tags, list):
-            tags = []
-        materials = popular.get('materials') or entry.get('materials') or []
-        if not isinstance(materials, list):
-            materials = []
-        keywords = entry.get('keywords') or popular.get('keywords') or []
-        if not isinstance(keywords, list):
-            keywords = []
-
-        price = popular.get('price') or entry.get('price') or {}
-        price_amount = price.get('amount')
-        price_divisor = price.get('divisor')
-        price_currency = price.get('currency_code') or ''
-        price_value = None
-        price_display = None
-        try:
-            if isinstance(price_amount, (int, float)) and isinstance(price_divisor, int) and price_divisor:
-                price_value = float(price_amount) / int(price_divisor)
-                disp = ('{:.2f}'.format(price_value)).rstrip('0').rstrip('.')
-                price_display = f'{disp} {price_currency}'.strip()
-        except Exception:
-            pass
-
-        import re
-        sale_info = popular.get('sale_info') or entry.get('sale_info') or {}
-        active_promo = sale_info.get('active_promotion') or {}
-        buyer_promotion_name = active_promo.get('buyer_promotion_name') or ''
-        buyer_shop_promotion_name = active_promo.get('buyer_shop_promotion_name') or ''
-        buyer_promotion_description = active_promo.get('buyer_promotion_description') or ''
-        buyer_applied_promotion_description = active_promo.get('buyer_applied_promotion_description') or ''
-
-        promo_text = buyer_applied_promotion_description or buyer_promotion_description or ''
-        sale_percent = None
-        m = re.search(r'(\d+(?:\.\d+)?)\s*%', promo_text)
-        if m:
-            try:
-                sale_percent = float(m.group(1))
-            except Exception:
-                sale_percent = None
-        if sale_percent is None and isinstance(active_promo.get('seller_marketing_promotion'), dict):
-            pct = active_promo['seller_marketing_promotion'].get('order_discount_pct')
-            if isinstance(pct, (int, float)):
-                sale_percent = float(pct)
-
-        sale_subtotal_after_discount = sale_info.get('subtotal_after_discount')
-        sale_original_price = sale_info.get('original_price')
-
-        sale_price_value = None
-        sale_price_display = None
-        if isinstance(sale_subtotal_after_discount, str) and sale_subtotal_after_discount.strip():
-            sale_price_display = sale_subtotal_after_discount.strip()
-            try:
-                cleaned = re.sub(r'[^0-9.]', '', sale_price_display)
-                if cleaned:
-                    sale_price_value = float(cleaned)
-            except Exception:
-                sale_price_value = None
-        elif (price_value is not None) and (sale_percent is not None):
-            try:
-                sale_price_value = price_value * (1.0 - (sale_percent / 100.0))
-                disp = ('{:.2f}'.format(sale_price_value)).rstrip('0').rstrip('.')
-                sale_price_display = f'{disp} {price_currency}'.strip()
-            except Exception:
-                sale_price_value = None
-                sale_price_display = None
-
-        shop_obj = popular.get('shop') or entry.get('shop') or {}
-        shop_details = shop_obj.get('details') or {}
-        sh_shop_id = shop_obj.get('shop_id') or shop_details.get('shop_id')
-
-        shop_created_ts = (shop_details.get('created_timestamp')
-                           or shop_details.get('create_date')
-                           or shop_obj.get('created_timestamp'))
-        shop_created_iso = None
-        shop_created_display = None
-        if shop_created_ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(shop_created_ts))
-                shop_created_iso = dt.isoformat()
-                shop_created_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                shop_created_display = str(shop_created_ts)
-
-        shop_updated_ts = (shop_details.get('updated_timestamp')
-                           or shop_details.get('update_date')
-                           or shop_obj.get('updated_timestamp'))
-        shop_updated_iso = None
-        shop_updated_display = None
-        if shop_updated_ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(shop_updated_ts))
-                shop_updated_iso = dt.isoformat()
-                shop_updated_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                shop_updated_display = str(shop_updated_ts)
-
-        shop_sections = shop_obj.get('sections')
-        if not isinstance(shop_sections, list):
-            shop_sections = []
-
-        shop_reviews = shop_obj.get('reviews')
-        shop_reviews_simplified = []
-        if isinstance(shop_reviews, list):
-            for rv in shop_reviews:
-                if not isinstance(rv, dict):
-                    continue
-                cts = rv.get('created_timestamp') or rv.get('create_timestamp')
-                uts = rv.get('updated_timestamp') or rv.get('update_timestamp')
-                c_iso = None
-                c_disp = None
-                u_iso = None
-                u_disp = None
-                if cts is not None:
-                    try:
-                        dt = timezone.datetime.fromtimestamp(int(cts))
-                        c_iso = dt.isoformat()
-                        c_disp = dt.strftime('%b %d, %Y')
-                    except Exception:
-                        c_disp = str(cts)
-                if uts is not None:
-                    try:
-                        dt = timezone.datetime.fromtimestamp(int(uts))
-                        u_iso = dt.isoformat()
-                        u_disp = dt.strftime('%b %d, %Y')
-                    except Exception:
-                        u_disp = str(uts)
-                shop_reviews_simplified.append({
-                    'shop_id': rv.get('shop_id'),
-                    'listing_id': rv.get('listing_id'),
-                    'transaction_id': rv.get('transaction_id'),
-                    'buyer_user_id': rv.get('buyer_user_id'),
-                    'rating': rv.get('rating'),
-                    'review': rv.get('review'),
-                    'language': rv.get('language'),
-                    'image_url_fullxfull': rv.get('image_url_fullxfull'),
-                    'created_timestamp': cts,
-                    'created_iso': c_iso,
-                    'created': c_disp,
-                    'updated_timestamp': uts,
-                    'updated_iso': u_iso,
-                    'updated': u_disp,
-                })
-
-        relevant_reviews = [rv for rv in shop_reviews_simplified if rv.get('listing_id') == listing_id]
-        review_count_listing = len(relevant_reviews)
-        review_average_listing = None
-        if review_count_listing:
-            try:
-                review_average_listing = round(
-                    sum((rv.get('rating') or 0) for rv in relevant_reviews) / review_count_listing, 2
-                )
-            except Exception:
-                review_average_listing = None
-
-        shop_languages = shop_details.get('languages')
-        if not isinstance(shop_languages, list):
-            shop_languages = []
-
-        everbee = entry.get('everbee') or popular.get('everbee') or {}
-        everbee_results = everbee.get('results') or []
-        keyword_insights = []
-        if isinstance(everbee_results, list):
-            for res in everbee_results:
-                if not isinstance(res, dict):
-                    continue
-                kw = res.get('keyword') or res.get('query') or ''
-                metrics = res.get('metrics') or {}
-                vol = metrics.get('vol')
-                comp = metrics.get('competition')
-                resp = res.get('response') or {}
-                stats_obj = resp.get('stats') or {}
-                if vol is None:
-                    sv = stats_obj.get('searchVolume')
-                    if isinstance(sv, (int, float)):
-                        vol = sv
-                if comp is None:
-                    atl = stats_obj.get('avgTotalListings')
-                    if isinstance(atl, (int, float)):
-                        comp = atl
-                daily_block = resp.get('dailyStats') or {}
-                daily_stats_list = daily_block.get('stats') or []
-                daily_stats = []
-                if isinstance(daily_stats_list, list):
-                    for d in daily_stats_list:
-                        if isinstance(d, dict):
-                            daily_stats.append({
-                                'date': d.get('date'),
-                                'searchVolume': d.get('searchVolume')
-                            })
-                keyword_insights.append({
-                    'keyword': kw,
-                    'vol': vol,
-                    'competition': comp,
-                    'stats': stats_obj,
-                    'dailyStats': daily_stats,
-                })
-
-        shop_result = {
-            'shop_id': sh_shop_id,
-            'shop_name': shop_details.get('shop_name'),
-            'user_id': shop_details.get('user_id'),
-            'created_timestamp': shop_created_ts,
-            'created_iso': shop_created_iso,
-            'created': shop_created_display,
-            'title': shop_details.get('title'),
-            'announcement': shop_details.get('announcement'),
-            'currency_code': shop_details.get('currency_code'),
-            'is_vacation': shop_details.get('is_vacation'),
-            'vacation_message': shop_details.get('vacation_message'),
-            'sale_message': shop_details.get('sale_message'),
-            'digital_sale_message': shop_details.get('digital_sale_message'),
-            'updated_timestamp': shop_updated_ts,
-            'updated_iso': shop_updated_iso,
-            'updated': shop_updated_display,
-            'listing_active_count': shop_details.get('listing_active_count'),
-            'digital_listing_count': shop_details.get('digital_listing_count'),
-            'login_name': shop_details.get('login_name'),
-            'accepts_custom_requests': shop_details.get('accepts_custom_requests'),
-            'vacation_autoreply': shop_details.get('vacation_autoreply'),
-            'url': shop_details.get('url') or shop_obj.get('url'),
-            'image_url_760x100': shop_details.get('image_url_760x100'),
-            'icon_url_fullxfull': shop_details.get('icon_url_fullxfull'),
-            'num_favorers': shop_details.get('num_favorers'),
-            'languages': shop_languages,
-            'review_average': shop_details.get('review_average'),
-            'review_count': shop_details.get('review_count'),
-            'sections': shop_sections,
-            'reviews': shop_reviews_simplified,
-            'shipping_from_country_iso': shop_details.get('shipping_from_country_iso'),
-            'transaction_sold_count': shop_details.get('transaction_sold_count'),
-        }
-
-        simplified.append({
-            'listing_id': listing_id,
-            'title': title,
-            'url': url,
-            'demand': demand,
-            'made_at': made_at_display,
-            'made_at_iso': made_at_iso,
-            'primary_image': { 'image_url': image_url, 'srcset': srcset },
-            'variations': var_variations,
-            'has_variations': (len(var_variations) > 0),
-            'user_id': user_id,
-            'shop_id': shop_id or sh_shop_id,
-            'state': state,
-            'description': description,
-            'tags': tags,
-            'materials': materials,
-            'keywords': keywords,
-            'sections': shop_sections,
-            'reviews': shop_reviews_simplified,
-            'review_average': review_average_listing,
-            'review_count': review_count_listing,
-            'keyword_insights': keyword_insights,
-            'buyer_promotion_name': buyer_promotion_name,
-            'buyer_shop_promotion_name': buyer_shop_promotion_name,
-            'buyer_promotion_description': buyer_promotion_description,
-            'buyer_applied_promotion_description': buyer_applied_promotion_description,
-            'sale_percent': sale_percent,
-            'sale_price_value': sale_price_value,
-            'sale_price_display': sale_price_display,
-            'sale_subtotal_after_discount': sale_subtotal_after_discount,
-            'sale_original_price': sale_original_price,
-            'price_amount': price_amount,
-            'price_divisor': price_divisor,
-            'price_currency': price_currency,
-            'price_value': price_value,
-            'price_display': price_display,
-            'last_modified_timestamp': last_modified_ts,
-            'last_modified_iso': last_modified_iso,
-            'last_modified': last_modified_display,
-            'quantity': quantity,
-            'num_favorers': num_favorers,
-            'listing_type': listing_type,
-            'file_data': file_data,
-            'views': views,
-            'shop': shop_result,
-        })
-    return simplified
-
 @login_required
 @require_POST
 def bulk_research_reconnect(request, session_id: int):
@@ -508,17 +146,15 @@ def bulk_research_reconnect(request, session_id: int):
         raise Http404("Session not found")
 
     # BEFORE contacting upstream: if DB already has final results, finalize and return immediately
-    existing_entries = _extract_entries_from_result_file(session)
-    if existing_entries:
-        changed_count = _ensure_completed_if_result_exists(session)
-        simplified = _simplify_entries(existing_entries)
-        return JsonResponse({
-            'status': 'completed',
-            'progress': session.progress or _normalize_progress_full(session.desired_total),
-            'entries_count': len(simplified),
-            'entries': simplified,
-            'source': 'result_file'
-        })
+    existing_lines, _ = listing_lines(session)
+    if existing_lines:
+        _ensure_completed_if_result_exists(session)
+        return entries_response(
+            existing_lines,
+            status='completed',
+            progress=session.progress or _normalize_progress_full(session.desired_total),
+            source='result_file',
+        )
 
     payload = {
         'user_id': request.user.username,
@@ -529,30 +165,51 @@ def bulk_research_reconnect(request, session_id: int):
     headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
 
     try:
-        resp = requests.post(UPSTREAM_RECONNECT_URL, json=payload, headers=headers, stream=True, timeout=300)
+        resp = http_client.post(UPSTREAM_RECONNECT_URL, json=payload, headers=headers, stream=True, timeout=300)
     except Exception as exc:
         return JsonResponse({'error': f'Upstream reconnect error: {exc}'}, status=502)
 
     progress = session.progress or BulkResearchSession.build_initial_progress(session.desired_total)
     final_raw = None
-    buffer_acc = ''
+    # Non-JSON lines are pieces of one large payload; parse them as they arrive
+    pending = EntriesParser()
+    pending_entries = []
+    pending_seen = False
+
+    def _lines():
+        # Megafile-sized lines come back already parsed instead of as one huge string
+        reader = SSEReader()
+        for chunk in resp.iter_content(chunk_size=64 * 1024, decode_unicode=True):
+            if chunk:
+                yield from reader.feed(chunk)
+        yield from reader.close()
 
     try:
-        for chunk in resp.iter_lines(decode_unicode=True):
-            if not chunk:
+        for kind, item in _lines():
+            if kind == 'document':
+                envelope, entries = item
+                if envelope is not None or entries:
+                    final_raw = attach_entries(envelope, entries)
+                    break
                 continue
-            line = chunk.strip()
+            line = (item or '').strip()
             if not line:
                 continue
             # Handle SSE style: "data: {...}"
             if line.startswith('data:'):
                 line = line[5:].strip()
 
+            if pending_seen and not pending.done:
+                # Inside a multi-line payload every line is a fragment, even one that parses alone
+                pending_entries.extend(pending.feed(line))
+                continue
+
             obj = None
             try:
-                obj = json.loads(line)
+                obj = codec.loads(line)
             except Exception:
-                buffer_acc += line
+                pending_seen = True
+                pending_entries.extend(pending.feed(line))
                 continue
 
             stage = (obj.get('stage') or obj.get('phase') or '').lower()
@@ -579,15 +236,20 @@ def bulk_research_reconnect(request, session_id: int):
                 session.completed_at = timezone.now()
                 session.progress = progress
                 session.save(update_fields=['status', 'completed_at', 'progress'])
-        # Try parsing buffered large JSON (if sent as one big chunk)
-        if not final_raw and buffer_acc.strip():
+        # Finish the large JSON payload (if sent as one big chunk)
+        if not final_raw and pending_seen:
             try:
-                final_raw = json.loads(buffer_acc)
-            except Exception:
+                pending_entries.extend(pending.close())
+                if pending.envelope is not None:
+                    final_raw = attach_entries(pending.envelope, pending_entries)
+            except ValueError:
                 final_raw = None
     except Exception:
         # Swallow streaming errors; rely on any final payload or partial updates
         pass
+    finally:
+        # Drop the connection rather than return a half-read stream to the shared pool
+        resp.close()
 
     entries_count = 0
     if final_raw:
@@ -599,13 +261,11 @@ def bulk_research_reconnect(request, session_id: int):
                     raw_entries = final_raw['entries']
                 elif final_raw.get('megafile') and isinstance(final_raw['megafile'].get('entries'), list):
                     raw_entries = final_raw['megafile']['entries']
-            # Normalize and persist simplified entries for frontend compatibility
+            # Persist raw entries like the other write paths; listing rows hold the simplified shape
             if raw_entries:
-                simplified = _simplify_entries(raw_entries)
-                entries_count = len(simplified)
-                BulkResearchSession.objects.filter(id=session.id).update(
-                    result_file=json.dumps({'entries': simplified})
-                )
+                entries_count = len(raw_entries)
+                write_result_file(session.id, {'entries': raw_entries})
+                sync_listings(session.id, raw_entries)
                 session.status = 'completed'
                 session.completed_at = timezone.now()
                 session.progress = {
@@ -720,46 +380,69 @@ def bulk_research_start(request):
 @login_required
 def bulk_research_stream(request, session_id: int):
     try:
-        session = BulkResearchSession.objects.get(id=session_id, user=request.user)
+        session = BulkResearchSession.objects.defer('result_file').get(id=session_id, user=request.user)
     except BulkResearchSession.DoesNotExist:
         raise Http404("Session not found")
 
-    def to_event(obj):
-        return f"data: {json.dumps(obj)}\n\n"
+    def to_event(obj, event_id=None):
+        head = f"id: {event_id}\n" if event_id else ''
+        return f"{head}data: {codec.dumps(obj)}\n\n"
+
+    def snapshot_event(snap, resync=False):
+        evt = {
+            'stage': 'snapshot',
+            'status': snap.get('status'),
+            'progress': snap.get('progress'),
+            'entries_count': len(snap.get('entries') or []),
+        }
+        if resync:
+            evt['resync'] = True
+        return to_event(evt, worker.event_id(snap['seq']))
 
     # IMPORTANT: do not auto-start worker here to avoid duplicate upstream runs.
-    sub = bulk_stream_manager.subscribe_events(session.id)
+    worker = bulk_stream_manager.get_worker(session.id)
+    sub = None
+    snap = None
+    if worker is not None:
+        # EventSource sends Last-Event-ID on its own reconnects; the page passes it
+        # explicitly when it reopens the stream itself.
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or ''
+        resume_after = worker.resume_point(last_event_id) if last_event_id else None
+        if resume_after is None:
+            snap = worker.snapshot()
+            resume_after = snap['seq']
+        sub = worker.subscribe(after=resume_after)
 
     def proxy():
         try:
-            # Send snapshot first — prefer in-memory worker snapshot; otherwise read from DB.
-            snap = bulk_stream_manager.get_snapshot(session.id)
-            if snap:
-                yield to_event({
-                    'stage': 'snapshot',
-                    'status': snap.get('status'),
-                    'progress': snap.get('progress'),
-                    'entries_count': len(snap.get('entries') or []),
-                })
+            # Send snapshot first unless resuming — prefer in-memory worker snapshot; otherwise read from DB.
+            if worker is not None:
+                if snap is not None:
+                    yield snapshot_event(snap)
             else:
-                # Fallback from DB when no worker is active
-                try:
-                    rf = json.loads(session.result_file or '{}')
-                except Exception:
-                    rf = {}
-                entries = rf.get('entries') or []
+                # Fallback from DB when no worker is active; the stored count
+                # avoids loading and parsing result_file just to size it
                 progress = session.progress or BulkResearchSession.build_initial_progress(session.desired_total)
                 yield to_event({
                     'stage': 'snapshot',
                     'status': session.status,
                     'progress': progress,
-                    'entries_count': len(entries),
+                    'entries_count': session.entries_count,
                 })
 
             # Stream live events if a worker is present; otherwise keep connection alive with heartbeats.
             if sub is not None:
-                for evt in sub:
-                    yield to_event(evt)
+                snap_seq = 0
+                for seq, evt in sub:
+                    if evt.get('stage') == 'resync':
+                        resync = worker.snapshot()
+                        snap_seq = resync['seq']
+                        yield snapshot_event(resync, resync=True)
+                        continue
+                    if seq and seq <= snap_seq:
+                        # Already part of the resync snapshot
+                        continue
+                    yield to_event(evt, worker.event_id(seq) if seq else None)
             else:
                 # Avoid client auto-reconnect loops by keeping a live heartbeat
                 while True:
@@ -788,433 +471,239 @@ def bulk_research_delete(request, session_id: int):
     session.delete()
     return JsonResponse({'deleted': True})
 
+def _parse_page_params(request):
+    """
+    Parse limit/offset/cursor/sort/order query params for result pagination.
+    Raises ValueError on malformed input.
+    """
+    cursor = request.GET.get('cursor')
+    if cursor:
+        sort, order, offset = decode_cursor(cursor)
+    else:
+        sort = (request.GET.get('sort') or '').strip().lower() or None
+        if sort and sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort '{sort}'")
+        order = (request.GET.get('order') or 'desc').strip().lower()
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Unknown order '{order}'")
+        offset = int(request.GET.get('offset') or 0)
+    limit = request.GET.get('limit')
+    limit = int(limit) if limit not in (None, '') else None
+    if offset < 0 or (limit is not None and limit <= 0):
+        raise ValueError('limit must be positive and offset non-negative')
+    return sort, order, offset, limit
+
+def _query_tag(request) -> str:
+    return hashlib.sha1(request.GET.urlencode().encode('utf-8')).hexdigest()[:12]
+
+def _result_etag(request, session_id: int) -> Optional[str]:
+    """
+    ETag of bulk_research_result: the live snapshot's tag while a worker holds
+    entries, else the session's result_version; always scoped to the query.
+    """
+    row = (BulkResearchSession.objects.filter(id=session_id, user=request.user)
+           .values_list('status', 'result_version').first())
+    if row is None:
+        return None
+    status, version = row
+    if status == 'ongoing':
+        worker = bulk_stream_manager.get_worker(session_id)
+        tag = worker.result_tag() if worker is not None else None
+        if tag:
+            return f"snap-{tag}-{_query_tag(request)}"
+    return f"v{version}-s{SIMPLIFIED_SCHEMA_VERSION}-{_query_tag(request)}"
+
+def _all_etag(request) -> str:
+    versions = ','.join(f'{k}:{v}' for k, v in sorted(session_versions(request.user.id).items()))
+    digest = hashlib.sha1(versions.encode('utf-8')).hexdigest()[:16]
+    return f"all-{digest}-s{SIMPLIFIED_SCHEMA_VERSION}-{_query_tag(request)}"
+
+def _revalidate(response):
+    # Let browsers keep the body but always revalidate it with If-None-Match
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 @login_required
+@compressed
+@condition(etag_func=_result_etag)
 def bulk_research_result(request, session_id: int):
     try:
-        session = BulkResearchSession.objects.get(id=session_id, user=request.user)
+        sort, order, offset, limit = _parse_page_params(request)
+    except (ValueError, TypeError) as e:
+        return HttpResponseBadRequest(f"Invalid pagination parameters: {e}")
+    try:
+        fields = view_fields(parse_fields(request.GET.get('fields')), parse_view(request.GET.get('view')))
+    except ValueError as e:
+        return HttpResponseBadRequest(f"Invalid parameters: {e}")
+    end = None if limit is None else offset + limit
+
+    try:
+        # result_file is only needed to backfill listings of legacy sessions
+        session = BulkResearchSession.objects.defer('result_file').get(id=session_id, user=request.user)
     except BulkResearchSession.DoesNotExist:
         raise Http404("Session not found")
 
-    entries = []
-    used_snapshot = False
-
-    # Prefer live snapshot only while session is ongoing
+    # Prefer live snapshot only while session is ongoing; sorted pages come
+    # from the worker's incrementally kept order, so only the page is simplified
     if session.status == 'ongoing':
-        snap = bulk_stream_manager.get_snapshot(session_id)
-        if snap and isinstance(snap.get('entries'), list) and snap['entries']:
-            entries = snap['entries']
-            used_snapshot = True
+        live = bulk_stream_manager.get_page(session_id, sort, order, offset, end)
+        if live is not None:
+            raw, total = live
+            page = simplify_result_entries(raw, fields)
+            return _revalidate(codec.json_response({
+                'entries_count': len(page),
+                'entries': page,
+                'source': 'snapshot',
+                **page_meta(total, sort, order, offset, limit),
+            }))
+
+    # Fallback to persisted listing rows (updated on replace-listing);
+    # sorted pages are read straight off the per-column indexes
+    lines, total = listing_lines(session, sort, order, offset, limit)
+    return _revalidate(entries_response(
+        project_lines(lines, fields),
+        source='result_file',
+        **page_meta(total, sort, order, offset, limit),
+    ))
+
+def _detail_etag(request, session_id: int, listing_id: str) -> Optional[str]:
+    tag = _result_etag(request, session_id)
+    if tag is None:
+        return None
+    return f"{tag}-{hashlib.sha1(listing_id.encode('utf-8')).hexdigest()[:12]}"
 
-    # Fallback to persisted result_file (updated on replace-listing)
-    if not entries:
-        raw = {}
-        try:
-            if session.result_file:
-                raw = json.loads(session.result_file)
-        except Exception:
-            raw = {}
-        if isinstance(raw, dict):
-            if isinstance(raw.get('entries'), list):
-                entries = raw['entries']
-            elif raw.get('megafile') and isinstance(raw['megafile'].get('entries'), list):
-                entries = raw['megafile']['entries']
-
-    simplified = []
-    for entry in entries:
-        popular = entry.get('popular_info') or {}
-
-        # Basic fields
-        listing_id = entry.get('listing_id') or popular.get('listing_id') or ''
-        title = popular.get('title') or entry.get('title') or ''
-        url = popular.get('url') or entry.get('url') or ''
-        demand = popular.get('demand', entry.get('demand', None))
-
-        # IDs/state/description
-        user_id = entry.get('user_id') or popular.get('user_id')
-        shop_id = entry.get('shop_id') or popular.get('shop_id')
-        state = entry.get('state') or popular.get('state') or ''
-        description = popular.get('description') or entry.get('description') or ''
-
-        # Made at (display + iso)
-        ts = (popular.get('original_creation_timestamp')
-              or popular.get('created_timestamp')
-              or entry.get('original_creation_timestamp')
-              or entry.get('created_timestamp'))
-        made_at_iso = None
-        made_at_display = None
-        if ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(ts))
-                made_at_iso = dt.isoformat()
-                made_at_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                made_at_display = str(ts)
-
-        # Primary image
-        primary_image = popular.get('primary_image') or entry.get('primary_image') or {}
-        image_url = primary_image.get('image_url') or ''
-        srcset = primary_image.get('srcset') or ''
+@login_required
+@compressed
+@condition(etag_func=_detail_etag)
+def bulk_research_listing_detail(request, session_id: int, listing_id: str):
+    """
+    The fields `view=card` results leave out (description, shop, reviews,
+    sections, keyword stats and time series) for one listing, loaded when it
+    is opened.
+    """
+    try:
+        session = BulkResearchSession.objects.defer('result_file').get(id=session_id, user=request.user)
+    except BulkResearchSession.DoesNotExist:
+        raise Http404("Session not found")
 
-        # Variations (variations_cleaned.variations)
-        variations_cleaned = popular.get('variations_cleaned') or entry.get('variations_cleaned') or {}
-        var_variations = []
-        try:
-            vlist = variations_cleaned.get('variations') or []
-            if isinstance(vlist, list):
-                for v in vlist:
-                    if not isinstance(v, dict):
-                        continue
-                    vid = v.get('id')
-                    vtitle = v.get('title')
-                    vopts = v.get('options') or []
-                    opts_out = []
-                    if isinstance(vopts, list):
-                        for o in vopts:
-                            if isinstance(o, dict):
-                                opts_out.append({
-                                    'value': o.get('value'),
-                                    'label': o.get('label'),
-                                })
-                    var_variations.append({
-                        'id': vid,
-                        'title': vtitle,
-                        'options': opts_out,
-                    })
-        except Exception:
-            pass
+    simplified = None
+    if session.status == 'ongoing':
+        snap = bulk_stream_manager.get_snapshot(session_id)
+        entries = snap.get('entries') if snap else None
+        if isinstance(entries, list):
+            # Later duplicates win, as in the persisted rows
+            for position in range(len(entries) - 1, -1, -1):
+                if entry_listing_id(entries[position], position) == listing_id:
+                    simplified = simplify_result_entries([entries[position]])[0]
+                    break
+    if simplified is None:
+        ensure_listings(session)
+        line = (BulkResearchListing.objects.filter(session_id=session.id, listing_id=listing_id)
+                .values_list('simplified', flat=True).first())
+        if line is None:
+            raise Http404("Listing not found")
+        simplified = codec.loads(line)
+    return _revalidate(codec.json_response({'session_id': session.id, **listing_detail(simplified)}))
 
-        # Extra product detail fields
-        last_modified_ts = popular.get('last_modified_timestamp') or entry.get('last_modified_timestamp')
-        last_modified_iso = None
-        last_modified_display = None
-        if last_modified_ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(last_modified_ts))
-                last_modified_iso = dt.isoformat()
-                last_modified_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                last_modified_display = str(last_modified_ts)
-
-        quantity = entry.get('quantity') or popular.get('quantity')
-        num_favorers = entry.get('num_favorers') or popular.get('num_favorers')
-        listing_type = entry.get('listing_type') or popular.get('listing_type') or ''
-        file_data = entry.get('file_data') or popular.get('file_data') or ''
-        views = entry.get('views') or popular.get('views')
-
-        # Tags, materials, keywords
-        tags = popular.get('tags') or entry.get('tags') or []
-        if not isinstance(tags, list):
-            tags = []
-        materials = popular.get('materials') or entry.get('materials') or []
-        if not isinstance(materials, list):
-            materials = []
-        keywords = entry.get('keywords') or popular.get('keywords') or []
-        if not isinstance(keywords, list):
-            keywords = []
-
-        # Price (base)
-        price = popular.get('price') or entry.get('price') or {}
-        price_amount = price.get('amount')
-        price_divisor = price.get('divisor')
-        price_currency = price.get('currency_code') or ''
-        price_value = None
-        price_display = None
-        try:
-            if isinstance(price_amount, (int, float)) and isinstance(price_divisor, int) and price_divisor:
-                price_value = float(price_amount) / int(price_divisor)
-                disp = ('{:.2f}'.format(price_value)).rstrip('0').rstrip('.')
-                price_display = f'{disp} {price_currency}'.strip()
-        except Exception:
-            pass
+@login_required
+def bulk_research_export(request, session_id: int):
+    """
+    Stream a session's simplified entries as NDJSON (default) or CSV, one row
+    at a time.
+    """
+    fmt = (request.GET.get('format') or 'ndjson').strip().lower()
+    if fmt not in ('ndjson', 'csv'):
+        return HttpResponseBadRequest(f"Unknown format '{fmt}'")
+    try:
+        session = BulkResearchSession.objects.defer('result_file').get(id=session_id, user=request.user)
+    except BulkResearchSession.DoesNotExist:
+        raise Http404("Session not found")
 
-        # Sale info and computed sale price
-        import re
-        sale_info = popular.get('sale_info') or entry.get('sale_info') or {}
-        active_promo = sale_info.get('active_promotion') or {}
-        buyer_promotion_name = active_promo.get('buyer_promotion_name') or ''
-        buyer_shop_promotion_name = active_promo.get('buyer_shop_promotion_name') or ''
-        buyer_promotion_description = active_promo.get('buyer_promotion_description') or ''
-        buyer_applied_promotion_description = active_promo.get('buyer_applied_promotion_description') or ''
-
-        promo_text = buyer_applied_promotion_description or buyer_promotion_description or ''
-        sale_percent = None
-        m = re.search(r'(\d+(?:\.\d+)?)\s*%', promo_text)
-        if m:
-            try:
-                sale_percent = float(m.group(1))
-            except Exception:
-                sale_percent = None
-        if sale_percent is None and isinstance(active_promo.get('seller_marketing_promotion'), dict):
-            pct = active_promo['seller_marketing_promotion'].get('order_discount_pct')
-            if isinstance(pct, (int, float)):
-                sale_percent = float(pct)
-
-        sale_subtotal_after_discount = sale_info.get('subtotal_after_discount')
-        sale_original_price = sale_info.get('original_price')
-
-        sale_price_value = None
-        sale_price_display = None
-        if isinstance(sale_subtotal_after_discount, str) and sale_subtotal_after_discount.strip():
-            sale_price_display = sale_subtotal_after_discount.strip()
-            try:
-                cleaned = re.sub(r'[^0-9.]', '', sale_price_display)
-                if cleaned:
-                    sale_price_value = float(cleaned)
-            except Exception:
-                sale_price_value = None
-        elif (price_value is not None) and (sale_percent is not None):
-            try:
-                sale_price_value = price_value * (1.0 - (sale_percent / 100.0))
-                disp = ('{:.2f}'.format(sale_price_value)).rstrip('0').rstrip('.')
-                sale_price_display = f'{disp} {price_currency}'.strip()
-            except Exception:
-                sale_price_value = None
-                sale_price_display = None
-
-        # Shop details
-        shop_obj = popular.get('shop') or entry.get('shop') or {}
-        shop_details = shop_obj.get('details') or {}
-        sh_shop_id = shop_obj.get('shop_id') or shop_details.get('shop_id')
-
-        shop_created_ts = (shop_details.get('created_timestamp')
-                           or shop_details.get('create_date')
-                           or shop_obj.get('created_timestamp'))
-        shop_created_iso = None
-        shop_created_display = None
-        if shop_created_ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(shop_created_ts))
-                shop_created_iso = dt.isoformat()
-                shop_created_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                shop_created_display = str(shop_created_ts)
-
-        shop_updated_ts = (shop_details.get('updated_timestamp')
-                           or shop_details.get('update_date')
-                           or shop_obj.get('updated_timestamp'))
-        shop_updated_iso = None
-        shop_updated_display = None
-        if shop_updated_ts is not None:
-            try:
-                dt = timezone.datetime.fromtimestamp(int(shop_updated_ts))
-                shop_updated_iso = dt.isoformat()
-                shop_updated_display = dt.strftime('%b %d, %Y')
-            except Exception:
-                shop_updated_display = str(shop_updated_ts)
-
-        # Shop sections
-        shop_sections = shop_obj.get('sections')
-        if not isinstance(shop_sections, list):
-            shop_sections = []
-
-        # Shop reviews
-        shop_reviews = shop_obj.get('reviews')
-        shop_reviews_simplified = []
-        if isinstance(shop_reviews, list):
-            for rv in shop_reviews:
-                if not isinstance(rv, dict):
-                    continue
-                cts = rv.get('created_timestamp') or rv.get('create_timestamp')
-                uts = rv.get('updated_timestamp') or rv.get('update_timestamp')
-                c_iso = None
-                c_disp = None
-                u_iso = None
-                u_disp = None
-                if cts is not None:
-                    try:
-                        dt = timezone.datetime.fromtimestamp(int(cts))
-                        c_iso = dt.isoformat()
-                        c_disp = dt.strftime('%b %d, %Y')
-                    except Exception:
-                        c_disp = str(cts)
-                if uts is not None:
-                    try:
-                        dt = timezone.datetime.fromtimestamp(int(uts))
-                        u_iso = dt.isoformat()
-                        u_disp = dt.strftime('%b %d, %Y')
-                    except Exception:
-                        u_disp = str(uts)
-                shop_reviews_simplified.append({
-                    'shop_id': rv.get('shop_id'),
-                    'listing_id': rv.get('listing_id'),
-                    'transaction_id': rv.get('transaction_id'),
-                    'buyer_user_id': rv.get('buyer_user_id'),
-                    'rating': rv.get('rating'),
-                    'review': rv.get('review'),
-                    'language': rv.get('language'),
-                    'image_url_fullxfull': rv.get('image_url_fullxfull'),
-                    'created_timestamp': cts,
-                    'created_iso': c_iso,
-                    'created': c_disp,
-                    'updated_timestamp': uts,
-                    'updated_iso': u_iso,
-                    'updated': u_disp,
-                })
+    ensure_listings(session)
+    slug = re.sub(r'[^a-z0-9]+', '-', (session.keyword or '').lower()).strip('-')[:40] or 'session'
+    if fmt == 'csv':
+        resp = StreamingHttpResponse(csv_lines(session.id), content_type='text/csv; charset=utf-8')
+    else:
+        resp = StreamingHttpResponse(ndjson_lines(session.id), content_type='application/x-ndjson')
+    resp['Content-Disposition'] = f'attachment; filename="bulk-{session.id}-{slug}.{fmt}"'
+    resp['X-Accel-Buffering'] = 'no'
+    return resp
 
-        # Compute listing-level review metrics
-        relevant_reviews = [rv for rv in shop_reviews_simplified if rv.get('listing_id') == listing_id]
-        review_count_listing = len(relevant_reviews)
-        review_average_listing = None
-        if review_count_listing:
-            try:
-                review_average_listing = round(
-                    sum((rv.get('rating') or 0) for rv in relevant_reviews) / review_count_listing, 2
-                )
-            except Exception:
-                review_average_listing = None
-
-        # Shop languages
-        shop_languages = shop_details.get('languages')
-        if not isinstance(shop_languages, list):
-            shop_languages = []
-
-        # Keyword insights
-        everbee = entry.get('everbee') or popular.get('everbee') or {}
-        everbee_results = everbee.get('results') or []
-        keyword_insights = []
-        if isinstance(everbee_results, list):
-            for res in everbee_results:
-                if not isinstance(res, dict):
-                    continue
-                kw = res.get('keyword') or res.get('query') or ''
-                metrics = res.get('metrics') or {}
-                vol = metrics.get('vol')
-                comp = metrics.get('competition')
-                resp = res.get('response') or {}
-                stats_obj = resp.get('stats') or {}
-                if vol is None:
-                    sv = stats_obj.get('searchVolume')
-                    if isinstance(sv, (int, float)):
-                        vol = sv
-                if comp is None:
-                    atl = stats_obj.get('avgTotalListings')
-                    if isinstance(atl, (int, float)):
-                        comp = atl
-                daily_block = resp.get('dailyStats') or {}
-                daily_stats_list = daily_block.get('stats') or []
-                daily_stats = []
-                if isinstance(daily_stats_list, list):
-                    for d in daily_stats_list:
-                        if isinstance(d, dict):
-                            daily_stats.append({
-                                'date': d.get('date'),
-                                'searchVolume': d.get('searchVolume')
-                            })
-                keyword_insights.append({
-                    'keyword': kw,
-                    'vol': vol,
-                    'competition': comp,
-                    'stats': stats_obj,
-                    'dailyStats': daily_stats,
-                })
+def _parse_versions(raw: str):
+    # "12:3,15:7" -> {'12': 3, '15': 7}
+    out = {}
+    for part in raw.split(','):
+        if not part:
+            continue
+        sid, _, version = part.partition(':')
+        out[str(int(sid))] = int(version)
+    return out
 
-        shop_result = {
-            'shop_id': sh_shop_id,
-            'shop_name': shop_details.get('shop_name'),
-            'user_id': shop_details.get('user_id'),
-            'created_timestamp': shop_created_ts,
-            'created_iso': shop_created_iso,
-            'created': shop_created_display,
-            'title': shop_details.get('title'),
-            'announcement': shop_details.get('announcement'),
-            'currency_code': shop_details.get('currency_code'),
-            'is_vacation': shop_details.get('is_vacation'),
-            'vacation_message': shop_details.get('vacation_message'),
-            'sale_message': shop_details.get('sale_message'),
-            'digital_sale_message': shop_details.get('digital_sale_message'),
-            'updated_timestamp': shop_updated_ts,
-            'updated_iso': shop_updated_iso,
-            'updated': shop_updated_display,
-            'listing_active_count': shop_details.get('listing_active_count'),
-            'digital_listing_count': shop_details.get('digital_listing_count'),
-            'login_name': shop_details.get('login_name'),
-            'accepts_custom_requests': shop_details.get('accepts_custom_requests'),
-            'vacation_autoreply': shop_details.get('vacation_autoreply'),
-            'url': shop_details.get('url') or shop_obj.get('url'),
-            'image_url_760x100': shop_details.get('image_url_760x100'),
-            'icon_url_fullxfull': shop_details.get('icon_url_fullxfull'),
-            'num_favorers': shop_details.get('num_favorers'),
-            'languages': shop_languages,
-            'review_average': shop_details.get('review_average'),
-            'review_count': shop_details.get('review_count'),
-            'sections': shop_sections,
-            'reviews': shop_reviews_simplified,
-            'shipping_from_country_iso': shop_details.get('shipping_from_country_iso'),
-            'transaction_sold_count': shop_details.get('transaction_sold_count'),
-        }
+@login_required
+@compressed
+@condition(etag_func=_all_etag)
+def bulk_research_all(request):
+    """
+    Listings across all of the user's sessions, globally sorted and
+    deduplicated by listing id. Pass `versions` (the last response's version
+    vector as "id:version,...") to get {'fresh': true} when nothing changed,
+    `fields` (e.g. "grid") to narrow each entry and `view=card` to leave out
+    the fields the listing detail endpoint serves.
+    """
+    try:
+        cursor = request.GET.get('cursor')
+        if cursor:
+            sort, order, after = decode_scan_cursor(cursor)
+        else:
+            sort, order, _, _ = _parse_page_params(request)
+            after = None
+        limit = request.GET.get('limit')
+        limit = int(limit) if limit not in (None, '') else None
+        if limit is not None and limit <= 0:
+            raise ValueError('limit must be positive')
+        client_versions = request.GET.get('versions')
+        client_versions = _parse_versions(client_versions) if client_versions is not None else None
+        fields = view_fields(parse_fields(request.GET.get('fields')), parse_view(request.GET.get('view')))
+    except (ValueError, TypeError) as e:
+        return HttpResponseBadRequest(f"Invalid parameters: {e}")
+
+    versions = session_versions(request.user.id)
+    if client_versions is not None and client_versions == versions:
+        return JsonResponse({'fresh': True, 'versions': versions})
+
+    items, last, total = user_listing_page(request.user.id, sort, order, after, limit)
+    if fields is not None:
+        items = list(zip([sid for sid, _ in items], project_lines([line for _, line in items], fields)))
+    return _revalidate(tagged_entries_response(
+        items,
+        fresh=False,
+        total=total,
+        sort=sort,
+        order=order,
+        next_cursor=encode_scan_cursor(sort, order, last) if last else None,
+        versions=versions,
+    ))
 
-        simplified.append({
-        'listing_id': listing_id,
-        'title': title,
-        'url': url,
-        'demand': demand,
-        'made_at': made_at_display,
-        'made_at_iso': made_at_iso,
-        'primary_image': { 'image_url': image_url, 'srcset': srcset },
-        'variations': var_variations,
-        'user_id': user_id,
-        'shop_id': shop_id or sh_shop_id,
-        'state': state,
-        'description': description,
-        'tags': tags,
-        'materials': materials,
-        'keywords': keywords,
-        'sections': shop_sections,
-        'reviews': shop_reviews_simplified,
-        'review_average': review_average_listing,
-        'review_count': review_count_listing,
-        'keyword_insights': keyword_insights,
-        'demand_extras': (entry.get('demand_extras') or popular.get('demand_extras') or {
-            'total_carts': None,
-            'quantity': None,
-            'estimated_delivery_date': None,
-            'free_shipping': None
-        }),
-        'buyer_promotion_name': buyer_promotion_name,
-        'buyer_shop_promotion_name': buyer_shop_promotion_name,
-        'buyer_promotion_description': buyer_promotion_description,
-        'buyer_applied_promotion_description': buyer_applied_promotion_description,
-        'sale_percent': sale_percent,
-        'sale_price_value': sale_price_value,
-        'sale_price_display': sale_price_display,
-        'sale_subtotal_after_discount': sale_subtotal_after_discount,
-        'sale_original_price': sale_original_price,
-        'price_amount': price_amount,
-        'price_divisor': price_divisor,
-        'price_currency': price_currency,
-        'price_value': price_value,
-        'price_display': price_display,
-        'last_modified_timestamp': last_modified_ts,
-        'last_modified_iso': last_modified_iso,
-        'last_modified': last_modified_display,
-        'quantity': quantity,
-        'num_favorers': num_favorers,
-        'listing_type': listing_type,
-        'file_data': file_data,
-        'views': views,
-        'shop': shop_result,
-    })
-    return JsonResponse({
-        'entries_count': len(simplified),
-        'entries': simplified,
-        'source': 'snapshot' if used_snapshot else 'result_file',
-    })
 @login_required
 def bulk_research_list(request):
-    qs = BulkResearchSession.objects.filter(user=request.user).order_by('-created_at')
+    qs = BulkResearchSession.objects.filter(user=request.user).defer('result_file').order_by('-created_at')
     data = []
     for s in qs:
-        # Always check DB for persisted final results and auto-complete if present
-        _ensure_completed_if_result_exists(s)
+        # Auto-complete sessions that already have persisted listings
+        if s.entries_count:
+            _ensure_completed_if_result_exists(s)
         data.append({
             'id': s.id,
             'keyword': s.keyword,
             'desired_total': s.desired_total,
             'status': s.status,
             'progress': s.progress or BulkResearchSession.build_initial_progress(s.desired_total),
-            'created_at': s.created_at.isoformat()
+            'created_at': s.created_at.isoformat(),
+            'entries_count': s.entries_count,
+            'result_size': s.result_bytes,
+            'summary': s.result_summary or {},
         })
-    return JsonResponse({'sessions': data})
+    return codec.json_response({'sessions': data})
 
 def _candidate_start_urls():
     base = UPSTREAM_BASE.rstrip('/')
@@ -1243,7 +732,7 @@ def _try_upstream_start(user_id: str, keyword: str, desired_total: int, timeout_
     for url in _candidate_start_urls():
         for payload in _candidate_start_payloads(user_id, keyword, desired_total):
             try:
-                resp = requests.post(url, json=payload, headers=headers, timeout=timeout_sec)
+                resp = http_client.post(url, json=payload, headers=headers, timeout=timeout_sec)
             except Exception as e:
                 attempts.append({'url': url, 'error': str(e)})
                 continue
@@ -145,3 +145,50 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Bulk research worker persistence: 'incremental' appends new listing rows and writes
+# result_file once at the end of a run; 'snapshot' rewrites result_file on every persist.
+BULK_PERSIST_MODE = os.getenv("BULK_PERSIST_MODE", "incremental")
+# Progress events are coalesced per session and written at most this often (seconds),
+# or sooner once BULK_PROGRESS_FLUSH_MAX_PENDING updates are buffered.
+BULK_PROGRESS_FLUSH_INTERVAL = float(os.getenv("BULK_PROGRESS_FLUSH_INTERVAL", "1.0"))
+BULK_PROGRESS_FLUSH_MAX_PENDING = int(os.getenv("BULK_PROGRESS_FLUSH_MAX_PENDING", "50"))
+# Shared DB writer for bulk session workers: writer threads per process (each holds one
+# connection), pending intents per thread before workers block, intents per batch.
+BULK_DB_WRITER_POOL_SIZE = int(os.getenv("BULK_DB_WRITER_POOL_SIZE", "2"))
+BULK_DB_WRITER_QUEUE_SIZE = int(os.getenv("BULK_DB_WRITER_QUEUE_SIZE", "500"))
+BULK_DB_WRITER_BATCH_SIZE = int(os.getenv("BULK_DB_WRITER_BATCH_SIZE", "200"))
+# Upstream stream ingestion: 'thread' (one thread per bulk session) or 'asyncio'
+# (all sessions share one event loop; requires httpx).
+BULK_STREAM_ENGINE = os.getenv("BULK_STREAM_ENGINE", "thread")
+# Bulk research JSON responses larger than this are gzip/brotli encoded (bytes).
+BULK_COMPRESS_MIN_BYTES = int(os.getenv("BULK_COMPRESS_MIN_BYTES", "1024"))
+# Bulk research JSON codec: 'auto' uses orjson when installed, 'json' forces the stdlib.
+# Both produce identical bytes, so this only trades speed.
+BULK_JSON_CODEC = os.getenv("BULK_JSON_CODEC", "auto")
+# Stored result_file format: 'auto' (zstd when installed, else zlib), 'zstd', 'zlib' or 'none'.
+# Existing rows are converted with `manage.py recompress_results`.
+BULK_RESULT_COMPRESSION = os.getenv("BULK_RESULT_COMPRESSION", "auto")
+# Upstream HTTP calls share keep-alive sessions per host (core/http_client.py);
+# idle connections kept per host.
+UPSTREAM_POOL_MAXSIZE = int(os.getenv("UPSTREAM_POOL_MAXSIZE", "16"))
+# Keyword insight lookups are cached by normalized keyword (keyword_insight/cache.py):
+# 'memory' (per process, LRU), 'django' (the KEYWORD_INSIGHT_CACHE_ALIAS cache, shared
+# across workers) or 'off'. Successes are fresh for TTL seconds, then served stale for
+# STALE_TTL more while refreshing in the background; errors are cached for ERROR_TTL.
+KEYWORD_INSIGHT_CACHE = os.getenv("KEYWORD_INSIGHT_CACHE", "memory")
+KEYWORD_INSIGHT_CACHE_ALIAS = os.getenv("KEYWORD_INSIGHT_CACHE_ALIAS", "default")
+KEYWORD_INSIGHT_CACHE_TTL = float(os.getenv("KEYWORD_INSIGHT_CACHE_TTL", "900"))
+KEYWORD_INSIGHT_CACHE_STALE_TTL = float(os.getenv("KEYWORD_INSIGHT_CACHE_STALE_TTL", "3600"))
+KEYWORD_INSIGHT_CACHE_ERROR_TTL = float(os.getenv("KEYWORD_INSIGHT_CACHE_ERROR_TTL", "30"))
+KEYWORD_INSIGHT_CACHE_MAX_ENTRIES = int(os.getenv("KEYWORD_INSIGHT_CACHE_MAX_ENTRIES", "1000"))
+# Concurrent lookups of one keyword share a single upstream call; with the 'django' cache,
+# processes waiting on another process's call poll for its result this often (seconds).
+KEYWORD_INSIGHT_COALESCE_POLL = float(os.getenv("KEYWORD_INSIGHT_COALESCE_POLL", "0.05"))
+# /api/keyword-insight/batch/: keywords accepted per request, and upstream lookups run
+# concurrently per process (one thread pool shared by all batch requests).
+KEYWORD_INSIGHT_BATCH_MAX = int(os.getenv("KEYWORD_INSIGHT_BATCH_MAX", "100"))
+KEYWORD_INSIGHT_BATCH_CONCURRENCY = int(os.getenv("KEYWORD_INSIGHT_BATCH_CONCURRENCY", "50"))
+# Quick keyword search results are stored once per normalized keyword; each user keeps
+# pointers to this many recent searches (newest is served by /api/qks/last/).
+KEYWORD_INSIGHT_HISTORY_SIZE = int(os.getenv("KEYWORD_INSIGHT_HISTORY_SIZE", "50"))
@@ -1,16 +1,19 @@
 from django.contrib import admin
 from django.urls import path
-from core.views import home, supabase_health, signup, oauth_redirect, auth_confirm, resend_confirmation_view, users_main_dash, login_view
+from core.views import home, supabase_health, upstream_http_stats, signup, oauth_redirect, auth_confirm, resend_confirmation_view, users_main_dash, login_view
 from core.views import (
     users_stores, users_va_admin, users_customer_support,
     users_bulk_research, users_single_research, users_keyword_search,
     users_settings, logout_view
 )
-from keyword_insight.views import keyword_insight_search, keyword_insight_debug
+from keyword_insight.views import keyword_insight_search, keyword_insight_batch, keyword_insight_debug
 from bulk_research.views import bulk_research_start, bulk_research_stream, bulk_research_result, bulk_research_list
 from bulk_research.views import bulk_research_delete
 from bulk_research.views import bulk_research_reconnect
 from bulk_research.views import bulk_research_replace_listing
+from bulk_research.views import bulk_research_all
+from bulk_research.views import bulk_research_export
+from bulk_research.views import bulk_research_listing_detail
 from keyword_insight.sidebar_qks import quick_keyword_search, quick_keyword_last
 
 
@@ -18,6 +21,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', home, name='home'),
     path('health/supabase/', supabase_health, name='supabase_health'),
+    path('health/upstream/', upstream_http_stats, name='upstream_http_stats'),
     path('auth/signup/', signup, name='signup'),
     path('auth/login/', login_view, name='login'),
     path('auth/logout/', logout_view, name='logout'),
@@ -33,11 +37,15 @@ urlpatterns = [
     path('dashboard/keywords/', users_keyword_search, name='users_keyword_search'),
     path('settings/', users_settings, name='users_settings'),
     path('api/keyword-insight/search/', keyword_insight_search, name='keyword_insight_search'),
+    path('api/keyword-insight/batch/', keyword_insight_batch, name='keyword_insight_batch'),
     path('api/keyword-insight/debug/', keyword_insight_debug, name='keyword_insight_debug'),
     path('api/bulk-research/start/', bulk_research_start, name='bulk_research_start'),
     path('api/bulk-research/stream/<int:session_id>/', bulk_research_stream, name='bulk_research_stream'),
     path('api/bulk-research/result/<int:session_id>/', bulk_research_result, name='bulk_research_result'),
     path('api/bulk-research/list/', bulk_research_list, name='bulk_research_list'),
+    path('api/bulk-research/all/', bulk_research_all, name='bulk_research_all'),
+    path('api/bulk-research/listing/<int:session_id>/<str:listing_id>/', bulk_research_listing_detail, name='bulk_research_listing_detail'),
+    path('api/bulk-research/export/<int:session_id>/', bulk_research_export, name='bulk_research_export'),
     path('api/bulk-research/delete/<int:session_id>/', bulk_research_delete, name='bulk_research_delete'),
     path('api/bulk-research/reconnect/<int:session_id>/', bulk_research_reconnect, name='bulk_research_reconnect'),
     path('api/qks/search/', quick_keyword_search, name='quick_keyword_search'),
@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Shared, keep-alive HTTP sessions for upstream calls (keyword insights, bulk
+# research, Supabase auth), one per scheme://host so each host gets its own
+# connection pool and repeated calls skip the TCP+TLS handshake.
+
+# Idle keep-alive connections kept per host; concurrent calls beyond it still
+# go out, on connections that are closed afterwards
+UPSTREAM_POOL_MAXSIZE = int(getattr(settings, 'UPSTREAM_POOL_MAXSIZE', 16))
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    # Calls stay stateless: one shared jar would leak upstream cookies across users
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=UPSTREAM_POOL_MAXSIZE, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def session_for(url: str) -> requests.Session:
+    """
+    The pooled session for `url`'s host, created on first use.
+    """
+    origin = _origin(url)
+    session = _sessions.get(origin)
+    if session is None:
+        with _lock:
+            session = _sessions.get(origin)
+            if session is None:
+                session = _sessions[origin] = _new_session()
+                logger.debug("Pooled HTTP session created for %s", origin)
+    return session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return session_for(url).request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """
+    Per-host counters for this process: requests sent, connections opened
+    (each one a new handshake) and requests that reused a pooled connection.
+    """
+    out = {}
+    with _lock:
+        items = list(_sessions.items())
+    for origin, session in items:
+        sent = opened = 0
+        for adapter in set(session.adapters.values()):
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                sent += pool.num_requests
+                opened += pool.num_connections
+        out[origin] = {'requests': sent, 'new_connections': opened, 'reused': max(0, sent - opened)}
+    return out
+
+
+def close_all() -> None:
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def _reset_after_fork() -> None:
+    # Sockets inherited from a preloading parent must not be shared with it
+    global _lock
+    _lock = threading.Lock()
+    _sessions.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,7 +2,8 @@ from django.conf import settings
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import os
-import requests
+
+from . import http_client
 
 def get_supabase_client(use_service_role: bool = False) -> Client:
     load_dotenv(settings.BASE_DIR / ".env", override=True)
@@ -31,7 +32,7 @@ def ping_supabase() -> dict:
             return result
 
         result["method"] = "url-ping"
-        resp = requests.get(os.getenv("SUPABASE_URL") or settings.SUPABASE_URL, timeout=5)
+        resp = http_client.get(os.getenv("SUPABASE_URL") or settings.SUPABASE_URL, timeout=5)
         result["details"] = {"status_code": resp.status_code}
         result["ok"] = resp.ok
         return result
@@ -54,7 +55,7 @@ def sign_up_user(email: str, password: str, data: dict | None = None, redirect_t
     payload = {"email": email, "password": password, "data": data or {}}
     if redirect_to:
         payload["email_redirect_to"] = redirect_to
-    resp = requests.post(url, headers=headers, json=payload, timeout=10)
+    resp = http_client.post(url, headers=headers, json=payload, timeout=10)
     try:
         body = resp.json()
     except Exception:
@@ -71,5 +72,5 @@ def resend_signup_confirmation(email: str, redirect_to: str | None = None) -> bo
     payload = {"type": "signup", "email": email}
     if redirect_to:
         payload["email_redirect_to"] = redirect_to
-    resp = requests.post(url, headers=headers, json=payload, timeout=10)
+    resp = http_client.post(url, headers=headers, json=payload, timeout=10)
     return resp.ok
\ No newline at end of file
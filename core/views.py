@@ -11,6 +11,8 @@ from django.contrib.auth.decorators import login_required
 import re
 import json
 from django.views.decorators.csrf import ensure_csrf_cookie
+from django.contrib.admin.views.decorators import staff_member_required
+from . import http_client
 from .supabase_client import ping_supabase, sign_up_user, oauth_authorize_url, resend_signup_confirmation
 from .models import UserProfile
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
@@ -159,6 +161,11 @@ def supabase_health(request):
     status = 200 if result.get("ok") else 503
     return JsonResponse(result, status=status)
 
+@staff_member_required
+def upstream_http_stats(request):
+    # Connection reuse of this process's pooled upstream sessions
+    return JsonResponse({"hosts": http_client.stats()})
+
 @login_required(login_url='/auth/login/')
 def users_stores(request):
     return render(request, 'users_dasboard/stores/stores.html')
@@ -180,23 +187,10 @@ def users_bulk_research(request):
     """
     sessions_json = '[]'
     if BulkResearchSession:
-        qs = BulkResearchSession.objects.filter(user=request.user).order_by('-created_at')
+        # Result stats are stored columns; never load the result blob here
+        qs = BulkResearchSession.objects.filter(user=request.user).defer('result_file').order_by('-created_at')
         sessions_list = []
         for s in qs:
-            # Compute result stats
-            entries_count = 0
-            result_size = len(s.result_file or '')
-            try:
-                if s.result_file:
-                    raw = json.loads(s.result_file)
-                    if isinstance(raw, dict):
-                        if isinstance(raw.get('entries'), list):
-                            entries_count = len(raw['entries'])
-                        elif raw.get('megafile') and isinstance(raw['megafile'].get('entries'), list):
-                            entries_count = len(raw['megafile']['entries'])
-            except Exception:
-                pass
-
             sessions_list.append({
                 'id': s.id,
                 'keyword': s.keyword,
@@ -209,8 +203,9 @@ def users_bulk_research(request):
                     'keywords': {'total': 0, 'remaining': 0},
                 },
                 'created_at': s.created_at.isoformat(),
-                'entries_count': entries_count,
-                'result_size': result_size,
+                'entries_count': s.entries_count,
+                'result_size': s.result_bytes,
+                'summary': s.result_summary or {},
             })
         sessions_json = json.dumps(sessions_list)
     return render(request, 'users_dasboard/bulk_research/bulk_research.html', {
@@ -219,23 +214,9 @@ def users_bulk_research(request):
 
 @login_required
 def bulk_research_list(request):
-    qs = BulkResearchSession.objects.filter(user=request.user).order_by('-created_at')
+    qs = BulkResearchSession.objects.filter(user=request.user).defer('result_file').order_by('-created_at')
     data = []
     for s in qs:
-        # Compute result stats
-        entries_count = 0
-        result_size = len(s.result_file or '')
-        try:
-            if s.result_file:
-                raw = json.loads(s.result_file)
-                if isinstance(raw, dict):
-                    if isinstance(raw.get('entries'), list):
-                        entries_count = len(raw['entries'])
-                    elif raw.get('megafile') and isinstance(raw['megafile'].get('entries'), list):
-                        entries_count = len(raw['megafile']['entries'])
-        except Exception:
-            pass
-
         data.append({
             'id': s.id,
             'keyword': s.keyword,
@@ -243,8 +224,9 @@ def bulk_research_list(request):
             'status': s.status,
             'progress': s.progress or BulkResearchSession.build_initial_progress(s.desired_total),
             'created_at': s.created_at.isoformat(),
-            'entries_count': entries_count,
-            'result_size': result_size,
+            'entries_count': s.entries_count,
+            'result_size': s.result_bytes,
+            'summary': s.result_summary or {},
         })
     return JsonResponse({'sessions': data})
 
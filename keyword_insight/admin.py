@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import KeywordInsightLookup, KeywordInsightResult
 
-# Register your models here.
+
+@admin.register(KeywordInsightResult)
+class KeywordInsightResultAdmin(admin.ModelAdmin):
+    list_display = ('id', 'keyword', 'normalized_keyword', 'status', 'fetched_at')
+    search_fields = ('normalized_keyword',)
+    ordering = ('-fetched_at',)
+    exclude = ('body',)
+
+
+@admin.register(KeywordInsightLookup)
+class KeywordInsightLookupAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'keyword', 'status', 'looked_up_at')
+    search_fields = ('keyword', 'user__username')
+    raw_id_fields = ('user', 'result')
+    ordering = ('-looked_up_at',)
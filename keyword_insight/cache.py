@@ -0,0 +1,286 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Keyword insight lookups cached by normalized keyword, shared by the search
+# and quick-search endpoints. 'memory' is a per-process LRU, 'django' uses the
+# Django cache named by KEYWORD_INSIGHT_CACHE_ALIAS (shared by all workers when
+# that is Redis/Memcached/database), 'off' disables caching.
+KEYWORD_INSIGHT_CACHE = getattr(settings, 'KEYWORD_INSIGHT_CACHE', 'memory')
+KEYWORD_INSIGHT_CACHE_ALIAS = getattr(settings, 'KEYWORD_INSIGHT_CACHE_ALIAS', 'default')
+# Seconds a successful result is served as fresh, then served stale (while one
+# background refresh runs) for another KEYWORD_INSIGHT_CACHE_STALE_TTL seconds
+KEYWORD_INSIGHT_CACHE_TTL = float(getattr(settings, 'KEYWORD_INSIGHT_CACHE_TTL', 900))
+KEYWORD_INSIGHT_CACHE_STALE_TTL = float(getattr(settings, 'KEYWORD_INSIGHT_CACHE_STALE_TTL', 3600))
+# Error responses (timeouts, upstream 4xx/5xx) are cached briefly and never served stale
+KEYWORD_INSIGHT_CACHE_ERROR_TTL = float(getattr(settings, 'KEYWORD_INSIGHT_CACHE_ERROR_TTL', 30))
+KEYWORD_INSIGHT_CACHE_MAX_ENTRIES = int(getattr(settings, 'KEYWORD_INSIGHT_CACHE_MAX_ENTRIES', 1000))
+# How often a process waiting on another process's lookup polls the shared cache
+KEYWORD_INSIGHT_COALESCE_POLL = float(getattr(settings, 'KEYWORD_INSIGHT_COALESCE_POLL', 0.05))
+
+Fetch = Callable[[str, str, float], Tuple[int, Dict[str, Any]]]
+# (status, body, when upstream produced it as a unix timestamp)
+Result = Tuple[int, Dict[str, Any], float]
+
+
+def normalize_keyword(keyword: str) -> str:
+    return ' '.join(keyword.split()).casefold()
+
+
+def cache_key(endpoint: str, keyword: str) -> str:
+    # The endpoint is part of the key so a config change never serves old results
+    digest = hashlib.sha1(f'{endpoint}\n{normalize_keyword(keyword)}'.encode('utf-8')).hexdigest()
+    return f'kwi:{digest}'
+
+
+class _MemoryStore:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.items: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires <= time.time():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Dict[str, Any], timeout: float) -> None:
+        with self.lock:
+            self.items[key] = (time.time() + timeout, entry)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_entries:
+                self.items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.items.clear()
+
+
+class _DjangoStore:
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return caches[self.alias].get(key)
+
+    def set(self, key: str, entry: Dict[str, Any], timeout: float) -> None:
+        caches[self.alias].set(key, entry, timeout=max(1, int(timeout)))
+
+    def clear(self) -> None:
+        caches[self.alias].clear()
+
+
+def _make_store():
+    mode = (KEYWORD_INSIGHT_CACHE or 'memory').lower()
+    if mode == 'off':
+        return None
+    if mode == 'django':
+        return _DjangoStore(KEYWORD_INSIGHT_CACHE_ALIAS)
+    if mode != 'memory':
+        logger.warning("Unknown KEYWORD_INSIGHT_CACHE '%s'; using the in-process cache", mode)
+    return _MemoryStore(KEYWORD_INSIGHT_CACHE_MAX_ENTRIES)
+
+
+store = _make_store()
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# Single-flight: concurrent lookups of one key share the first caller's upstream
+# call. Within a process followers wait on an Event; across processes (with the
+# 'django' store) the leader holds a cache.add lock and the others poll for its
+# result.
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Result] = None
+
+
+_inflight: Dict[str, _Call] = {}
+_inflight_lock = threading.Lock()
+
+
+def _store_result(key: str, status: int, body: Dict[str, Any], fetched_at: float) -> None:
+    now = time.time()
+    if 200 <= status < 300:
+        fresh, stale = KEYWORD_INSIGHT_CACHE_TTL, KEYWORD_INSIGHT_CACHE_STALE_TTL
+    else:
+        fresh, stale = KEYWORD_INSIGHT_CACHE_ERROR_TTL, 0
+    if fresh <= 0:
+        return
+    entry = {'status': status, 'body': body, 'fetched_at': fetched_at,
+             'fresh_until': now + fresh, 'stale_until': now + fresh + stale}
+    try:
+        store.set(key, entry, fresh + stale)
+    except Exception as e:
+        logger.warning("Keyword insight cache write failed: %s", e)
+
+
+def _fetch_and_store(key: str, fetch: Fetch, api_base: str, keyword: str, timeout: float,
+                     refresh: bool) -> Result:
+    status, body = fetch(api_base, keyword, timeout)
+    fetched_at = time.time()
+    # A failed refresh keeps serving the stale success until it expires
+    if store is not None and (200 <= status < 300 or not refresh):
+        _store_result(key, status, body, fetched_at)
+    return status, body, fetched_at
+
+
+def _entry_result(entry: Dict[str, Any]) -> Result:
+    # Entries cached before fetched_at was recorded date from their fresh window
+    fetched_at = entry.get('fetched_at', entry['fresh_until'] - KEYWORD_INSIGHT_CACHE_TTL)
+    return entry['status'], entry['body'], fetched_at
+
+
+def _fresh_entry(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        entry = store.get(key)
+    except Exception:
+        return None
+    return entry if entry is not None and time.time() < entry['fresh_until'] else None
+
+
+def _fetch_across_processes(key: str, fetch: Fetch, api_base: str, keyword: str, timeout: float,
+                            refresh: bool) -> Tuple[int, Dict[str, Any], float, str]:
+    if not isinstance(store, _DjangoStore):
+        return (*_fetch_and_store(key, fetch, api_base, keyword, timeout, refresh), 'miss')
+    backend = caches[store.alias]
+    lock_key = f'{key}:lock'
+    lock_ttl = int(timeout) + 5
+    try:
+        leader = backend.add(lock_key, 1, timeout=lock_ttl)
+    except Exception as e:
+        logger.warning("Keyword insight lock failed: %s", e)
+        leader = True
+    if leader:
+        try:
+            return (*_fetch_and_store(key, fetch, api_base, keyword, timeout, refresh), 'miss')
+        finally:
+            try:
+                backend.delete(lock_key)
+            except Exception:
+                pass
+    # Another process is calling upstream: wait for its result to land
+    deadline = time.monotonic() + lock_ttl
+    while time.monotonic() < deadline:
+        time.sleep(KEYWORD_INSIGHT_COALESCE_POLL)
+        entry = _fresh_entry(key)
+        if entry is not None and not (refresh and entry['status'] >= 300):
+            return (*_entry_result(entry), 'coalesced')
+        if backend.get(lock_key) is None and _fresh_entry(key) is None:
+            # The leader finished without caching anything (or died): call upstream ourselves
+            break
+    return (*_fetch_and_store(key, fetch, api_base, keyword, timeout, refresh), 'miss')
+
+
+def _single_flight(key: str, fetch: Fetch, api_base: str, keyword: str, timeout: float,
+                   refresh: bool = False) -> Tuple[int, Dict[str, Any], float, str]:
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+    if not leader:
+        if call.done.wait(timeout + 5) and call.result is not None:
+            return (*call.result, 'coalesced')
+        return (*_fetch_and_store(key, fetch, api_base, keyword, timeout, refresh), 'miss')
+    try:
+        status, body, fetched_at, state = _fetch_across_processes(key, fetch, api_base, keyword, timeout, refresh)
+        call.result = (status, body, fetched_at)
+        return status, body, fetched_at, state
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+def _refresh(key: str, fetch: Fetch, api_base: str, keyword: str, timeout: float) -> None:
+    try:
+        _single_flight(key, fetch, api_base, keyword, timeout, refresh=True)
+    except Exception as e:
+        logger.warning("Keyword insight refresh failed for %r: %s", keyword, e)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _refresh_in_background(key: str, fetch: Fetch, api_base: str, keyword: str, timeout: float) -> None:
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    threading.Thread(target=_refresh, args=(key, fetch, api_base, keyword, timeout), daemon=True).start()
+
+
+def _cached(fetch: Fetch, api_base: str, endpoint: str,
+            keyword: str, timeout: float) -> Optional[Tuple[int, Dict[str, Any], float, str]]:
+    if store is None:
+        return None
+    key = cache_key(endpoint, keyword)
+    try:
+        entry = store.get(key)
+    except Exception as e:
+        logger.warning("Keyword insight cache read failed: %s", e)
+        return None
+    now = time.time()
+    if entry is None or now >= entry['stale_until']:
+        return None
+    if now < entry['fresh_until']:
+        return (*_entry_result(entry), 'hit')
+    _refresh_in_background(key, fetch, api_base, keyword, timeout)
+    return (*_entry_result(entry), 'stale')
+
+
+def cached_entry(fetch: Fetch, api_base: str, endpoint: str,
+                 keyword: str, timeout: float) -> Optional[Tuple[int, Dict[str, Any], str]]:
+    """
+    The cached (status, body, 'hit' | 'stale') for `keyword` without calling
+    upstream, or None. A stale entry schedules its background refresh.
+    """
+    cached = _cached(fetch, api_base, endpoint, keyword, timeout)
+    if cached is None:
+        return None
+    status, body, _, state = cached
+    return status, body, state
+
+
+def cached_result(fetch: Fetch, api_base: str, endpoint: str, keyword: str,
+                  timeout: float) -> Tuple[int, Dict[str, Any], str, float]:
+    """
+    Like cached_lookup, plus the unix time upstream produced the served body,
+    so callers persisting it can tell whether it is newer than their copy.
+    """
+    cached = _cached(fetch, api_base, endpoint, keyword, timeout)
+    if cached is None:
+        cached = _single_flight(cache_key(endpoint, keyword), fetch, api_base, keyword, timeout)
+    status, body, fetched_at, state = cached
+    return status, body, 'off' if store is None and state == 'miss' else state, fetched_at
+
+
+def cached_lookup(fetch: Fetch, api_base: str, endpoint: str, keyword: str,
+                  timeout: float) -> Tuple[int, Dict[str, Any], str]:
+    """
+    (status, body, cache state) for `keyword`, calling `fetch(api_base, keyword,
+    timeout)` on a miss. The state is 'hit', 'stale' (served while a background
+    refresh runs), 'coalesced' (shared another request's in-flight call), 'miss'
+    or 'off'.
+    """
+    status, body, state, _ = cached_result(fetch, api_base, endpoint, keyword, timeout)
+    return status, body, state
@@ -0,0 +1,60 @@
+import logging
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import normalize_keyword
+from .models import KeywordInsightLookup, KeywordInsightResult
+
+logger = logging.getLogger(__name__)
+
+# Recent quick keyword searches kept per user
+KEYWORD_INSIGHT_HISTORY_SIZE = int(getattr(settings, 'KEYWORD_INSIGHT_HISTORY_SIZE', 50))
+
+
+def record_lookup(user, keyword: str, status: int, body: Dict[str, Any], fetched_at: float) -> None:
+    """
+    Point the user's history at the shared result row for `keyword`. A success
+    replaces the row's body when it was fetched after the stored one (so hits
+    on a refreshed cache entry write through too); an error is kept on the
+    user's lookup and leaves the shared success alone.
+    """
+    norm = normalize_keyword(keyword)[:255]
+    now = timezone.now()
+    fetched = datetime.fromtimestamp(fetched_at, tz=dt_timezone.utc)
+    ok = 200 <= status < 300
+    results = KeywordInsightResult.objects.filter(normalized_keyword=norm)
+    if not ok or not results.filter(fetched_at__lt=fetched).update(
+            keyword=keyword[:255], status=status, body=body, fetched_at=fetched):
+        KeywordInsightResult.objects.bulk_create(
+            [KeywordInsightResult(normalized_keyword=norm, keyword=keyword[:255], status=status,
+                                  body=body, fetched_at=fetched)],
+            ignore_conflicts=True,
+        )
+    result_id = results.values_list('id', flat=True).first()
+
+    KeywordInsightLookup.objects.bulk_create(
+        [KeywordInsightLookup(user=user, result_id=result_id, keyword=keyword[:255], status=status,
+                              error=None if ok else body, looked_up_at=now)],
+        update_conflicts=True, unique_fields=['user', 'result'],
+        update_fields=['keyword', 'status', 'error', 'looked_up_at'],
+    )
+    lookups = KeywordInsightLookup.objects.filter(user=user)
+    expired = list(lookups.order_by('-looked_up_at').values_list('id', flat=True)[KEYWORD_INSIGHT_HISTORY_SIZE:])
+    if expired:
+        lookups.filter(id__in=expired).delete()
+
+
+def last_lookup(user) -> Optional[Dict[str, Any]]:
+    """
+    The user's most recent lookup in the shape quick_keyword_last has always
+    returned, or None.
+    """
+    row = (KeywordInsightLookup.objects.filter(user=user).select_related('result')
+           .order_by('-looked_up_at').first())
+    if row is None:
+        return None
+    result = row.result.body if row.error is None else row.error
+    return {"keyword": row.keyword, "status": row.status, "result": result, "saved_at": row.looked_up_at.isoformat()}
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KeywordInsightResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normalized_keyword', models.CharField(max_length=255, unique=True)),
+                ('keyword', models.CharField(max_length=255)),
+                ('status', models.PositiveSmallIntegerField(default=200)),
+                ('body', models.JSONField(blank=True, default=dict)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='KeywordInsightLookup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keyword', models.CharField(max_length=255)),
+                ('looked_up_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='keyword_lookups', to=settings.AUTH_USER_MODEL)),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lookups', to='keyword_insight.keywordinsightresult')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-looked_up_at'], name='keyword_lookup_user_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'result'), name='keyword_lookup_unique_per_user')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('keyword_insight', '0001_keyword_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='keywordinsightlookup',
+            name='error',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='keywordinsightlookup',
+            name='status',
+            field=models.PositiveSmallIntegerField(default=200),
+        ),
+    ]
@@ -1,3 +1,40 @@
 from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
 
-# Create your models here.
+
+class KeywordInsightResult(models.Model):
+    # Latest upstream result per normalized keyword (see cache.normalize_keyword),
+    # shared by every user who looks that keyword up
+    normalized_keyword = models.CharField(max_length=255, unique=True)
+    keyword = models.CharField(max_length=255)
+    status = models.PositiveSmallIntegerField(default=200)
+    body = models.JSONField(default=dict, blank=True)
+    fetched_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.keyword} ({self.status})"
+
+
+class KeywordInsightLookup(models.Model):
+    # A user's recent quick keyword searches: one row per user and keyword,
+    # bumped on every repeat search
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='keyword_lookups', db_index=False)
+    result = models.ForeignKey(KeywordInsightResult, on_delete=models.CASCADE, related_name='lookups')
+    keyword = models.CharField(max_length=255)
+    # What this lookup got back: an upstream error is kept here rather than
+    # over the shared result, which still holds the last success
+    status = models.PositiveSmallIntegerField(default=200)
+    error = models.JSONField(null=True, blank=True)
+    looked_up_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'result'], name='keyword_lookup_unique_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-looked_up_at'], name='keyword_lookup_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.keyword} @ {self.looked_up_at:%Y-%m-%d %H:%M}"
@@ -8,10 +8,14 @@ from django.http import JsonResponse, HttpRequest
 from django.conf import settings
 from django.views.decorators.http import require_POST, require_GET
 from django.contrib.auth.decorators import login_required
-from django.utils import timezone
+
+from core import http_client
+from .cache import cached_result
+from .history import last_lookup, record_lookup
 
 logger = logging.getLogger(__name__)
 
+# Where the last result lived before the keyword history tables; still read as a fallback
 SESSION_KEY_LAST = "qks_last_result"
 
 def _strip_bad_chars(val: Optional[str]) -> Optional[str]:
@@ -84,7 +88,7 @@ def _call_keyword_insights_api(api_base: str, keyword: str, timeout_sec: float)
     headers = {"Accept": "application/json", "Content-Type": "application/json"}
     logger.info("[QKS] Upstream call: endpoint=%s, base=%s, path=%s, timeout=%s", endpoint, api_base, api_path, timeout_sec)
     try:
-        resp = requests.post(endpoint, json={"keyword": keyword}, headers=headers, timeout=timeout_sec)
+        resp = http_client.post(endpoint, json={"keyword": keyword}, headers=headers, timeout=timeout_sec)
         content_type = (resp.headers.get("Content-Type", "") or "").lower()
         if "application/json" in content_type:
             try:
@@ -143,24 +147,24 @@ def quick_keyword_search(request: HttpRequest) -> JsonResponse:
                            details={"message": base_err, "hint": "Set ETSY_KEYWORD_INSIGHT_API_LINK in settings/.env (no trailing comma)."})
 
     timeout = _resolve_timeout()
-    status_code, body = _call_keyword_insights_api(api_base, cleaned, timeout)
+    endpoint = f"{api_base.rstrip('/')}{_resolve_api_path()}"
+    status_code, body, cache_state, fetched_at = cached_result(_call_keyword_insights_api, api_base, endpoint, cleaned, timeout)
 
     try:
-        request.session[SESSION_KEY_LAST] = {
-            "keyword": cleaned,
-            "result": body,
-            "saved_at": timezone.now().isoformat()
-        }
-        request.session.modified = True
+        record_lookup(request.user, cleaned, status_code, body, fetched_at)
     except Exception as e:
-        logger.warning("[QKS] Failed to persist last result in session: %s", str(e))
+        logger.warning("[QKS] Failed to persist last result: %s", str(e))
+    # Results used to live in the session; drop the copy so the session row stays small
+    request.session.pop(SESSION_KEY_LAST, None)
 
-    return JsonResponse({"keyword": cleaned, "status": status_code, "body": body}, status=status_code)
+    resp = JsonResponse({"keyword": cleaned, "status": status_code, "body": body}, status=status_code)
+    resp["X-Cache"] = cache_state.upper()
+    return resp
 
 @require_GET
 @login_required
 def quick_keyword_last(request: HttpRequest) -> JsonResponse:
-    payload = request.session.get(SESSION_KEY_LAST) or {}
+    payload = last_lookup(request.user) or request.session.get(SESSION_KEY_LAST) or {}
     if not payload:
         return JsonResponse({"saved": False, "last": None}, status=200)
     return JsonResponse({"saved": True, "last": payload}, status=200)
\ No newline at end of file
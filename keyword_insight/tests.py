@@ -1,3 +1,145 @@
-from django.test import TestCase
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from . import cache
+from .history import last_lookup, record_lookup
+from .models import KeywordInsightResult
+
+ENDPOINT = 'http://upstream.test/api/keyword-insights'
+
+
+class FakeUpstream:
+    def __init__(self, status: int = 200, delay: float = 0):
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, api_base, keyword, timeout):
+        with self.lock:
+            self.calls += 1
+            n = self.calls
+        if self.delay:
+            time.sleep(self.delay)
+        return self.status, {'keyword': keyword, 'n': n}
+
+
+class CacheStateTests(SimpleTestCase):
+    def setUp(self):
+        self.store = cache._MemoryStore(10)
+        patcher = mock.patch.object(cache, 'store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lookup(self, fetch, keyword='Wood Sign'):
+        return cache.cached_lookup(fetch, 'http://upstream.test', ENDPOINT, keyword, 5)
+
+    def expire(self, keyword, fresh=True, stale=False):
+        _, entry = self.store.items[cache.cache_key(ENDPOINT, keyword)]
+        if fresh:
+            entry['fresh_until'] = time.time() - 1
+        if stale:
+            entry['stale_until'] = time.time() - 1
+
+    def test_miss_then_hit(self):
+        fetch = FakeUpstream()
+        self.assertEqual(self.lookup(fetch), (200, {'keyword': 'Wood Sign', 'n': 1}, 'miss'))
+        # Normalized keywords share an entry
+        self.assertEqual(self.lookup(fetch, '  wood   SIGN '), (200, {'keyword': 'Wood Sign', 'n': 1}, 'hit'))
+        self.assertEqual(fetch.calls, 1)
+
+    def test_stale_served_while_refreshing(self):
+        fetch = FakeUpstream()
+        self.lookup(fetch)
+        self.expire('Wood Sign')
+        status, body, state = self.lookup(fetch)
+        self.assertEqual((status, body['n'], state), (200, 1, 'stale'))
+        deadline = time.monotonic() + 5
+        while cache._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status, body, state = self.lookup(fetch)
+        self.assertEqual((status, body['n'], state), (200, 2, 'hit'))
+
+    def test_expired_entry_is_a_miss(self):
+        fetch = FakeUpstream()
+        self.lookup(fetch)
+        self.expire('Wood Sign', stale=True)
+        self.assertEqual(self.lookup(fetch)[2], 'miss')
+        self.assertEqual(fetch.calls, 2)
+
+    def test_errors_are_cached_briefly_and_never_served_stale(self):
+        fetch = FakeUpstream(status=503)
+        self.assertEqual(self.lookup(fetch)[::2], (503, 'miss'))
+        self.assertEqual(self.lookup(fetch)[::2], (503, 'hit'))
+        _, entry = self.store.items[cache.cache_key(ENDPOINT, 'Wood Sign')]
+        self.assertEqual(entry['stale_until'], entry['fresh_until'])
+        self.expire('Wood Sign', stale=True)
+        fetch.status = 200
+        self.assertEqual(self.lookup(fetch)[::2], (200, 'miss'))
+
+    def test_failed_refresh_keeps_stale_success(self):
+        fetch = FakeUpstream()
+        self.lookup(fetch)
+        self.expire('Wood Sign')
+        fetch.status = 500
+        cache._refresh(cache.cache_key(ENDPOINT, 'Wood Sign'), fetch, 'http://upstream.test', 'Wood Sign', 5)
+        status, body, state = self.lookup(fetch)
+        self.assertEqual((status, body['n'], state), (200, 1, 'stale'))
+
+    def test_concurrent_misses_are_coalesced(self):
+        fetch = FakeUpstream(delay=0.3)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.lookup(fetch))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual(sorted(state for _, _, state in results), ['coalesced'] * 4 + ['miss'])
+        self.assertTrue(all(body['n'] == 1 for _, body, _ in results))
+
+    def test_off(self):
+        fetch = FakeUpstream()
+        with mock.patch.object(cache, 'store', None):
+            self.assertEqual(self.lookup(fetch)[2], 'off')
+            self.assertEqual(self.lookup(fetch)[2], 'off')
+        self.assertEqual(fetch.calls, 2)
+
+    def test_cached_result_reports_fetch_time(self):
+        fetch = FakeUpstream()
+        before = time.time()
+        first = cache.cached_result(fetch, 'http://upstream.test', ENDPOINT, 'lamp', 5)
+        second = cache.cached_result(fetch, 'http://upstream.test', ENDPOINT, 'lamp', 5)
+        self.assertEqual((first[2], second[2]), ('miss', 'hit'))
+        self.assertGreaterEqual(first[3], before)
+        self.assertEqual(first[3], second[3])
+
+
+class HistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('kw', password='x')
+        self.other = User.objects.create_user('kw2', password='x')
+
+    def test_newer_success_writes_through(self):
+        record_lookup(self.user, 'Lamp', 200, {'n': 1}, 1000.0)
+        record_lookup(self.other, 'lamp', 200, {'n': 2}, 2000.0)
+        # An older cached copy does not overwrite the newer body
+        record_lookup(self.user, 'lamp', 200, {'n': 0}, 500.0)
+        self.assertEqual(KeywordInsightResult.objects.get(normalized_keyword='lamp').body, {'n': 2})
+        self.assertEqual(last_lookup(self.user)['result'], {'n': 2})
+
+    def test_error_is_kept_per_lookup(self):
+        record_lookup(self.other, 'lamp', 200, {'n': 1}, 1000.0)
+        record_lookup(self.user, 'lamp', 503, {'error': {'code': 'UPSTREAM'}}, 2000.0)
+        last = last_lookup(self.user)
+        self.assertEqual((last['status'], last['result']), (503, {'error': {'code': 'UPSTREAM'}}))
+        self.assertEqual(last_lookup(self.other)['result'], {'n': 1})
+        self.assertEqual(KeywordInsightResult.objects.get(normalized_keyword='lamp').body, {'n': 1})
+        # A later success clears the error
+        record_lookup(self.user, 'lamp', 200, {'n': 3}, 3000.0)
+        self.assertEqual(last_lookup(self.user)['status'], 200)
+        self.assertEqual(last_lookup(self.user)['result'], {'n': 3})
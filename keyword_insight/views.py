@@ -1,17 +1,41 @@
 from django.shortcuts import render
+import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Tuple, Dict, Any
 from urllib.parse import urlparse
 
 import requests
-from django.http import JsonResponse, HttpRequest
+from django.http import JsonResponse, HttpRequest, StreamingHttpResponse
 from django.conf import settings
 from django.views.decorators.http import require_POST, require_GET
 from django.contrib.auth.decorators import login_required
 
+from core import http_client
+from . import cache as keyword_cache
+
 logger = logging.getLogger(__name__)
 
+# Batch lookups: keywords per request, and upstream calls in flight per process
+# (shared by all batch requests)
+KEYWORD_INSIGHT_BATCH_MAX = int(getattr(settings, 'KEYWORD_INSIGHT_BATCH_MAX', 100))
+KEYWORD_INSIGHT_BATCH_CONCURRENCY = int(getattr(settings, 'KEYWORD_INSIGHT_BATCH_CONCURRENCY', 50))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _batch_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=KEYWORD_INSIGHT_BATCH_CONCURRENCY,
+                                               thread_name_prefix="keyword-batch")
+    return _executor
+
 def _strip_bad_chars(val: Optional[str]) -> Optional[str]:
     if not isinstance(val, str):
         return val
@@ -82,7 +106,6 @@ def _json_error(message: str, status: int, *, error_code: Optional[str] = None,
 
 def _extract_keyword(request: HttpRequest) -> Tuple[Optional[str], Optional[Tuple[str, int, Dict[str, Any]]]]:
     try:
-        import json
         if request.headers.get("Content-Type", "").lower().startswith("application/json"):
             parsed = json.loads(request.body.decode("utf-8") or "{}")
             kw = parsed.get("keyword")
@@ -90,7 +113,9 @@ def _extract_keyword(request: HttpRequest) -> Tuple[Optional[str], Optional[Tupl
             kw = request.POST.get("keyword")
     except Exception:
         kw = request.POST.get("keyword")
+    return _validate_keyword(kw)
 
+def _validate_keyword(kw: Any) -> Tuple[Optional[str], Optional[Tuple[str, int, Dict[str, Any]]]]:
     if kw is None:
         return None, ("Missing 'keyword' input", 400, {"hint": "Provide JSON {\"keyword\": \"...\"} or form field 'keyword'."})
     if not isinstance(kw, str):
@@ -108,7 +133,7 @@ def _call_keyword_insights_api(api_base: str, keyword: str, timeout_sec: float)
     headers = {"Accept": "application/json", "Content-Type": "application/json"}
     logger.info("Upstream call: endpoint=%s, base=%s, path=%s, timeout=%s", endpoint, api_base, api_path, timeout_sec)
     try:
-        resp = requests.post(endpoint, json={"keyword": keyword}, headers=headers, timeout=timeout_sec)
+        resp = http_client.post(endpoint, json={"keyword": keyword}, headers=headers, timeout=timeout_sec)
         content_type = (resp.headers.get("Content-Type", "") or "").lower()
         if "application/json" in content_type:
             try:
@@ -148,8 +173,96 @@ def keyword_insight_search(request: HttpRequest) -> JsonResponse:
         return _json_error("Configuration error", 500, error_code="CONFIG_MISSING",
                            details={"message": base_err, "hint": "Set ETSY_KEYWORD_INSIGHT_API_LINK in settings/.env (no trailing comma)."})
     timeout = _resolve_timeout()
-    status_code, body = _call_keyword_insights_api(api_base, keyword, timeout)
-    return JsonResponse(body, status=status_code)
+    endpoint = f"{api_base.rstrip('/')}{_resolve_api_path()}"
+    status_code, body, cache_state = keyword_cache.cached_lookup(_call_keyword_insights_api, api_base, endpoint, keyword, timeout)
+    resp = JsonResponse(body, status=status_code)
+    resp["X-Cache"] = cache_state.upper()
+    return resp
+
+def _extract_keywords(request: HttpRequest) -> Tuple[Optional[list], Optional[Tuple[str, int, Dict[str, Any]]]]:
+    try:
+        parsed = json.loads(request.body.decode("utf-8") or "{}")
+    except Exception:
+        return None, ("Invalid JSON body", 400, {"hint": "Provide JSON {\"keywords\": [\"...\", ...]}."})
+    raw = parsed.get("keywords") if isinstance(parsed, dict) else None
+    if isinstance(raw, str):
+        raw = raw.splitlines()
+    if not isinstance(raw, list) or not raw:
+        return None, ("Missing 'keywords' input", 400, {"hint": "Provide JSON {\"keywords\": [\"...\", ...]}."})
+    keywords, seen = [], set()
+    for i, kw in enumerate(raw):
+        cleaned, err = _validate_keyword(kw)
+        if err:
+            message, status, extras = err
+            return None, (f"keywords[{i}]: {message}", status, extras)
+        # Case/spacing variants share one lookup (and one cache entry)
+        norm = keyword_cache.normalize_keyword(cleaned)
+        if norm not in seen:
+            seen.add(norm)
+            keywords.append(cleaned)
+    if len(keywords) > KEYWORD_INSIGHT_BATCH_MAX:
+        return None, (f"Too many keywords (>{KEYWORD_INSIGHT_BATCH_MAX})", 413,
+                      {"received": len(keywords), "hint": f"Send at most {KEYWORD_INSIGHT_BATCH_MAX} keywords per batch."})
+    return keywords, None
+
+def _batch_lines(api_base: str, endpoint: str, keywords: list, timeout: float):
+    started = time.monotonic()
+
+    def line(index: int, keyword: str, result) -> str:
+        status, body, cache_state = result
+        return json.dumps({"index": index, "keyword": keyword, "status": status, "cache": cache_state, "body": body}) + "\n"
+
+    # Cache hits go out first; only misses wait for a pool thread
+    misses = []
+    for index, keyword in enumerate(keywords):
+        cached = keyword_cache.cached_entry(_call_keyword_insights_api, api_base, endpoint, keyword, timeout)
+        if cached is None:
+            misses.append((index, keyword))
+        else:
+            yield line(index, keyword, cached)
+    futures = {
+        _batch_executor().submit(keyword_cache.cached_lookup, _call_keyword_insights_api, api_base, endpoint, keyword, timeout): (index, keyword)
+        for index, keyword in misses
+    }
+    try:
+        for future in as_completed(futures):
+            index, keyword = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = (500, {"error": {"code": "UNEXPECTED_CLIENT_ERROR", "message": "Unexpected error calling upstream service.",
+                                          "details": {"error": str(e)}}}, "miss")
+            yield line(index, keyword, result)
+    finally:
+        # Client went away: drop lookups that have not started
+        for future in futures:
+            future.cancel()
+    yield json.dumps({"done": True, "count": len(keywords), "elapsed_ms": round((time.monotonic() - started) * 1000)}) + "\n"
+
+@require_POST
+@login_required
+def keyword_insight_batch(request: HttpRequest):
+    """
+    Look up a list of keywords and stream one NDJSON line per keyword as its
+    result arrives (cache hits first), then a final {"done": true, ...} line.
+    """
+    keywords, validation_err = _extract_keywords(request)
+    if validation_err:
+        message, status, extras = validation_err
+        logger.info("Invalid batch input: %s", message)
+        return _json_error(message, status, error_code="INVALID_INPUT", details=extras)
+
+    api_base, base_err = _resolve_api_base()
+    if base_err or not api_base:
+        logger.error("API base resolution failed: %s", base_err)
+        return _json_error("Configuration error", 500, error_code="CONFIG_MISSING",
+                           details={"message": base_err, "hint": "Set ETSY_KEYWORD_INSIGHT_API_LINK in settings/.env (no trailing comma)."})
+    endpoint = f"{api_base.rstrip('/')}{_resolve_api_path()}"
+    resp = StreamingHttpResponse(_batch_lines(api_base, endpoint, keywords, _resolve_timeout()),
+                                 content_type="application/x-ndjson")
+    resp["X-Accel-Buffering"] = "no"
+    resp["Cache-Control"] = "no-cache"
+    return resp
 
 @require_GET
 @login_required
@@ -162,6 +275,7 @@ def keyword_insight_debug(request: HttpRequest) -> JsonResponse:
             "ETSY_KEYWORD_INSIGHT_API_LINK": base,
             "ETSY_KEYWORD_INSIGHT_API_PATH": path,
             "KEYWORD_INSIGHT_TIMEOUT": timeout,
+            "KEYWORD_INSIGHT_CACHE": keyword_cache.KEYWORD_INSIGHT_CACHE,
         },
         "errors": {"base_error": base_err},
     }
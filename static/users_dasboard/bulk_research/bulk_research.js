@@ -30,6 +30,8 @@
   var sessions = Array.isArray(window.INITIAL_SESSIONS) ? window.INITIAL_SESSIONS.slice() : [];
   var sessionResultsCache = {}; // { id: entries[] }
   var sessionCounts = {};       // { id: number }
+  var aggregatedServerEntries = null; // "All" view entries from BULK_RESEARCH_ALL_URL (deduplicated server-side)
+  var aggregatedVersions = '';        // their per-session version vector, "id:version,..."
   var streams = {};             // { id: EventSource }
   var streamRetries = {};       // { id: number }
   var POLL_INTERVAL_MS = 2000;
@@ -37,6 +39,7 @@
 
   // Track last SSE heartbeat to determine if a stream is truly alive
   var streamLastHeartbeat = {}; // { id: timestamp }
+  var streamLastEventId = {};   // { id: last SSE event id, used to resume after reconnect }
     var HEARTBEAT_STALE_MS = 5000;
 
     // Reconnect timing and state
@@ -116,6 +119,9 @@
     try { if (streams[sessionId]) { streams[sessionId].close(); } } catch (_) {}
 
     var url = window.BULK_RESEARCH_STREAM_URL_BASE + sessionId + '/';
+    if (streamLastEventId[sessionId]) {
+      url += '?last_event_id=' + encodeURIComponent(streamLastEventId[sessionId]);
+    }
     var es;
     try {
       es = new EventSource(url);
@@ -140,6 +146,9 @@
         console.warn('SSE message missing data string for session', sessionId, ev);
         return;
       }
+      if (ev.lastEventId) {
+        streamLastEventId[sessionId] = ev.lastEventId;
+      }
       var obj;
       try {
         obj = JSON.parse(ev.data);
@@ -287,6 +296,7 @@ function reconnectSession(sessionId, reconBtn) {
 
 // Helpers for aggregated progressive rendering
 function getAggregatedEntries() {
+    if (Array.isArray(aggregatedServerEntries)) return applySorting(aggregatedServerEntries);
     var ids = sessions.map(function (s) { return s && s.id; }).filter(Boolean);
     var merged = [];
     ids.forEach(function (id) {
@@ -363,6 +373,12 @@ function progressiveRenderAggregated(initialCount) {
     // Seed from whatever cache exists and start progressive rendering
     try { progressiveRenderAggregated(productsGrid.children.length); } catch (e) { console.error('Render aggregated from cache failed', e); }
 
+    // One aggregated request instead of one result request per session
+    if (window.BULK_RESEARCH_ALL_URL) {
+        loadAggregatedFromServer(signal);
+        return;
+    }
+
     // Fetch sessions:
     // - Always fetch ongoing sessions (to pick up new products).
     // - Fetch completed sessions only if cache is missing.
@@ -388,7 +404,7 @@ function progressiveRenderAggregated(initialCount) {
 
         remaining += 1;
 
-        var url = window.BULK_RESEARCH_RESULT_URL_BASE + id + '/';
+        var url = window.BULK_RESEARCH_RESULT_URL_BASE + id + '/?view=card';
         fetch(url, { credentials: 'same-origin', signal: signal, headers: { 'Accept': 'application/json' } })
             .then(function (r) {
                 var isJson = ((r.headers.get('Content-Type') || '').toLowerCase().indexOf('application/json') !== -1);
@@ -420,6 +436,60 @@ function progressiveRenderAggregated(initialCount) {
     });
 }
 
+  // Listings per "All sessions" request; later pages follow next_cursor
+  var AGGREGATED_PAGE_SIZE = 200;
+
+  function tagAggregatedEntry(e) {
+    var sid = e.session_id;
+    var meta = findSession(sid) || {};
+    var out = Object.assign({}, e);
+    out.__session_id = sid;
+    out.__session_keyword = meta.keyword || '';
+    out.__session_created_at = meta.created_at || '';
+    out.__session_products_count = sessionCounts[sid] || meta.entries_count || 0;
+    return out;
+  }
+
+  function loadAggregatedFromServer(signal) {
+    var base = window.BULK_RESEARCH_ALL_URL + '?view=card&limit=' + AGGREGATED_PAGE_SIZE;
+    var url = base + '&sort=' + encodeURIComponent(currentSortMetric || 'demand') + '&order=' + encodeURIComponent(currentSortOrder || 'desc');
+    // Server answers {fresh: true} when no session changed since our copy
+    if (Array.isArray(aggregatedServerEntries) && aggregatedVersions) {
+        url += '&versions=' + encodeURIComponent(aggregatedVersions);
+    }
+    var loaded = [];
+
+    function fetchPage(pageUrl) {
+      return fetch(pageUrl, { credentials: 'same-origin', signal: signal, headers: { 'Accept': 'application/json' } })
+        .then(function (r) {
+            return r.json().catch(function () { return {}; }).then(function (body) {
+                if (!r.ok) throw new Error('Aggregated results request failed (' + r.status + '). URL: ' + pageUrl);
+                return body;
+            });
+        })
+        .then(function (body) {
+            if (body.fresh) return;
+            var list = Array.isArray(body.entries) ? body.entries : [];
+            loaded = loaded.concat(list.map(tagAggregatedEntry));
+            // A partial set must not be reported as current if paging stops early
+            aggregatedVersions = '';
+            aggregatedServerEntries = loaded;
+            try { progressiveRenderAggregated(productsGrid.children.length); } catch (e) { console.error('Aggregated progressive step failed', e); }
+            if (body.next_cursor) {
+                return fetchPage(base + '&cursor=' + encodeURIComponent(body.next_cursor));
+            }
+            // Only a complete set may be answered with {fresh: true} next time
+            var versions = body.versions || {};
+            aggregatedVersions = Object.keys(versions).map(function (k) { return k + ':' + versions[k]; }).join(',');
+        });
+    }
+
+    fetchPage(url).catch(function (err) {
+        if (err && err.name === 'AbortError') return;
+        console.warn('Aggregated: failed to fetch all sessions', err);
+    });
+}
+
   function scheduleReconnect(sessionId) {
   var s = findSession(sessionId);
   if (!s || s.status === 'completed' || s.status === 'failed') return;
@@ -1549,8 +1619,10 @@ function showConfirmDelete(session) {
   // Use cache first for instant switching
   var s = findSession(sessionId);
   var isCompleted = s && String(s.status).toLowerCase() === 'completed';
-  var baseUrl = window.BULK_RESEARCH_RESULT_URL_BASE + sessionId + '/';
-  var fastUrl = baseUrl + '?limit=8';
+  // Cards leave out the detail-only fields; showProductDetail loads them on open
+  var baseUrl = window.BULK_RESEARCH_RESULT_URL_BASE + sessionId + '/?view=card';
+  // Server returns the top 8 from its precomputed ordering for the active sort
+  var fastUrl = baseUrl + '&limit=8&sort=' + encodeURIComponent(currentSortMetric || 'demand') + '&order=' + encodeURIComponent(currentSortOrder || 'desc');
 
   // Helper: normalize result JSON to an entries array
   function extractEntries(json) {
@@ -2180,9 +2252,37 @@ function renderProductsGrid(entries) {
   });
     }
 
+  // Cards (view=card) leave out description, shop, reviews and keyword stats;
+  // merge them in and re-render the detail view if that listing is still open
+  function loadListingDetail(entry) {
+    var sel = (resultsSelect && resultsSelect.value) || '';
+    var sid = (sel && sel !== '__all__') ? sel : (entry.__session_id || '');
+    if (!sid || entry.listing_id == null || !window.BULK_RESEARCH_LISTING_URL_BASE) return;
+    entry.__detail_loaded = true;
+    var url = window.BULK_RESEARCH_LISTING_URL_BASE + encodeURIComponent(sid) + '/' + encodeURIComponent(String(entry.listing_id)) + '/';
+    fetch(url, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } })
+      .then(function (r) {
+        if (!r.ok) throw new Error('Listing detail request failed (' + r.status + '). URL: ' + url);
+        return r.json();
+      })
+      .then(function (detail) {
+        entry.description = detail.description || '';
+        entry.shop = detail.shop || {};
+        entry.reviews = detail.reviews || [];
+        entry.sections = detail.sections || [];
+        entry.keyword_insights = detail.keyword_insights || [];
+        if (__detailOpen && String(__detailOpenListingId) === String(entry.listing_id)) showProductDetail(entry);
+      })
+      .catch(function (err) {
+        entry.__detail_loaded = false;
+        console.warn('Listing detail load failed', entry.listing_id, err);
+      });
+  }
+
     // Render a single-product detail view (clears products grid, keeps sidebar intact)
 function showProductDetail(entry) {
   __detailOpen = true; // entering detail mode
+  if (entry && !entry.__detail_loaded && !Array.isArray(entry.reviews)) loadListingDetail(entry);
   productsGrid.innerHTML = '';
 
   // Hide sort/filter bar in detail view